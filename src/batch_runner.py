@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Batch Runner CLI - Replay a JSONL file of prompts through the Platform Agent
+
+Each input line is a JSON object with an id (`id` or `request_id`) and a
+prompt (`input`, `prompt` or `body`). Results are appended to the output
+JSONL as they complete; re-running with the same output file skips ids
+that already succeeded.
+
+Usage:
+    python src/batch_runner.py prompts.jsonl                    # Results to prompts.results.jsonl
+    python src/batch_runner.py prompts.jsonl -o out.jsonl -w 8  # 8 concurrent workers
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import pathlib
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, str(pathlib.Path(__file__).parent))
+
+from ops_crew.batch import BatchRunner
+
+
+def main():
+    """Main CLI entry point"""
+    parser = argparse.ArgumentParser(
+        description="Run a JSONL file of prompts through the Platform Agent",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("input", help="Input JSONL file with one prompt per line")
+    parser.add_argument("-o", "--output",
+                        help="Output JSONL file (default: <input>.results.jsonl)")
+    parser.add_argument("-w", "--workers", type=int, default=4,
+                        help="Number of concurrent workers (default: 4)")
+    args = parser.parse_args()
+
+    output = args.output or str(pathlib.Path(args.input).with_suffix(".results.jsonl"))
+
+    # One warm crew session per worker unless configured explicitly
+    os.environ.setdefault("OPS_CREW_POOL_SIZE", str(args.workers))
+    from ops_crew.crew import run_crew_async
+    from ops_crew.mcp_manager import close_mcp_manager
+    from ops_crew.memory_writer import close_memory_write_queue
+
+    print("📦 Platform Agent Batch Runner")
+    print("=" * 50)
+    print(f"   📥 Input: {args.input}")
+    print(f"   📤 Output: {output}")
+    print(f"   👷 Workers: {args.workers}")
+
+    runner = BatchRunner(run_crew_async, workers=args.workers)
+    try:
+        report = asyncio.run(runner.run(args.input, output))
+    except KeyboardInterrupt:
+        print("\n🛑 Interrupted, completed results are kept; re-run to resume")
+        sys.exit(130)
+    finally:
+        close_memory_write_queue()
+        close_mcp_manager()
+
+    print("\n📊 Batch Report:")
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["failed"] == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,18 @@
 #!/usr/bin/env python
 """Platform Agent - 智能平台助手主程序"""
 
+import argparse
 import warnings
 import os
 import sys
 from dotenv import load_dotenv
 
-from ops_crew.crew import run_crew
+from ops_crew.crew import get_session_pool, run_crew, run_crew_stream
+from ops_crew.mcp_manager import close_mcp_manager
+from ops_crew.memory_maintenance import start_memory_maintenance
+from ops_crew.memory_writer import close_memory_write_queue
+from ops_crew.metrics import start_metrics_server
+from ops_crew.service import serve
 
 # 过滤警告，提升用户体验
 warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -21,10 +27,62 @@ os.environ["PYDANTIC_SILENCE_DEPRECATION_WARNINGS"] = "1"
 # Load environment variables from .env file
 load_dotenv()
 
+def print_streamed_result(user_input: str) -> None:
+    """
+    Runs the crew in streaming mode, printing tool progress and the final
+    answer's tokens as they arrive.
+    """
+    streamed_tokens = False
+    for event in run_crew_stream(user_input):
+        if event.type == "tool_started":
+            print(f"\n🔧 {event.data['tool']} ...", flush=True)
+        elif event.type == "tool_finished":
+            print(f"✅ {event.data['tool']} ({event.data['seconds']:.1f}s)", flush=True)
+        elif event.type == "tool_error":
+            print(f"⚠️ {event.data['tool']} failed: {event.data['error']}", flush=True)
+        elif event.type == "token":
+            if not streamed_tokens:
+                print("\n📋 Result:")
+                print("=" * 50)
+                streamed_tokens = True
+            print(event.data["text"], end="", flush=True)
+        elif event.type == "final":
+            if not streamed_tokens:
+                print("\n📋 Result:")
+                print("=" * 50)
+                print(event.data["text"], end="")
+            print()
+            print("=" * 50)
+
+def parse_args():
+    """Parses command line options."""
+    parser = argparse.ArgumentParser(description="Platform Agent - 智能平台助手")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run as an HTTP/JSON service instead of the interactive CLI")
+    parser.add_argument("--host", default=os.getenv("SERVICE_HOST", "127.0.0.1"),
+                        help="Service bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVICE_PORT", "8080")),
+                        help="Service port (default: 8080)")
+    return parser.parse_args()
+
 def main():
     """
     Main function to run the CLI interface.
     """
+    args = parse_args()
+    
+    if args.serve:
+        if not os.getenv("OPENROUTER_API_KEY"):
+            print("❌ Error: OPENROUTER_API_KEY not found in environment variables.")
+            sys.exit(1)
+        maintenance = start_memory_maintenance()
+        serve(args.host, args.port)
+        if maintenance is not None:
+            maintenance.stop()
+        close_memory_write_queue()
+        close_mcp_manager()
+        return
+    
     print("🚀 Welcome to the Platform Agent!")
     print("Type 'exit' or 'quit' to end the session.")
     print("==================================================")
@@ -35,6 +93,27 @@ def main():
         print("Please set your API key in a .env file or environment variable.")
         sys.exit(1)
     
+    # Expose Prometheus metrics while the CLI runs (the service serves them on /metrics)
+    metrics_port = os.getenv("METRICS_PORT")
+    if metrics_port:
+        metrics_host = os.getenv("METRICS_HOST", "127.0.0.1")
+        start_metrics_server(metrics_host, int(metrics_port))
+        print(f"📈 Metrics available on http://{metrics_host}:{metrics_port}/metrics")
+    
+    # Prune and compact the memory stores periodically (MEMORY_MAINTENANCE_INTERVAL_HOURS)
+    maintenance = start_memory_maintenance()
+    
+    # Print progress and answer tokens as they arrive (STREAM_OUTPUT=false to disable)
+    stream_output = os.getenv("STREAM_OUTPUT", "true").lower() == "true"
+    
+    # Build the crew session up front so the first prompt does not pay for it
+    try:
+        print("⏳ Warming up agent session...")
+        get_session_pool().warm_up()
+        print("✅ Agent session ready")
+    except Exception as e:
+        print(f"⚠️ Warm-up failed, will retry on first request: {str(e)}")
+    
     while True:
         try:
             # Get user input
@@ -52,6 +131,10 @@ def main():
             print("\n🔍 Processing your request...")
             print("=" * 50)
             
+            if stream_output:
+                print_streamed_result(user_input)
+                continue
+            
             # Run the crew and get the result
             result = run_crew(user_input)
             
@@ -66,6 +149,12 @@ def main():
         except Exception as e:
             print(f"\n❌ An error occurred: {str(e)}")
             print("Please try again or type 'exit' to quit.")
+    
+    # Persist pending memory writes, then release MCP SSE sessions before the interpreter starts tearing down
+    if maintenance is not None:
+        maintenance.stop()
+    close_memory_write_queue()
+    close_mcp_manager()
 
 if __name__ == "__main__":
     main()
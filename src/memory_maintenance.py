@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Memory Maintenance CLI - Retention, deduplication and compaction of memory stores
+
+Prunes the CrewAI memory stores under CREWAI_STORAGE_DIR (short-term and
+entity ChromaDB collections, long-term memory and the embedding cache) by
+age and count, removes near-identical entries, VACUUMs the SQLite files and
+optionally rebuilds the vector indexes, then prints size, entry count and
+query latency of each store before and after.
+
+Usage:
+    python src/memory_maintenance.py --dry-run                     # Show what would be removed
+    python src/memory_maintenance.py --max-age-days 30 --max-entries 5000
+    python src/memory_maintenance.py --rebuild-index               # Stop the agent first
+    python src/memory_maintenance.py --storage-dir ./crew_memory --json
+
+Defaults come from MEMORY_RETENTION_DAYS, MEMORY_MAX_ENTRIES and
+MEMORY_DEDUP_SIMILARITY; the scheduled in-process job is enabled with
+MEMORY_MAINTENANCE_INTERVAL_HOURS.
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import sys
+
+from dotenv import load_dotenv
+
+# Add src to path for imports
+sys.path.insert(0, str(pathlib.Path(__file__).parent))
+
+from ops_crew.memory_maintenance import maintenance_from_env
+
+
+def _megabytes(size):
+    return f"{size / 1e6:.2f}MB"
+
+
+def _latency(value):
+    return "-" if value is None else f"{value:.2f}ms"
+
+
+def print_report(report):
+    title = "🔍 Dry run" if report["dry_run"] else "🧹 Maintenance"
+    print(f"{title}: {report['storage_dir']} ({report['seconds']:.2f}s)")
+    print("=" * 100)
+    print(f"{'Store':<48}{'Entries':>14}{'Size':>20}{'Query p50':>18}")
+    for name, store in report["stores"].items():
+        before, after = store["before"], store["after"]
+        print(f"{name[:47]:<48}{before['entries']:>6} -> {after['entries']:<6}"
+              f"{_megabytes(before['size_bytes']):>9} -> {_megabytes(after['size_bytes']):<9}"
+              f"{_latency(before['query_ms']):>8} -> {_latency(after['query_ms'])}")
+        removed = [f"{store[key]} {key}" for key in ("expired", "duplicates") if store.get(key)]
+        if removed or store.get("rebuilt"):
+            print(f"    {', '.join(removed + (['index rebuilt'] if store.get('rebuilt') else []))}")
+    totals = report["totals"]
+    verb = "Would remove" if report["dry_run"] else "Removed"
+    print("=" * 100)
+    print(f"{verb} {totals['expired']} expired and {totals['duplicates']} duplicate entries; "
+          f"{_megabytes(totals['size_before'])} -> {_megabytes(totals['size_after'])}")
+    for name, error in report["vacuum_errors"].items():
+        print(f"⚠️ VACUUM failed for {name}: {error}")
+
+
+def main():
+    """Main CLI entry point"""
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        description="Apply retention, deduplication and compaction to the agent's memory stores",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--storage-dir", help="Memory storage directory (default: CrewAI's path for CREWAI_STORAGE_DIR)")
+    parser.add_argument("--max-age-days", type=float, help="Delete entries older than this (default: MEMORY_RETENTION_DAYS)")
+    parser.add_argument("--max-entries", type=int,
+                        help="Keep at most this many entries per store (default: MEMORY_MAX_ENTRIES)")
+    parser.add_argument("--dedup-similarity", type=float,
+                        help="Cosine similarity at which entries count as duplicates, 0 disables "
+                             "(default: MEMORY_DEDUP_SIMILARITY or 0.98)")
+    parser.add_argument("--no-vacuum", action="store_true", help="Skip SQLite VACUUM")
+    parser.add_argument("--rebuild-index", action="store_true",
+                        help="Rebuild the vector indexes (the agent must not be running)")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be removed without changing anything")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    overrides = {"vacuum": not args.no_vacuum, "rebuild_index": args.rebuild_index, "dry_run": args.dry_run}
+    for option in ("max_age_days", "max_entries", "dedup_similarity"):
+        if getattr(args, option) is not None:
+            overrides[option] = getattr(args, option)
+    maintenance = maintenance_from_env(args.storage_dir, **overrides)
+    if not os.path.isdir(maintenance.storage_dir):
+        print(f"❌ Memory storage directory not found: {maintenance.storage_dir}")
+        sys.exit(1)
+
+    report = maintenance.run()
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Mock LLM Server - Local OpenAI-compatible stand-in for benchmarks
+
+Serves chat completions (streaming, ReAct text or tool calls) from a
+scripted plan per query, with configurable time-to-first-token and
+generation speed, plus deterministic embeddings for the memory embedder,
+so the full run_crew path can be exercised offline.
+
+Usage:
+    python src/mock_llm_server.py                                   # instant replies
+    python src/mock_llm_server.py --ttft 0.4 --tps 60               # provider-like pacing
+    python src/mock_llm_server.py --script bench/plans.json         # per-query tool plans
+
+    # Point the agent at it (together with src/mock_mcp_server.py)
+    MODEL=openai/mock-llm BASE_URL=http://127.0.0.1:8766/v1 OPENROUTER_API_KEY=mock \\
+    QWEN_API_BASE=http://127.0.0.1:8766/v1 OPENAI_API_KEY=mock ./run.sh
+
+Script format:
+    {"plans": {"show me all k8s clusters": [["LIST_CLUSTERS", {}]],
+               "analyze cluster health": [["LIST_NODES", {"cluster": "prod-east"}],
+                                          ["GET_NODE_METRICS", {"cluster": "prod-east"}]]},
+     "answer": "Final Answer: done after {steps} tool calls."}
+"""
+
+import argparse
+import asyncio
+import pathlib
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, str(pathlib.Path(__file__).parent))
+
+from ops_crew.mock_llm import DEFAULT_EMBEDDING_DIMENSIONS, ChatScript, MockLLMServer
+
+
+def main():
+    """Main CLI entry point"""
+    parser = argparse.ArgumentParser(
+        description="Run an OpenAI-compatible mock LLM server with scripted replies",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8766, help="Port (default: 8766)")
+    parser.add_argument("--script", help="JSON file with per-query tool plans")
+    parser.add_argument("--model", default="mock-llm", help="Model name reported in responses")
+    parser.add_argument("--ttft", type=float, default=0.0, help="Seconds before the first token (default: 0)")
+    parser.add_argument("--tps", type=float, default=0.0, help="Generated tokens per second (default: 0 = instant)")
+    parser.add_argument("--dimensions", type=int, default=DEFAULT_EMBEDDING_DIMENSIONS,
+                        help=f"Embedding dimensions (default: {DEFAULT_EMBEDDING_DIMENSIONS})")
+    args = parser.parse_args()
+
+    script = ChatScript.from_file(args.script) if args.script else ChatScript()
+    server = MockLLMServer(script, ttft=args.ttft, tokens_per_second=args.tps, model=args.model,
+                           embedding_dimensions=args.dimensions)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Mock LLM server stopped")
+
+
+if __name__ == "__main__":
+    main()
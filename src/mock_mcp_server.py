@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Mock MCP Server - Local SSE stand-in for the Kubernetes MCP server
+
+Serves the tools in tools_cache.json over the same SSE transport as the
+production server, answering with deterministic synthetic cluster data,
+so caching, fan-out and concurrency can be measured without K8S_MCP_URL.
+
+Usage:
+    python src/mock_mcp_server.py                                   # 3 clusters x 6 nodes x 20 pods
+    python src/mock_mcp_server.py --clusters 20 --nodes 50 --pods 500
+    python src/mock_mcp_server.py --latency 0.05 --tool-latency LIST_NODES=0.3,GET_POD_LOGS=1
+    python src/mock_mcp_server.py --error-rate 0.02 --tool-error-rate GET_NODE_METRICS=0.5
+
+    K8S_MCP_URL=http://127.0.0.1:8765/sse ./run.sh
+"""
+
+import argparse
+import asyncio
+import pathlib
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, str(pathlib.Path(__file__).parent))
+
+from ops_crew.mock_mcp import MockDataset, MockMCPServer, parse_overrides
+from ops_crew.tool_cache import DEFAULT_CACHE_PATH, load_tools_cache
+
+
+def main():
+    """Main CLI entry point"""
+    parser = argparse.ArgumentParser(
+        description="Run a mock MCP SSE server backed by synthetic cluster data",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    parser.add_argument("--tools", default=DEFAULT_CACHE_PATH, help=f"Tool schemas (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--clusters", type=int, default=3, help="Number of clusters (default: 3)")
+    parser.add_argument("--nodes", type=int, default=6, help="Nodes per cluster (default: 6)")
+    parser.add_argument("--pods", type=int, default=20, help="Pods per cluster (default: 20)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for data and error injection (default: 0)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every tool call")
+    parser.add_argument("--tool-latency", default="", metavar="TOOL=SECONDS,...",
+                        help="Per-tool latency overrides")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability a tool call fails (0-1)")
+    parser.add_argument("--tool-error-rate", default="", metavar="TOOL=RATE,...",
+                        help="Per-tool error rate overrides")
+    args = parser.parse_args()
+
+    tools = load_tools_cache(args.tools)
+    if not tools:
+        print(f"❌ No tool schemas found in {args.tools} (run: python src/tool_inspector.py --refresh)")
+        sys.exit(1)
+
+    server = MockMCPServer(
+        MockDataset(args.clusters, args.nodes, args.pods, seed=args.seed),
+        tools,
+        latency=args.latency,
+        latencies=parse_overrides(args.tool_latency),
+        error_rate=args.error_rate,
+        error_rates=parse_overrides(args.tool_error_rate),
+        seed=args.seed,
+    )
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Mock MCP server stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import math
+import pathlib
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Set
+
+_ID_FIELDS = ("id", "request_id")
+_PROMPT_FIELDS = ("input", "prompt", "body")
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile; returns 0.0 for an empty sequence."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _first(record: Dict, fields: Sequence[str]) -> Optional[Any]:
+    for field in fields:
+        if record.get(field) not in (None, ""):
+            return record[field]
+    return None
+
+
+def read_prompts(path: str) -> Iterator[Dict[str, str]]:
+    """
+    Streams `{"id", "input"}` items from a JSONL file.
+
+    The id is taken from `id` or `request_id` (line number if absent) and the
+    prompt from `input`, `prompt` or `body`. Blank lines are skipped. A line
+    that is not a JSON object with a prompt yields an item with an `error`
+    instead, so one bad line does not stop the batch.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                record, error = None, f"{path}:{line_number}: invalid JSON ({e})"
+            else:
+                error = None if isinstance(record, dict) else f"{path}:{line_number}: not a JSON object"
+            if error is not None:
+                yield {"id": str(line_number), "input": line.strip(), "error": error}
+                continue
+            prompt = _first(record, _PROMPT_FIELDS)
+            request_id = _first(record, _ID_FIELDS)
+            item = {
+                "id": str(request_id if request_id is not None else line_number),
+                "input": "" if prompt is None else str(prompt),
+            }
+            if prompt is None:
+                item["error"] = f"{path}:{line_number}: no input/prompt/body field"
+            yield item
+
+
+def completed_ids(output_path: str) -> Set[str]:
+    """Returns the ids already answered successfully in an output file."""
+    path = pathlib.Path(output_path)
+    if not path.exists():
+        return set()
+    done = set()
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A partially written last line from an interrupted run
+                continue
+            if record.get("error") is None and "id" in record:
+                done.add(str(record["id"]))
+    return done
+
+
+class BatchRunner:
+    """
+    Streams prompts through an async handler with N concurrent workers.
+
+    Results are appended to the output JSONL as each request finishes, so
+    an interrupted run can be restarted and will skip ids that already
+    succeeded. Failed requests are recorded with an `error` and retried on
+    the next run.
+    """
+
+    def __init__(self, handler: Callable[[str], Awaitable[str]], workers: int = 4) -> None:
+        self.handler = handler
+        self.workers = workers
+        self.latencies: List[float] = []
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+
+    async def _worker(self, items: Iterator[Dict[str, str]], output) -> None:
+        for item in items:
+            started = time.monotonic()
+            record = {"id": item["id"], "input": item["input"], "result": None, "error": item.get("error")}
+            if record["error"] is not None:
+                # A malformed input line is recorded as failed without calling the handler
+                self.failed += 1
+            else:
+                try:
+                    record["result"] = await self.handler(item["input"])
+                    self.succeeded += 1
+                except Exception as e:
+                    record["error"] = str(e)
+                    self.failed += 1
+            elapsed = time.monotonic() - started
+            self.latencies.append(elapsed)
+            record["elapsed"] = round(elapsed, 3)
+            record["completed_at"] = datetime.now().isoformat()
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+
+    def _pending(self, input_path: str, done: Set[str]) -> Iterator[Dict[str, str]]:
+        for item in read_prompts(input_path):
+            if item["id"] in done:
+                self.skipped += 1
+                continue
+            done.add(item["id"])
+            yield item
+
+    async def run(self, input_path: str, output_path: str) -> Dict[str, Any]:
+        """Processes every pending prompt and returns a summary report."""
+        pending = self._pending(input_path, completed_ids(output_path))
+        started = time.monotonic()
+        with open(output_path, "a", encoding="utf-8") as output:
+            # Workers share one lazy iterator, so the input is never fully loaded
+            workers = [asyncio.ensure_future(self._worker(pending, output)) for _ in range(self.workers)]
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                # If one worker fails (or the run is cancelled), stop the others
+                # before the output file is closed under them
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+        return self.report(time.monotonic() - started)
+
+    def report(self, wall_seconds: float) -> Dict[str, Any]:
+        processed = self.succeeded + self.failed
+        return {
+            "processed": processed,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "wall_seconds": round(wall_seconds, 3),
+            "throughput_per_second": round(processed / wall_seconds, 3) if wall_seconds > 0 else 0.0,
+            "latency_p50": round(percentile(self.latencies, 50), 3),
+            "latency_p95": round(percentile(self.latencies, 95), 3),
+            "latency_p99": round(percentile(self.latencies, 99), 3),
+        }
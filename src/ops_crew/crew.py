@@ -1,13 +1,48 @@
+import asyncio
 import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
 from dotenv import load_dotenv
 from crewai import Agent, Crew, Process, Task, LLM
 from crewai.project import CrewBase, agent, crew, task
-from crewai_tools import MCPServerAdapter
+
+from .embedding_cache import cached_embedder_config
+from .fast_path import FastPathRouter
+from .mcp_manager import get_mcp_manager
+from .memory_writer import batch_memory_writes, defer_memory_writes, get_memory_write_queue
+from .metrics import (
+    annotate,
+    bind_token_counter,
+    instrument_memory,
+    register_llm_handlers,
+    timed,
+    track_request,
+)
+from .output_budget import PAGE_TOOL_NAME, get_output_budget, track_savings
+from .streaming import StreamEvent, stream_kickoff
+from .tool_proxy import (
+    ResultPageTool,
+    build_dispatcher,
+    build_fan_out_tool,
+    build_proxy_tools,
+    proxy_live_tools,
+    start_background_validation,
+)
+from .tool_selector import select_tools
+from .tracing import span
 
 # Load environment variables from .env file
 load_dotenv()
 
 
+def without_pager_hint(description: str) -> str:
+    """Drops the task description lines that point the agent at the result pager."""
+    return "\n".join(line for line in description.split("\n") if PAGE_TOOL_NAME not in line)
+
+
 @CrewBase
 class OpsCrew():
     """Platform Agent for multi-agent collaboration"""
@@ -23,7 +58,12 @@ class OpsCrew():
         }
     ]
 
-    def __init__(self) -> None:
+    def __init__(self, use_tool_cache: Optional[bool] = None) -> None:
+        # Build agents from tools_cache.json proxies unless told otherwise
+        if use_tool_cache is None:
+            use_tool_cache = os.getenv("MCP_TOOLS_FROM_CACHE", "true").lower() == "true"
+        self.use_tool_cache = use_tool_cache
+        
         # Configure Qwen embedding as OpenAI replacement for memory functionality
         os.environ["OPENAI_API_BASE"] = os.getenv("QWEN_API_BASE", "https://dashscope.aliyuncs.com/compatible-mode/v1")
         
@@ -35,15 +75,8 @@ class OpsCrew():
             temperature=0.1
         )
 
-    def _load_mcp_tools_required(self):
-        """
-        Loads MCP tools with fail-fast strategy.
-        Raises exception if MCP server is unavailable since the platform agent 
-        requires these tools for core functionality.
-        """
-        tools = []
-        
-        # Check if MCP server is configured
+    def _check_mcp_configured(self) -> None:
+        """Raises if no MCP server URL is configured."""
         if not any(config.get("url") for config in self.mcp_server_params):
             raise RuntimeError(
                 "❌ MCP服务器未配置！\n"
@@ -55,41 +88,18 @@ class OpsCrew():
                 "3. 验证网络连接：curl <MCP_URL>/health\n"
                 "4. 运行 ./run.sh --verify 检查系统状态"
             )
+
+    def _load_mcp_tools_required(self):
+        """
+        Loads MCP tools with fail-fast strategy.
+        Raises exception if MCP server is unavailable since the platform agent 
+        requires these tools for core functionality.
+        """
+        self._check_mcp_configured()
         
-        for server_config in self.mcp_server_params:
-            mcp_url = server_config.get("url")
-            if not mcp_url:
-                continue
-                
-            try:
-                # MCPServerAdapter expects serverparams as a dict
-                # For SSE transport, pass the URL in the dict
-                server_params = {
-                    "url": mcp_url,
-                    "transport": server_config.get("transport", "sse")
-                }
-                
-                mcp_adapter = MCPServerAdapter(server_params)
-                server_tools = mcp_adapter.tools
-                tools.extend(server_tools)
-                
-                print(f"✅ 成功加载 {len(server_tools)} 个MCP工具从 {mcp_url}")
-                
-            except Exception as e:
-                raise RuntimeError(
-                    f"❌ 无法连接到MCP服务器: {mcp_url}\n"
-                    f"错误: {str(e)}\n\n"
-                    "可能的解决方案：\n"
-                    "1. 检查MCP服务器是否运行：curl {}/health\n"
-                    "2. 验证URL格式是否正确（需要包含协议 http://或https://）\n"
-                    "3. 检查网络连接和防火墙设置\n"
-                    "4. 查看MCP服务器日志排查问题\n"
-                    "5. 尝试重启MCP服务器\n\n"
-                    "如果问题持续，请检查：\n"
-                    "- MCP服务器版本兼容性\n"
-                    "- 服务器配置文件\n"
-                    "- 系统资源使用情况".format(mcp_url)
-                ) from e
+        # Connections are shared process-wide, so repeated agent factory
+        # calls reuse the already-open SSE sessions
+        tools = get_mcp_manager().get_tools(self.mcp_server_params)
         
         if not tools:
             raise RuntimeError(
@@ -100,6 +110,25 @@ class OpsCrew():
             
         return tools
 
+    def _load_mcp_tools(self):
+        """
+        Loads MCP tools for agents.
+
+        Prefers lazy proxies built from tools_cache.json so agents can be
+        built without waiting on the MCP handshake; the cache is validated
+        against the live servers in the background. Falls back to live
+        loading when the cache is missing or `use_tool_cache` is off.
+        """
+        self._check_mcp_configured()
+        
+        if self.use_tool_cache:
+            proxies = build_proxy_tools(self.mcp_server_params)
+            if proxies:
+                start_background_validation(self.mcp_server_params)
+                return proxies
+        
+        return proxy_live_tools(self._load_mcp_tools_required(), self.mcp_server_params)
+
     @agent
     def tool_inspector(self) -> Agent:
         from crewai_tools import FileWriterTool, FileReadTool
@@ -111,7 +140,7 @@ class OpsCrew():
         ]
         
         # Combine MCP tools with file operation tools
-        all_tools = self._load_mcp_tools_required() + file_tools
+        all_tools = self._load_mcp_tools() + file_tools
         
         return Agent(
             config=self.agents_config['tool_inspector'],
@@ -123,10 +152,16 @@ class OpsCrew():
 
     @agent
     def k8s_expert(self) -> Agent:
+        mcp_tools = self._load_mcp_tools()
+        # MCP tools, served from the cache and connected on first use, plus a
+        # fan-out tool for concurrent multi-cluster queries
+        tools = mcp_tools + [build_fan_out_tool(mcp_tools)]
+        if get_output_budget() is not None:
+            # Pager for results truncated to the output token budget
+            tools.append(ResultPageTool())
         return Agent(
             config=self.agents_config['k8s_expert'],
-            # Load all MCP tools directly in real-time
-            tools=self._load_mcp_tools_required(),
+            tools=tools,
             llm=self.llm,
             verbose=True
         )
@@ -140,8 +175,12 @@ class OpsCrew():
 
     @task
     def k8s_analysis_task(self) -> Task:
+        config = self.tasks_config['k8s_analysis_task']
+        if get_output_budget() is None:
+            # Nothing is truncated, so don't tell the agent about GET_MORE_RESULTS
+            config = dict(config, description=without_pager_hint(config['description']))
         return Task(
-            config=self.tasks_config['k8s_analysis_task'],
+            config=config,
             agent=self.k8s_expert()
         )
 
@@ -155,51 +194,344 @@ class OpsCrew():
             verbose=False
         )
 
-    @crew
-    def ops_crew(self) -> Crew:
-        """Creates the main Ops crew for user tasks with memory enabled using Qwen embeddings"""
-        
-        # Configure Qwen embeddings for memory system
-        qwen_embedder_config = {
+    def embedder_config(self) -> Dict:
+        """Embedder for the memory system: Qwen embeddings via the OpenAI-compatible API, behind the embedding cache"""
+        return cached_embedder_config({
             "provider": "openai",
             "config": {
                 "api_key": os.getenv("OPENAI_API_KEY"),  # This is actually Qwen's key
                 "api_base": os.getenv("QWEN_API_BASE", "https://dashscope.aliyuncs.com/compatible-mode/v1"),
                 "model": os.getenv("QWEN_EMBEDDING_MODEL", "text-embedding-v4")
             }
-        }
+        })
+
+    @crew
+    def ops_crew(self) -> Crew:
+        """Creates the main Ops crew for user tasks with memory enabled using Qwen embeddings"""
+        
+        # CREW_MEMORY=false turns the memory system off (e.g. to measure its cost)
+        memory_enabled = os.getenv("CREW_MEMORY", "true").lower() == "true"
         
         return Crew(
             agents=[self.k8s_expert()],
             tasks=[self.k8s_analysis_task()],
             process=Process.sequential,
             verbose=True,
-            memory=True,  # Enable CrewAI memory system
-            embedder=qwen_embedder_config  # Use Qwen embeddings via OpenAI-compatible config
+            memory=memory_enabled,  # Enable CrewAI memory system
+            embedder=self.embedder_config() if memory_enabled else None
         )
 
 
 
 
+class CrewSession:
+    """
+    A warm, reusable Ops crew.
+
+    Keeps the LLM client, agents, MCP tool list and memory handles of one
+    `OpsCrew` alive across requests. The task template is never mutated:
+    each call passes the user input through `kickoff(inputs=...)`, which
+    interpolates a fresh per-request description from the original template.
+
+    A session runs one request at a time; use `CrewSessionPool` to serve
+    several requests concurrently.
+
+    Before each request the task's tools are narrowed to the
+    TOOL_SELECTION_TOP_K tools most relevant to the input (0 disables),
+    plus a dispatcher that can still call any of the others.
+
+    Tokens saved by shaping over-budget tool output during the last
+    request are kept in `last_output_savings`.
+
+    Memory saves are batched (see `MemoryWriteBatcher`). With
+    MEMORY_ASYNC_WRITES on (the default) they, and the task evaluation that
+    extracts entities, run on the shared background `MemoryWriteQueue` and
+    a request returns as soon as its answer is ready; otherwise they are
+    flushed before it returns.
+    """
+
+    def __init__(self) -> None:
+        self.ops_crew_instance = OpsCrew()
+        self.crew = self.ops_crew_instance.ops_crew()
+        self.task = self.crew.tasks[0]
+        self.all_tools = list(self.task.tools or self.task.agent.tools or [])
+        self.tool_top_k = int(os.getenv("TOOL_SELECTION_TOP_K", "5"))
+        self.requests_served = 0
+        self.last_output_savings = {"tokens_saved": 0, "outputs_shaped": 0}
+        # Per-request metrics: LLM call timing/tokens and memory read/write timing
+        register_llm_handlers()
+        instrument_memory(self.crew)
+        self.memory_batcher = batch_memory_writes(self.crew)
+        self.memory_queue = get_memory_write_queue() if self.crew.memory else None
+        if self.memory_queue is not None:
+            defer_memory_writes(self.crew, self.memory_queue)
+
+    def _select_tools(self, user_input: str) -> List:
+        # The pager is never subject to selection: truncated results point to it by name
+        pinned = [tool for tool in self.all_tools if tool.name == PAGE_TOOL_NAME]
+        candidates = [tool for tool in self.all_tools if tool.name != PAGE_TOOL_NAME]
+        selected = select_tools(user_input, candidates, self.tool_top_k)
+        if len(selected) == len(candidates):
+            return selected + pinned
+        selected_ids = {id(tool) for tool in selected}
+        hidden = [tool for tool in candidates if id(tool) not in selected_ids]
+        return selected + pinned + [build_dispatcher(hidden)]
+
+    def _flush_memory(self) -> None:
+        if self.memory_batcher is None:
+            return
+        if self.memory_queue is not None:
+            # Queued behind this request's memory jobs, so their saves are in the buffer by then
+            self.memory_queue.submit(self.memory_batcher.flush, name="memory_batch")
+        else:
+            self.memory_batcher.flush()
+
+    def run(self, user_input: str):
+        """Runs a single request and returns the raw `CrewOutput`."""
+        self.task.tools = self._select_tools(user_input)
+        bind_token_counter(self.task.agent)
+        with span("crew.kickoff"), track_savings() as savings:
+            try:
+                result = self.crew.kickoff(inputs={"user_input": user_input})
+            finally:
+                self._flush_memory()
+        self.last_output_savings = savings.as_dict()
+        annotate(output_savings=self.last_output_savings, tools_offered=len(self.task.tools))
+        self.requests_served += 1
+        return result
+
+    async def run_async(self, user_input: str):
+        """Async variant of `run`, using the crew's async kickoff."""
+        self.task.tools = self._select_tools(user_input)
+        bind_token_counter(self.task.agent)
+        with span("crew.kickoff"), track_savings() as savings:
+            try:
+                result = await self.crew.kickoff_async(inputs={"user_input": user_input})
+            finally:
+                await asyncio.to_thread(self._flush_memory)
+        self.last_output_savings = savings.as_dict()
+        annotate(output_savings=self.last_output_savings, tools_offered=len(self.task.tools))
+        self.requests_served += 1
+        return result
+
+    def run_stream(self, user_input: str) -> Iterator[StreamEvent]:
+        """Runs a single request, yielding tool progress and final-answer tokens."""
+        llm = self.ops_crew_instance.llm
+        previous_stream = llm.stream
+        llm.stream = True
+        try:
+            yield from stream_kickoff(llm, self.task.agent, lambda: self.run(user_input))
+        finally:
+            llm.stream = previous_stream
+
+
+class CrewSessionPool:
+    """
+    A small pool of warm `CrewSession` objects.
+
+    Sessions are built lazily on first checkout, up to `size`, and are reused
+    afterwards. A session that raises while running a request is discarded
+    so the next caller gets a clean one.
+    """
+
+    def __init__(self, size: int = 1) -> None:
+        if size < 1:
+            raise ValueError("Session pool size must be at least 1")
+        self.size = size
+        self._idle: "queue.LifoQueue[CrewSession]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _checkout(self) -> CrewSession:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+
+        if not can_create:
+            # All sessions are busy; wait for one to be returned
+            return self._idle.get()
+
+        try:
+            with timed("crew_construction"):
+                return CrewSession()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _discard(self) -> None:
+        with self._lock:
+            self._created -= 1
+
+    @contextmanager
+    def session(self) -> Iterator[CrewSession]:
+        """Checks out a session for the duration of the `with` block."""
+        crew_session = self._checkout()
+        succeeded = False
+        try:
+            yield crew_session
+            succeeded = True
+        finally:
+            if succeeded:
+                self._idle.put(crew_session)
+            else:
+                self._discard()
+
+    def warm_up(self) -> None:
+        """Builds one session ahead of the first request."""
+        with self.session():
+            pass
+
+    def run(self, user_input: str):
+        """Runs a request on a pooled session and returns the raw `CrewOutput`."""
+        with self.session() as crew_session:
+            return crew_session.run(user_input)
+
+    async def run_async(self, user_input: str):
+        """Async variant of `run`; waiting for a free session does not block the loop."""
+        checkout = asyncio.ensure_future(asyncio.to_thread(self._checkout))
+        try:
+            crew_session = await asyncio.shield(checkout)
+        except asyncio.CancelledError:
+            # The checkout thread keeps going; return whatever session it gets
+            checkout.add_done_callback(self._return_checkout)
+            raise
+        run = asyncio.ensure_future(crew_session.run_async(user_input))
+        try:
+            result = await asyncio.shield(run)
+        except asyncio.CancelledError:
+            # The kickoff thread cannot be interrupted; hand the session back
+            # only once it has actually finished
+            run.add_done_callback(lambda done: self._release(crew_session, done))
+            raise
+        except Exception:
+            self._discard()
+            raise
+        self._idle.put(crew_session)
+        return result
+
+    def _return_checkout(self, checkout: "asyncio.Future") -> None:
+        # A failed checkout has already given back its slot
+        if not checkout.cancelled() and checkout.exception() is None:
+            self._idle.put(checkout.result())
+
+    def _release(self, crew_session: CrewSession, run: "asyncio.Future") -> None:
+        if run.cancelled() or run.exception() is not None:
+            self._discard()
+        else:
+            self._idle.put(crew_session)
+
+    def stream(self, user_input: str) -> Iterator[StreamEvent]:
+        """
+        Streams a request on a pooled session; see `CrewSession.run_stream`.
+
+        A stream the consumer abandons (closed early or interrupted) discards
+        its session, whose kickoff may still be running.
+        """
+        with self.session() as crew_session:
+            yield from crew_session.run_stream(user_input)
+
+
+_session_pool: Optional[CrewSessionPool] = None
+_session_pool_lock = threading.Lock()
+
+
+def get_session_pool() -> CrewSessionPool:
+    """Returns the process-wide session pool, sized by OPS_CREW_POOL_SIZE."""
+    global _session_pool
+    with _session_pool_lock:
+        if _session_pool is None:
+            _session_pool = CrewSessionPool(size=int(os.getenv("OPS_CREW_POOL_SIZE", "1")))
+        return _session_pool
+
+
+def _fast_path_tools() -> List:
+    server_params = OpsCrew.mcp_server_params
+    return build_proxy_tools(server_params) or proxy_live_tools(
+        get_mcp_manager().get_tools(server_params), server_params
+    )
+
+
+_fast_path_router: Optional[FastPathRouter] = None
+
+
+def get_fast_path_router() -> Optional[FastPathRouter]:
+    """Returns the shared canned-query router, or None when FAST_PATH=false."""
+    global _fast_path_router
+    if os.getenv("FAST_PATH", "true").lower() != "true":
+        return None
+    with _session_pool_lock:
+        if _fast_path_router is None:
+            _fast_path_router = FastPathRouter(_fast_path_tools)
+        return _fast_path_router
+
+
 def run_crew(user_input: str) -> str:
     """
-    Sets up and runs the Ops crew to process a user's request.
+    Runs the Ops crew on a user's request using a warm pooled session.
+
+    Canned queries such as "list clusters" or "nodes in X" are answered
+    directly by the fast-path router without involving the LLM.
 
     Args:
         user_input: The question or command from the user.
 
     Returns:
         The result from the crew execution.
+
+    Each call is recorded as one request in the metrics (see
+    `ops_crew.metrics`).
     """
-    ops_crew_instance = OpsCrew()
-    main_crew = ops_crew_instance.ops_crew()
-    
-    # Format the task with the user's input
-    task_values = {"user_input": user_input}
-    main_crew.tasks[0].description = main_crew.tasks[0].description.format(**task_values)
-    
-    result = main_crew.kickoff()
-    return str(result)
+    with track_request(user_input):
+        router = get_fast_path_router()
+        if router is not None:
+            with timed("fast_path"):
+                answer = router.try_answer(user_input)
+            if answer is not None:
+                return answer
+
+        result = get_session_pool().run(user_input)
+        return str(result)
+
+
+async def run_crew_async(user_input: str) -> str:
+    """Async variant of `run_crew` for services handling many requests at once."""
+    with track_request(user_input):
+        router = get_fast_path_router()
+        if router is not None:
+            with timed("fast_path"):
+                answer = await asyncio.to_thread(router.try_answer, user_input)
+            if answer is not None:
+                return answer
+
+        result = await get_session_pool().run_async(user_input)
+        return str(result)
+
+
+def run_crew_stream(user_input: str) -> Iterator[StreamEvent]:
+    """
+    Streaming variant of `run_crew`.
+
+    Yields "tool_started"/"tool_finished"/"tool_error" progress events and
+    "token" events carrying pieces of the final answer as the model produces
+    them, then a single "final" event with the complete answer.
+    """
+    with track_request(user_input):
+        router = get_fast_path_router()
+        if router is not None:
+            with timed("fast_path"):
+                answer = router.try_answer(user_input)
+            if answer is not None:
+                yield StreamEvent("final", {"text": answer})
+                return
+
+        yield from get_session_pool().stream(user_input)
 
 
 if __name__ == "__main__":
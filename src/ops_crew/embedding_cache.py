@@ -0,0 +1,313 @@
+import array
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .metrics import current_request, get_metrics_registry, timed
+
+DEFAULT_MAX_ENTRIES = 100_000
+
+CACHE_FILE_NAME = "embedding_cache.db"
+
+# Bound on SQL parameters per statement (SQLite's default limit is 999)
+_QUERY_CHUNK = 500
+
+# Lookups buffer their writes until this many touches are pending or this many seconds have passed
+_TOUCH_BATCH = 256
+_TOUCH_INTERVAL = 30.0
+
+# The entry count is re-read from the database after this many inserts (other processes add entries too)
+_RECOUNT_EVERY = 1000
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS embeddings ("
+    " model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, last_used REAL NOT NULL,"
+    " PRIMARY KEY (model, text_hash)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)",
+    "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _chunks(items: Sequence, size: int = _QUERY_CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class EmbeddingCache:
+    """
+    Content-addressed, SQLite-backed store of embedding vectors.
+
+    Vectors are keyed by (model, SHA-256 of the text) and stored as
+    float32 blobs. The database runs in WAL mode, so several agent
+    processes can share one file. Beyond `max_entries`, the least
+    recently used vectors are evicted. Hit and miss counts are kept for
+    this process (`hits`, `misses`) and also accumulated in the database
+    (`lifetime_*` in `stats()`), which covers every process sharing the
+    file.
+
+    To keep reads and writes cheap, the entry count is tracked in memory
+    and only re-counted when it exceeds `max_entries` (or every
+    `_RECOUNT_EVERY` inserts); eviction then frees a tenth of the capacity
+    at once. Lookups only read: the `last_used` touches of hits and the
+    lifetime counters are buffered and written in one transaction by
+    `flush()`, which runs on every insert, prune, `stats()` and `close()`,
+    and once `_TOUCH_BATCH` touches are pending or `_TOUCH_INTERVAL`
+    seconds have passed.
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._connection.execute(statement)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Entry count as of the last recount plus our inserts since; None until first needed
+        self._entries: Optional[int] = None
+        self._inserts_since_recount = 0
+        self._touched: Dict[Tuple[str, str], float] = {}
+        self._pending_counts: Dict[str, int] = {}
+        self._flushed_at = time.monotonic()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def _count(self, name: str, value: int) -> None:
+        if value:
+            self._pending_counts[name] = self._pending_counts.get(name, 0) + value
+
+    def _flush(self) -> None:
+        if self._touched:
+            self._connection.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                [(used, model, digest) for (model, digest), used in self._touched.items()],
+            )
+            self._touched.clear()
+        if self._pending_counts:
+            self._connection.executemany(
+                "INSERT INTO counters (name, value) VALUES (?, ?)"
+                " ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+                list(self._pending_counts.items()),
+            )
+            self._pending_counts.clear()
+        self._flushed_at = time.monotonic()
+
+    def flush(self) -> None:
+        """Writes the buffered `last_used` touches and lifetime counters."""
+        with self._lock:
+            if self._touched or self._pending_counts:
+                with self._transaction():
+                    self._flush()
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Returns the cached vector of each text, or None where it is not cached."""
+        hashes = [text_hash(text) for text in texts]
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for chunk in _chunks(list(dict.fromkeys(hashes))):
+                rows = self._connection.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? "
+                    f"AND text_hash IN ({','.join('?' * len(chunk))})",
+                    (model, *chunk),
+                ).fetchall()
+                for digest, blob in rows:
+                    found[digest] = array.array("f", blob).tolist()
+            now = time.time()
+            for digest in found:
+                self._touched[(model, digest)] = now
+            hits = sum(digest in found for digest in hashes)
+            self.hits += hits
+            self.misses += len(hashes) - hits
+            self._count("hits", hits)
+            self._count("misses", len(hashes) - hits)
+            if len(self._touched) >= _TOUCH_BATCH or time.monotonic() - self._flushed_at >= _TOUCH_INTERVAL:
+                with self._transaction():
+                    self._flush()
+        return [found.get(digest) for digest in hashes]
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        now = time.time()
+        rows = [(model, text_hash(text), array.array("f", vector).tobytes(), now)
+                for text, vector in zip(texts, vectors)]
+        with self._lock, self._transaction():
+            # Touches first, so eviction sees the current recency
+            self._flush()
+            self._connection.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+            self._evict_if_full(len(rows))
+            self._flush()
+
+    def _evict_if_full(self, inserted: int) -> None:
+        # Replaced rows are counted as inserts too, so the tracked count never falls behind ours
+        self._inserts_since_recount += inserted
+        if self._entries is not None:
+            self._entries += inserted
+            if self._entries <= self.max_entries and self._inserts_since_recount < _RECOUNT_EVERY:
+                return
+        self._entries = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        self._inserts_since_recount = 0
+        if self._entries <= self.max_entries:
+            return
+        # Evict down to 90% of the capacity so the next recount is many inserts away
+        excess = self._entries - (self.max_entries - self.max_entries // 10)
+        self._connection.execute(
+            "DELETE FROM embeddings WHERE (model, text_hash) IN "
+            "(SELECT model, text_hash FROM embeddings ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+        self._entries -= excess
+        self.evictions += excess
+        self._count("evictions", excess)
+
+    def prune(self, unused_since: float, dry_run: bool = False) -> int:
+        """Removes vectors not used since the `unused_since` timestamp; returns how many."""
+        with self._lock, self._transaction():
+            self._flush()
+            if dry_run:
+                return self._connection.execute(
+                    "SELECT COUNT(*) FROM embeddings WHERE last_used < ?", (unused_since,)).fetchone()[0]
+            self._entries = None
+            return self._connection.execute("DELETE FROM embeddings WHERE last_used < ?", (unused_since,)).rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM embeddings")
+            self._connection.execute("DELETE FROM counters")
+            self._touched.clear()
+            self._pending_counts.clear()
+            self._entries = None
+
+    def stats(self) -> Dict[str, Any]:
+        self.flush()
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            counters = dict(self._connection.execute("SELECT name, value FROM counters").fetchall())
+            lookups = self.hits + self.misses
+            lifetime_lookups = counters.get("hits", 0) + counters.get("misses", 0)
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "lifetime_hits": counters.get("hits", 0),
+                "lifetime_misses": counters.get("misses", 0),
+                "lifetime_hit_rate": counters.get("hits", 0) / lifetime_lookups if lifetime_lookups else 0.0,
+                "size_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            }
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._connection.close()
+
+def _report(hits: int, misses: int) -> None:
+    get_metrics_registry().count_cache_lookups("embedding", hits, misses)
+    request = current_request()
+    if request is not None:
+        counts = request.fields.setdefault("embedding_cache", {"hits": 0, "misses": 0})
+        counts["hits"] += hits
+        counts["misses"] += misses
+
+
+def embed_with_cache(
+    cache: EmbeddingCache,
+    model: str,
+    texts: Sequence[str],
+    embed: Callable[[List[str]], Sequence[Sequence[float]]],
+) -> List[List[float]]:
+    """
+    Embeds `texts`, calling `embed` only for texts the cache has not seen.
+
+    Repeated texts within one call are embedded once. Fresh vectors are
+    rounded to float32 like stored ones, so a text embeds identically on a
+    hit and a miss. The `embed` call is timed as the `embedding` phase.
+    """
+    vectors = cache.get_many(model, texts)
+    misses = sum(vector is None for vector in vectors)
+    _report(len(texts) - misses, misses)
+    missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+    if missing:
+        with timed("embedding", model, texts=len(missing)):
+            embedded = [array.array("f", vector).tolist() for vector in embed(missing)]
+        cache.put_many(model, missing, embedded)
+        by_text = dict(zip(missing, embedded))
+        vectors = [vector if vector is not None else by_text[text] for text, vector in zip(texts, vectors)]
+    return vectors
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Returns the shared embedding cache, or None when EMBEDDING_CACHE=false.
+
+    The database lives at EMBEDDING_CACHE_PATH, by default next to CrewAI's
+    memory stores, and holds at most EMBEDDING_CACHE_MAX_ENTRIES vectors
+    (default 100000).
+    """
+    global _cache
+    if os.getenv("EMBEDDING_CACHE", "true").lower() != "true":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            path = os.getenv("EMBEDDING_CACHE_PATH")
+            if not path:
+                from crewai.utilities.paths import db_storage_path
+
+                path = os.path.join(db_storage_path(), CACHE_FILE_NAME)
+            _cache = EmbeddingCache(path, int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES))))
+        return _cache
+
+
+def cached_embedder_config(embedder_config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Wraps a CrewAI embedder config so every embedding goes through the cache.
+
+    The configured provider is still built by CrewAI and only called for
+    cache misses; the config is returned unchanged when the cache is off.
+    """
+    cache = get_embedding_cache()
+    if cache is None:
+        return embedder_config
+
+    from chromadb import Documents, EmbeddingFunction, Embeddings
+    from crewai.utilities.embedding_configurator import EmbeddingConfigurator
+
+    provider = EmbeddingConfigurator().configure_embedder(embedder_config)
+    config = embedder_config.get("config", {})
+    model = ":".join(str(part) for part in (embedder_config.get("provider"), config.get("model"),
+                                              config.get("dimensions")) if part)
+
+    class CachedEmbeddingFunction(EmbeddingFunction):
+        def __init__(self) -> None:
+            pass
+
+        def __call__(self, input: Documents) -> Embeddings:
+            return embed_with_cache(cache, model, list(input), provider)
+
+    return {"provider": "custom", "config": {"embedder": CachedEmbeddingFunction()}}
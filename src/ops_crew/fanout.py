@@ -0,0 +1,92 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from .tool_results import parse_tool_result
+
+DEFAULT_PLAN = ("GET_CLUSTER_INFO", "LIST_NODES", "GET_NODE_METRICS")
+
+_NAME_FIELDS = ("name", "cluster", "clusterName", "id")
+
+
+def cluster_names(list_clusters_result: Any) -> List[str]:
+    """Extracts cluster names from a LIST_CLUSTERS result."""
+    data = parse_tool_result(list_clusters_result)
+    if isinstance(data, dict):
+        lists = [value for value in data.values() if isinstance(value, list)]
+        data = lists[0] if len(lists) == 1 else []
+    if not isinstance(data, list):
+        raise ValueError("LIST_CLUSTERS did not return a list of clusters")
+
+    names = []
+    for item in data:
+        if isinstance(item, str):
+            names.append(item)
+        elif isinstance(item, dict):
+            name = next((item[field] for field in _NAME_FIELDS if item.get(field)), None)
+            if name is not None:
+                names.append(str(name))
+    return names
+
+
+def fan_out(
+    tools: Dict[str, Any],
+    plan: Sequence[str] = DEFAULT_PLAN,
+    clusters: Optional[Sequence[str]] = None,
+    max_parallel: int = 8,
+) -> Dict[str, Any]:
+    """
+    Runs every tool in `plan` against every cluster concurrently.
+
+    `tools` maps tool names to objects with `.run(**arguments)`; each plan
+    tool is called as `tool.run(cluster=<name>)`. When `clusters` is not
+    given, LIST_CLUSTERS is called first. At most `max_parallel` calls are
+    in flight. A failing call is reported under the cluster's `errors`
+    instead of failing the whole fan-out.
+    """
+    started = time.monotonic()
+    unknown = [name for name in plan if name not in tools]
+    if unknown:
+        raise ValueError(f"Unknown tools in plan: {', '.join(unknown)}")
+    if clusters is None:
+        if "LIST_CLUSTERS" not in tools:
+            raise ValueError("No cluster list given and LIST_CLUSTERS is unavailable")
+        clusters = cluster_names(tools["LIST_CLUSTERS"].run())
+
+    calls = [(cluster, tool_name) for cluster in clusters for tool_name in plan]
+    reports = {cluster: {"cluster": cluster, "errors": {}} for cluster in clusters}
+    failed = 0
+
+    def _call(cluster: str, tool_name: str) -> Any:
+        return tools[tool_name].run(cluster=cluster)
+
+    if calls:
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_parallel, len(calls))), thread_name_prefix="cluster-fan-out"
+        ) as executor:
+            # Each call runs in a copy of the caller's context so per-request
+            # accounting (e.g. output token savings) still applies
+            futures = [
+                (cluster, tool_name,
+                 executor.submit(contextvars.copy_context().run, _call, cluster, tool_name))
+                for cluster, tool_name in calls
+            ]
+            for cluster, tool_name, future in futures:
+                try:
+                    result = future.result()
+                    parsed = parse_tool_result(result)
+                    reports[cluster][tool_name] = parsed if parsed is not None else result
+                except Exception as e:
+                    reports[cluster]["errors"][tool_name] = str(e)
+                    failed += 1
+
+    return {
+        "clusters": [reports[cluster] for cluster in clusters],
+        "summary": {
+            "clusters": len(clusters),
+            "calls": len(calls),
+            "failed_calls": failed,
+            "seconds": round(time.monotonic() - started, 3),
+        },
+    }
@@ -0,0 +1,177 @@
+import json
+import re
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from .output_budget import full_output
+from .tool_results import is_error_result, parse_tool_result
+
+# Words that can stand where a cluster name goes but never name one
+# ("nodes in the cluster", "namespaces for every cluster", "describe cluster health")
+_GENERIC_WORDS = (
+    "the", "a", "an", "my", "our", "your", "this", "that", "these", "those", "each", "every", "all", "any",
+    "some", "which", "what", "one", "cluster", "clusters", "k8s", "kubernetes", "health", "status", "state",
+    "info", "information", "detail", "details", "nodes", "namespaces", "current",
+)
+_CLUSTER = (
+    r"(?!(?:" + "|".join(_GENERIC_WORDS) + r")(?![A-Za-z0-9._-]))"
+    r"(?P<cluster>[A-Za-z0-9][A-Za-z0-9._-]*)"
+)
+_LEAD = r"(?:please\s+)?(?:(?:list|show|get|display|what\s+are)(?:\s+me)?(?:\s+all)?(?:\s+the)?\s+)?"
+_ZH_LEAD = r"(?:请)?(?:列出|查看|显示|展示)?(?:一下)?\s*"
+
+
+class Intent(NamedTuple):
+    tool_name: str
+    arguments: Dict[str, str]
+    title: str
+
+
+class _Pattern(NamedTuple):
+    regex: "re.Pattern"
+    tool_name: str
+    title: str
+
+
+def _pattern(regex: str, tool_name: str, title: str) -> _Pattern:
+    return _Pattern(re.compile(regex, re.IGNORECASE), tool_name, title)
+
+
+# Only unambiguous phrasings are listed; anything else goes to the crew
+_PATTERNS = [
+    _pattern(_LEAD + r"(?:k8s\s+|kubernetes\s+)?clusters?", "LIST_CLUSTERS", "Clusters"),
+    _pattern(r"what\s+clusters\s+(?:do\s+we\s+have|are\s+there)", "LIST_CLUSTERS", "Clusters"),
+    _pattern(_ZH_LEAD + r"(?:所有|全部)?(?:的)?(?:k8s|kubernetes)?集群(?:列表)?", "LIST_CLUSTERS", "Clusters"),
+    _pattern(r"(?:有)?哪些集群", "LIST_CLUSTERS", "Clusters"),
+    _pattern(
+        _LEAD + r"namespaces\s+(?:in|of|for|on)\s+(?:the\s+)?(?:cluster\s+)?" + _CLUSTER + r"(?:\s+cluster)?",
+        "LIST_NAMESPACES", "Namespaces in {cluster}",
+    ),
+    _pattern(
+        _LEAD + r"nodes\s+(?:in|of|for|on)\s+(?:the\s+)?(?:cluster\s+)?" + _CLUSTER + r"(?:\s+cluster)?",
+        "LIST_NODES", "Nodes in {cluster}",
+    ),
+    _pattern(
+        r"(?:show|get|describe)\s+(?:cluster\s+)?(?:info|information|details)\s+(?:for|of|on|about)\s+"
+        r"(?:the\s+)?(?:cluster\s+)?" + _CLUSTER + r"(?:\s+cluster)?",
+        "GET_CLUSTER_INFO", "Cluster {cluster}",
+    ),
+    _pattern(r"describe\s+cluster\s+" + _CLUSTER, "GET_CLUSTER_INFO", "Cluster {cluster}"),
+    _pattern(
+        _ZH_LEAD + r"(?:集群\s*)?" + _CLUSTER + r"\s*(?:集群)?\s*(?:的|中的|里的|下的)?\s*(?:所有)?命名空间(?:列表)?",
+        "LIST_NAMESPACES", "Namespaces in {cluster}",
+    ),
+    _pattern(
+        _ZH_LEAD + r"(?:集群\s*)?" + _CLUSTER + r"\s*(?:集群)?\s*(?:的|中的|里的|下的|上的)?\s*(?:所有)?节点(?:列表)?",
+        "LIST_NODES", "Nodes in {cluster}",
+    ),
+    _pattern(
+        _ZH_LEAD + r"(?:集群\s*)?" + _CLUSTER + r"\s*(?:集群)?\s*的?(?:详情|信息|详细信息)",
+        "GET_CLUSTER_INFO", "Cluster {cluster}",
+    ),
+]
+
+
+def match_intent(user_input: str) -> Optional[Intent]:
+    """Returns the single tool call a canned query maps to, or None."""
+    text = user_input.strip().rstrip("?.!。？！ ")
+    for pattern in _PATTERNS:
+        match = pattern.regex.fullmatch(text)
+        if match:
+            arguments = match.groupdict()
+            return Intent(pattern.tool_name, arguments, pattern.title.format(**arguments))
+    return None
+
+
+def _cell(value: Any) -> str:
+    if value is None or value == "":
+        return "-"
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return str(value).replace("|", "\\|").replace("\n", " ")
+
+
+def _rows_table(rows: Sequence[Dict]) -> str:
+    columns: List[str] = []
+    for row in rows:
+        for key in row:
+            if key not in columns:
+                columns.append(key)
+    lines = [
+        "| " + " | ".join(columns) + " |",
+        "| " + " | ".join("---" for _ in columns) + " |",
+    ]
+    for row in rows:
+        lines.append("| " + " | ".join(_cell(row.get(column)) for column in columns) + " |")
+    return "\n".join(lines)
+
+
+def render_table(data: Any) -> Optional[str]:
+    """Renders a tool result as a markdown table, or None if it is not tabular."""
+    if isinstance(data, dict):
+        list_values = [value for value in data.values() if isinstance(value, list)]
+        if len(list_values) == 1 and all(isinstance(row, dict) for row in list_values[0]):
+            data = list_values[0]
+        else:
+            lines = ["| Field | Value |", "| --- | --- |"]
+            lines.extend(f"| {_cell(key)} | {_cell(value)} |" for key, value in data.items())
+            return "\n".join(lines)
+
+    if isinstance(data, list):
+        if not data:
+            return "_No items found._"
+        if all(isinstance(row, dict) for row in data):
+            return _rows_table(data)
+        if all(not isinstance(row, (dict, list)) for row in data):
+            return _rows_table([{"name": row} for row in data])
+    return None
+
+
+class FastPathRouter:
+    """
+    Answers canned queries with one direct MCP call and a local template.
+
+    `tools_provider` returns the MCP tools (anything with `.name` and
+    `.run(**arguments)`); it is called once, on the first matched query.
+    Queries that do not match, tools that fail or return an error, and
+    results that cannot be rendered as a table all return None so the caller
+    falls back to the crew.
+    """
+
+    def __init__(self, tools_provider: Callable[[], Sequence]) -> None:
+        self._tools_provider = tools_provider
+        self._tools: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self.answered = 0
+        self.fell_through = 0
+
+    def _tool(self, tool_name: str) -> Optional[Any]:
+        with self._lock:
+            if self._tools is None:
+                self._tools = {tool.name: tool for tool in self._tools_provider()}
+            return self._tools.get(tool_name)
+
+    def try_answer(self, user_input: str) -> Optional[str]:
+        intent = match_intent(user_input)
+        if intent is None:
+            return None
+
+        answer = None
+        try:
+            tool = self._tool(intent.tool_name)
+            if tool is not None:
+                # The table is for the user, so it shows the complete result
+                with full_output():
+                    result = tool.run(**intent.arguments)
+                # An error (e.g. an unknown cluster) is for the crew to explain, not to tabulate
+                table = None if is_error_result(result) else render_table(parse_tool_result(result))
+                if table is not None:
+                    answer = f"### {intent.title}\n\n{table}"
+        except Exception as e:
+            print(f"⚠️ 快速路径执行失败，转交Agent处理: {e}")
+
+        if answer is None:
+            self.fell_through += 1
+        else:
+            self.answered += 1
+        return answer
@@ -0,0 +1,230 @@
+import io
+import json
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+from .log_templates import TemplateMiner
+
+_TIMESTAMP = re.compile(
+    r"^\s*\[?(?P<ts>\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?)\]? ?"
+)
+_LEVEL = re.compile(
+    r"\b(FATAL|CRITICAL|PANIC|ERROR|ERR|EXCEPTION|SEVERE|WARNING|WARN|INFO|DEBUG|TRACE)\b",
+    re.IGNORECASE,
+)
+# klog-style prefixes such as "E0612 10:00:00.123 ..." or "W0612 ..."
+_KLOG_LEVEL = re.compile(r"^([EWIF])\d{4} \d{2}:\d{2}:\d{2}")
+_JSON_LEVEL = re.compile(r'"(?:level|severity|lvl)"\s*:\s*"(\w+)"', re.IGNORECASE)
+
+_CANONICAL_LEVELS = {
+    "fatal": "ERROR", "critical": "ERROR", "panic": "ERROR", "error": "ERROR", "err": "ERROR",
+    "exception": "ERROR", "severe": "ERROR", "e": "ERROR", "f": "ERROR",
+    "warning": "WARN", "warn": "WARN", "w": "WARN",
+    "info": "INFO", "i": "INFO", "debug": "DEBUG", "trace": "DEBUG",
+}
+
+_TRACE_START = re.compile(
+    r"(Traceback \(most recent call last\):|^panic: |^goroutine \d+ \[|Exception in thread|"
+    r"^\S*(?:Exception|Error)(?::|$))"
+)
+_TRACE_CONTINUATION = re.compile(r"^(\s+|\tat |Caused by: |\.\.\. \d+ more)")
+
+_SEVERITY = {"ERROR": 0, "WARN": 1, "INFO": 2, "DEBUG": 3, None: 4}
+
+
+def parse_level(line: str) -> Optional[str]:
+    """Returns ERROR, WARN, INFO or DEBUG for a log line, or None if unknown."""
+    match = _JSON_LEVEL.search(line) or _KLOG_LEVEL.match(line) or _LEVEL.search(line)
+    if match is None:
+        return None
+    return _CANONICAL_LEVELS.get(match.group(1).lower())
+
+
+def parse_timestamp(line: str) -> Optional[str]:
+    match = _TIMESTAMP.match(line)
+    return match.group("ts") if match else None
+
+
+def _message(line: str) -> str:
+    # Only the separator after the timestamp is dropped; indentation marks trace continuations
+    match = _TIMESTAMP.match(line)
+    return line[match.end():] if match else line
+
+
+class LogDigest:
+    """
+    Streaming summary of pod log lines.
+
+    Lines are fed one at a time and only bounded state is kept: level
+    counts, first/last timestamps, message templates mined with
+    `TemplateMiner` (count, example parameters, first and last occurrence),
+    a few stack traces and the tail of the log. `render()` shows at most
+    `max_templates` templates, errors and warnings first.
+    """
+
+    def __init__(self, max_templates: int = 20, max_traces: int = 3, max_trace_lines: int = 15,
+                 tail_size: int = 5, miner: Optional[TemplateMiner] = None) -> None:
+        self.max_templates = max_templates
+        self.max_traces = max_traces
+        self.max_trace_lines = max_trace_lines
+        self.tail_size = tail_size
+        self.total_lines = 0
+        self.levels: Counter = Counter()
+        self.first_timestamp: Optional[str] = None
+        self.last_timestamp: Optional[str] = None
+        self.miner = miner or TemplateMiner()
+        # Occurrence details per template, keyed by cluster id
+        self.occurrences: Dict[int, Dict[str, Any]] = {}
+        self.traces: List[List[str]] = []
+        self._trace_keys = set()
+        self._current_trace: Optional[List[str]] = None
+        self.tail: List[str] = []
+
+    def _close_trace(self) -> None:
+        trace, self._current_trace = self._current_trace, None
+        # A lone "Error: ..." line is a message, not a stack trace
+        if not trace or len(trace) < 2:
+            return
+        key = trace[-1].strip()
+        if key not in self._trace_keys and len(self.traces) < self.max_traces:
+            self._trace_keys.add(key)
+            self.traces.append(trace[: self.max_trace_lines])
+
+    def _track_template(self, level: Optional[str], message: str, timestamp: Optional[str]) -> None:
+        cluster = self.miner.add(message)
+        if cluster is None:
+            return
+        entry = self.occurrences.get(cluster.cluster_id)
+        if entry is None:
+            entry = self.occurrences[cluster.cluster_id] = {
+                "level": level, "first_line": self.total_lines, "first_seen": timestamp,
+            }
+        elif _SEVERITY[level] < _SEVERITY[entry["level"]]:
+            entry["level"] = level
+        entry["last_line"] = self.total_lines
+        entry["last_seen"] = timestamp
+
+    def feed(self, line: str) -> None:
+        line = line.rstrip("\n")
+        if not line.strip():
+            return
+        self.total_lines += 1
+
+        timestamp = parse_timestamp(line)
+        if timestamp:
+            self.first_timestamp = self.first_timestamp or timestamp
+            self.last_timestamp = timestamp
+
+        message = _message(line)
+        if self._current_trace is not None and _TRACE_CONTINUATION.match(message):
+            self._current_trace.append(message)
+        else:
+            if self._current_trace is not None:
+                # The exception line that ends a Python traceback
+                if self._current_trace[0].startswith("Traceback") and len(self._current_trace) > 1:
+                    self._current_trace.append(message)
+                    self._close_trace()
+                    message = None
+                else:
+                    self._close_trace()
+            if message is not None and _TRACE_START.search(message):
+                self._current_trace = [message]
+
+        level = parse_level(line)
+        if level:
+            self.levels[level] += 1
+        self._track_template(level, _message(line), timestamp)
+
+        self.tail.append(line)
+        if len(self.tail) > self.tail_size:
+            self.tail.pop(0)
+
+    def feed_all(self, lines: Iterable[str]) -> "LogDigest":
+        for line in lines:
+            self.feed(line)
+        return self
+
+    def templates(self) -> List[Dict[str, Any]]:
+        """All mined templates, errors and warnings first, then by count."""
+        templates = [
+            {"template": cluster.template, "count": cluster.size, "examples": cluster.examples,
+             **self.occurrences[cluster.cluster_id]}
+            for cluster in self.miner.clusters
+        ]
+        return sorted(templates, key=lambda entry: (_SEVERITY[entry["level"]], -entry["count"]))
+
+    def summary(self) -> Dict[str, Any]:
+        self._close_trace()
+        templates = self.templates()
+        return {
+            "total_lines": self.total_lines,
+            "levels": dict(self.levels),
+            "time_range": [self.first_timestamp, self.last_timestamp],
+            "templates": templates[: self.max_templates],
+            "other_templates": len(templates) - min(len(templates), self.max_templates),
+            "unclustered_lines": self.miner.unclustered,
+            "stack_traces": self.traces,
+            "tail": self.tail,
+        }
+
+    def render(self) -> str:
+        """Renders the digest as compact text for the agent."""
+        summary = self.summary()
+        levels = ", ".join(f"{level}={count}" for level, count in sorted(summary["levels"].items()))
+        lines = [
+            f"Log digest: {summary['total_lines']} lines"
+            + (f" from {self.first_timestamp} to {self.last_timestamp}" if self.first_timestamp else ""),
+            f"Levels: {levels or 'none detected'}",
+        ]
+        if summary["templates"]:
+            lines.append(f"Message templates ({len(self.miner.clusters)} total, errors and warnings first):")
+            for entry in summary["templates"]:
+                if entry["count"] == 1:
+                    where = f"line {entry['first_line']}" + (f" at {entry['first_seen']}" if entry["first_seen"] else "")
+                else:
+                    where = f"lines {entry['first_line']}-{entry['last_line']}"
+                    if entry["first_seen"]:
+                        where += f", first {entry['first_seen']}, last {entry['last_seen']}"
+                examples = "; ".join(" ".join(parameters) for parameters in entry["examples"])
+                lines.append(
+                    f"- [{entry['level'] or '-'}] x{entry['count']} ({where}): {entry['template'][:300]}"
+                    + (f"  e.g. {examples[:200]}" if examples else "")
+                )
+            if summary["other_templates"]:
+                lines.append(f"- ... {summary['other_templates']} more templates not shown")
+            if summary["unclustered_lines"]:
+                lines.append(f"- ... {summary['unclustered_lines']} lines beyond the template limit")
+        for index, trace in enumerate(summary["stack_traces"], start=1):
+            lines.append(f"Stack trace {index}:")
+            lines.extend(f"    {trace_line}" for trace_line in trace)
+        lines.append("Last lines:")
+        lines.extend(f"    {tail_line}" for tail_line in summary["tail"])
+        return "\n".join(lines)
+
+
+def _log_text(result: Any) -> Optional[str]:
+    """Finds the raw log text in a tool result (plain text or a JSON wrapper)."""
+    text = str(result)
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return text
+    if isinstance(data, dict):
+        for key in ("logs", "log", "content", "output"):
+            if isinstance(data.get(key), str):
+                return data[key]
+    return None
+
+
+def digest_pod_logs(result: Any, min_lines: int = 50) -> Any:
+    """
+    Replaces a large GET_POD_LOGS result with its digest.
+
+    Results shorter than `min_lines` lines, or that are not log text, are
+    returned unchanged.
+    """
+    text = _log_text(result)
+    if text is None or text.count("\n") + 1 < min_lines:
+        return result
+    return LogDigest().feed_all(io.StringIO(text)).render()
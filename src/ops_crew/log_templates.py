@@ -0,0 +1,115 @@
+from typing import Any, Dict, List, Optional
+
+WILDCARD = "<*>"
+
+
+def _has_digit(token: str) -> bool:
+    return any(char.isdigit() for char in token)
+
+
+class LogCluster:
+    """One log template: a token sequence where variable positions are `<*>`."""
+
+    __slots__ = ("cluster_id", "tokens", "size", "examples", "max_examples")
+
+    def __init__(self, cluster_id: int, tokens: List[str], max_examples: int = 3) -> None:
+        self.cluster_id = cluster_id
+        self.tokens = tokens
+        self.size = 0
+        self.examples: List[List[str]] = []
+        self.max_examples = max_examples
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+    def similarity(self, tokens: List[str]) -> float:
+        """Fraction of positions where the template already equals `tokens`."""
+        same = sum(1 for mine, theirs in zip(self.tokens, tokens) if mine == theirs)
+        return same / len(tokens) if tokens else 1.0
+
+    def merge(self, tokens: List[str]) -> None:
+        """Turns every position that differs from `tokens` into a wildcard."""
+        for index, (mine, theirs) in enumerate(zip(self.tokens, tokens)):
+            if mine != theirs:
+                self.tokens[index] = WILDCARD
+
+    def parameters(self, raw_tokens: List[str]) -> List[str]:
+        return [raw for mine, raw in zip(self.tokens, raw_tokens) if mine == WILDCARD]
+
+    def add(self, raw_tokens: List[str]) -> None:
+        self.size += 1
+        if len(self.examples) < self.max_examples:
+            parameters = self.parameters(raw_tokens)
+            if parameters and parameters not in self.examples:
+                self.examples.append(parameters)
+
+
+class TemplateMiner:
+    """
+    Incremental Drain-style log template clusterer.
+
+    Lines are routed through a fixed-depth prefix tree (token count, then
+    the first `depth - 2` tokens) to a short list of candidate clusters and
+    joined to the most similar one when at least `similarity` of the tokens
+    match, otherwise a new cluster is started. Tokens containing digits are
+    treated as variables up front. Memory is bounded: each tree node keeps
+    at most `max_children` children (the rest share a `<*>` branch) and at
+    most `max_clusters` templates are created; lines that would need more
+    are only counted in `unclustered`.
+    """
+
+    def __init__(self, depth: int = 4, similarity: float = 0.4, max_children: int = 100,
+                 max_clusters: int = 1000) -> None:
+        if depth < 3:
+            raise ValueError("depth must be at least 3")
+        self.prefix_depth = depth - 2
+        self.similarity = similarity
+        self.max_children = max_children
+        self.max_clusters = max_clusters
+        self.clusters: List[LogCluster] = []
+        self.unclustered = 0
+        self._root: Dict[Any, Any] = {}
+
+    def _leaf(self, tokens: List[str]) -> List[LogCluster]:
+        node = self._root.setdefault(len(tokens), {})
+        for token in tokens[: self.prefix_depth]:
+            key = WILDCARD if _has_digit(token) else token
+            if key not in node and len(node) >= self.max_children:
+                key = WILDCARD
+            node = node.setdefault(key, {})
+        return node.setdefault(None, [])
+
+    def add(self, message: str) -> Optional[LogCluster]:
+        """Clusters one log message and returns its template (None if over the cap)."""
+        raw_tokens = message.split()
+        tokens = [WILDCARD if _has_digit(token) else token for token in raw_tokens]
+        candidates = self._leaf(tokens)
+
+        best, best_similarity = None, -1.0
+        for cluster in candidates:
+            score = cluster.similarity(tokens)
+            if score > best_similarity:
+                best, best_similarity = cluster, score
+
+        if best is not None and best_similarity >= self.similarity:
+            best.merge(tokens)
+        else:
+            if len(self.clusters) >= self.max_clusters:
+                self.unclustered += 1
+                return None
+            best = LogCluster(len(self.clusters), tokens)
+            self.clusters.append(best)
+            candidates.append(best)
+
+        best.add(raw_tokens)
+        return best
+
+    def stats(self) -> Dict[str, Any]:
+        lines = sum(cluster.size for cluster in self.clusters) + self.unclustered
+        return {
+            "lines": lines,
+            "templates": len(self.clusters),
+            "unclustered": self.unclustered,
+            "compression_ratio": round(lines / len(self.clusters), 2) if self.clusters else 0.0,
+        }
@@ -0,0 +1,213 @@
+import atexit
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional
+
+from .metrics import timed
+
+
+class MCPConnectionManager:
+    """
+    Process-wide owner of MCP server connections.
+
+    Opens exactly one `MCPServerAdapter` (one SSE session) per configured
+    server URL and shares its tools across agents, crews and requests.
+    Adapters are stopped by `close()`, which is registered with `atexit`
+    for the shared instance returned by `get_mcp_manager()`.
+
+    Servers that are not connected yet are connected concurrently, each
+    bounded by `connect_timeout` seconds, so startup costs roughly as much
+    as the slowest server rather than the sum of all of them.
+    """
+
+    def __init__(self, connect_timeout: Optional[float] = None) -> None:
+        self.connect_timeout = connect_timeout if connect_timeout is not None else float(
+            os.getenv("MCP_CONNECT_TIMEOUT", "30")
+        )
+        self._adapters: Dict = {}
+        self._lock = threading.Lock()
+        self._connect_lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self, server_config: Dict):
+        """Opens a new adapter for a single server, raising a helpful error on failure."""
+        from crewai_tools import MCPServerAdapter
+
+        mcp_url = server_config["url"]
+        try:
+            # MCPServerAdapter expects serverparams as a dict
+            # For SSE transport, pass the URL in the dict
+            server_params = {
+                "url": mcp_url,
+                "transport": server_config.get("transport", "sse")
+            }
+            adapter = MCPServerAdapter(server_params)
+            print(f"✅ 成功加载 {len(adapter.tools)} 个MCP工具从 {mcp_url}")
+            return adapter
+
+        except Exception as e:
+            raise RuntimeError(
+                f"❌ 无法连接到MCP服务器: {mcp_url}\n"
+                f"错误: {str(e)}\n\n"
+                "可能的解决方案：\n"
+                "1. 检查MCP服务器是否运行：curl {}/health\n"
+                "2. 验证URL格式是否正确（需要包含协议 http://或https://）\n"
+                "3. 检查网络连接和防火墙设置\n"
+                "4. 查看MCP服务器日志排查问题\n"
+                "5. 尝试重启MCP服务器\n\n"
+                "如果问题持续，请检查：\n"
+                "- MCP服务器版本兼容性\n"
+                "- 服务器配置文件\n"
+                "- 系统资源使用情况".format(mcp_url)
+            ) from e
+
+    def _timed_connect(self, server_config: Dict):
+        with timed("mcp_connect", server_config.get("url")):
+            return self._connect(server_config)
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise RuntimeError("MCP connection manager has been closed")
+
+    def _stop_quietly(self, mcp_url: str, adapter) -> None:
+        try:
+            adapter.stop()
+        except Exception as e:
+            print(f"⚠️ 关闭MCP连接失败 {mcp_url}: {e}")
+
+    def _discard_late_adapter(self, mcp_url: str, future) -> None:
+        """Stops an adapter whose connection finished after its timeout expired."""
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._stop_quietly(mcp_url, future.result())
+
+    def _connect_missing(self, server_params: List[Dict]) -> None:
+        """Connects every configured server that has no adapter yet, in parallel."""
+        with self._lock:
+            self._check_open()
+            missing = []
+            for server_config in server_params:
+                mcp_url = server_config.get("url")
+                if mcp_url and mcp_url not in self._adapters and mcp_url not in (
+                    config["url"] for config in missing
+                ):
+                    missing.append(server_config)
+
+        if not missing:
+            return
+
+        executor = ThreadPoolExecutor(
+            max_workers=len(missing), thread_name_prefix="mcp-connect"
+        )
+        # Connect in copies of the caller's context so the time lands in its request metrics
+        futures = [
+            (config, executor.submit(contextvars.copy_context().run, self._timed_connect, config))
+            for config in missing
+        ]
+        connected = {}
+        first_error = None
+        # All connections start together, so they share a single deadline
+        deadline = time.monotonic() + self.connect_timeout
+        try:
+            for server_config, future in futures:
+                mcp_url = server_config["url"]
+                try:
+                    remaining = max(0.0, deadline - time.monotonic())
+                    connected[mcp_url] = future.result(timeout=remaining)
+                except FutureTimeoutError:
+                    future.add_done_callback(
+                        lambda f, url=mcp_url: self._discard_late_adapter(url, f)
+                    )
+                    first_error = first_error or RuntimeError(
+                        f"❌ 连接MCP服务器超时（{self.connect_timeout:g}s）: {mcp_url}"
+                    )
+                except Exception as e:
+                    first_error = first_error or e
+        finally:
+            # Do not wait for timed-out connections; they clean up after themselves
+            executor.shutdown(wait=False)
+
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._adapters.update(connected)
+
+        if closed:
+            for mcp_url, adapter in connected.items():
+                self._stop_quietly(mcp_url, adapter)
+            self._check_open()
+
+        if first_error is not None:
+            raise first_error
+
+    def get_adapter(self, server_config: Dict):
+        """Returns the shared adapter for a server, connecting on first use."""
+        return self._get_adapters([server_config])[0]
+
+    def _get_adapters(self, server_params: List[Dict]) -> List:
+        with self._connect_lock:
+            self._connect_missing(server_params)
+        with self._lock:
+            self._check_open()
+            return [
+                self._adapters[config["url"]]
+                for config in server_params
+                if config.get("url")
+            ]
+
+    def get_tools(self, server_params: List[Dict]) -> List:
+        """
+        Returns the merged tools of every configured server.
+
+        Ordering is deterministic: servers in configuration order, then each
+        server's tools in the order it lists them. If two servers expose a
+        tool with the same name, the first one wins.
+        """
+        tools = []
+        seen_names = set()
+        for adapter in self._get_adapters(server_params):
+            for tool in adapter.tools:
+                name = getattr(tool, "name", None)
+                if name in seen_names:
+                    print(f"⚠️ 跳过重复的MCP工具: {name}")
+                    continue
+                seen_names.add(name)
+                tools.append(tool)
+        return tools
+
+    def close(self) -> None:
+        """Stops every open adapter. Safe to call more than once."""
+        with self._lock:
+            adapters = list(self._adapters.items())
+            self._adapters.clear()
+            self._closed = True
+
+        for mcp_url, adapter in adapters:
+            self._stop_quietly(mcp_url, adapter)
+
+
+_manager: Optional[MCPConnectionManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_mcp_manager() -> MCPConnectionManager:
+    """Returns the shared connection manager, creating it on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = MCPConnectionManager()
+            atexit.register(_manager.close)
+        return _manager
+
+
+def close_mcp_manager() -> None:
+    """Closes the shared connection manager if one was created."""
+    global _manager
+    with _manager_lock:
+        manager, _manager = _manager, None
+    if manager is not None:
+        manager.close()
@@ -0,0 +1,442 @@
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .batch import percentile
+from .embedding_cache import CACHE_FILE_NAME, EmbeddingCache
+
+DEFAULT_DEDUP_SIMILARITY = 0.98
+
+LONG_TERM_FILE_NAME = "long_term_memory_storage.db"
+CHROMA_FILE_NAME = "chroma.sqlite3"
+
+# Stored vectors (or task descriptions) replayed as queries to time retrieval
+_PROBES = 20
+# Nearest neighbours checked per entry when looking for near-duplicates
+_NEIGHBOURS = 5
+_REBUILD_SUFFIX = "__rebuild"
+_CHUNK = 1000
+
+_SQLITE_SUFFIXES = ("", "-wal", "-shm")
+
+
+def _chunks(items: Sequence, size: int = _CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _file_size(path: str) -> int:
+    return sum(os.path.getsize(path + suffix) for suffix in _SQLITE_SUFFIXES if os.path.exists(path + suffix))
+
+
+def _dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def expired_keys(rows: Sequence[Tuple[Any, float]], now: float, max_age: Optional[float] = None,
+                 max_entries: Optional[int] = None) -> Set[Any]:
+    """
+    Applies age and count retention to `(key, created_at)` rows, oldest first.
+
+    Rows older than `max_age` seconds are expired, and beyond `max_entries`
+    the oldest of the remaining rows are expired too.
+    """
+    expired = set()
+    if max_age is not None:
+        expired = {key for key, created_at in rows if created_at < now - max_age}
+    if max_entries is not None:
+        kept = [key for key, _ in rows if key not in expired]
+        expired.update(kept[:max(0, len(kept) - max_entries)])
+    return expired
+
+
+def near_duplicates(ids: Sequence[str], vectors: Any, neighbours: Sequence[Sequence[str]],
+                    threshold: float) -> Set[str]:
+    """
+    Returns the ids of entries that repeat a newer entry.
+
+    `ids` and `vectors` are ordered oldest first and `neighbours[i]` holds
+    candidate ids close to entry i (e.g. from the vector index). Entries
+    are visited newest first; every older candidate whose cosine similarity
+    with a kept entry reaches `threshold` is dropped, so of each group of
+    near-identical entries only the newest survives.
+    """
+    import numpy as np
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = vectors / np.where(norms == 0, 1, norms)
+    position = {entry_id: index for index, entry_id in enumerate(ids)}
+    dropped: Set[str] = set()
+    for index in range(len(ids) - 1, -1, -1):
+        if ids[index] in dropped:
+            continue
+        for candidate in neighbours[index]:
+            other = position.get(candidate)
+            if other is None or other >= index or candidate in dropped:
+                continue
+            if float(unit[index] @ unit[other]) >= threshold:
+                dropped.add(candidate)
+    return dropped
+
+
+class MemoryMaintenance:
+    """
+    Retention, deduplication and compaction of CrewAI's memory stores.
+
+    Covers every ChromaDB store under `storage_dir` (short-term and entity
+    memory), the long-term memory SQLite table and the embedding cache:
+
+    - retention: entries older than `max_age_days`, then the oldest beyond
+      `max_entries` per collection/table, are deleted
+    - deduplication: of near-identical vector entries (cosine similarity of
+      at least `dedup_similarity`, 0 disables) and of long-term rows with
+      the same task and metadata, only the newest is kept
+    - `vacuum`: checkpoints and VACUUMs every SQLite file
+    - `rebuild_index`: copies each collection into a fresh one, which
+      rebuilds its HNSW index without the deleted entries. The collection
+      id changes, so this needs the agent to be stopped.
+
+    `run()` reports size, entries and median query latency of each store
+    before and after. With `dry_run` nothing is changed; the report shows
+    what would be removed.
+    """
+
+    def __init__(
+        self,
+        storage_dir: str,
+        max_age_days: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        dedup_similarity: float = DEFAULT_DEDUP_SIMILARITY,
+        vacuum: bool = True,
+        rebuild_index: bool = False,
+        dry_run: bool = False,
+    ) -> None:
+        self.storage_dir = storage_dir
+        self.max_age = max_age_days * 86400 if max_age_days is not None else None
+        self.max_entries = max_entries
+        self.dedup_similarity = dedup_similarity
+        self.vacuum = vacuum
+        self.rebuild_index = rebuild_index
+        self.dry_run = dry_run
+        self._probes: Dict[str, List[Any]] = {}
+
+    # ---- discovery ----------------------------------------------------------
+
+    def vector_stores(self) -> List[str]:
+        """Directories holding a ChromaDB store."""
+        return sorted(root for root, _, names in os.walk(self.storage_dir) if CHROMA_FILE_NAME in names)
+
+    def sqlite_files(self) -> List[str]:
+        files = [os.path.join(store, CHROMA_FILE_NAME) for store in self.vector_stores()]
+        files += sorted(os.path.join(self.storage_dir, name) for name in os.listdir(self.storage_dir)
+                        if name.endswith(".db")) if os.path.isdir(self.storage_dir) else []
+        return files
+
+    def _name(self, path: str) -> str:
+        return os.path.relpath(path, self.storage_dir)
+
+    @staticmethod
+    def _client(store: str) -> Any:
+        import chromadb
+        from chromadb.config import Settings
+
+        # Same settings as CrewAI's RAGStorage, so an in-process client for the path is shared
+        return chromadb.PersistentClient(path=store, settings=Settings(allow_reset=True))
+
+    @staticmethod
+    def _collections(client: Any) -> List[Any]:
+        return [client.get_collection(getattr(item, "name", item), embedding_function=None)
+                for item in client.list_collections()]
+
+    # ---- measurements -------------------------------------------------------
+
+    def _time_queries(self, run_query, probes: Iterable[Any]) -> float:
+        latencies = []
+        for probe in probes:
+            started = time.perf_counter()
+            run_query(probe)
+            latencies.append(time.perf_counter() - started)
+        return round(percentile(latencies, 50) * 1000, 3)
+
+    def _measure_vector_store(self, store: str) -> Dict[str, Any]:
+        entries, latencies = 0, []
+        for collection in self._collections(self._client(store)):
+            count = collection.count()
+            entries += count
+            key = f"{store}:{collection.name}"
+            if key not in self._probes:
+                sample = collection.get(limit=_PROBES, include=["embeddings"])["embeddings"]
+                self._probes[key] = [list(vector) for vector in (sample if sample is not None else [])]
+            if count and self._probes[key]:
+                latencies.append(self._time_queries(
+                    lambda vector: collection.query(query_embeddings=[vector], n_results=min(3, count)),
+                    self._probes[key]))
+        return {"size_bytes": _dir_size(store), "entries": entries,
+                "query_ms": max(latencies) if latencies else None}
+
+    def _measure_long_term(self, path: str) -> Dict[str, Any]:
+        with sqlite3.connect(path) as connection:
+            entries = connection.execute("SELECT COUNT(*) FROM long_term_memories").fetchone()[0]
+            if path not in self._probes:
+                self._probes[path] = [row[0] for row in connection.execute(
+                    "SELECT DISTINCT task_description FROM long_term_memories LIMIT ?", (_PROBES,))]
+            # The query CrewAI's long-term memory runs before each task
+            query_ms = self._time_queries(lambda task: connection.execute(
+                "SELECT metadata, datetime, score FROM long_term_memories WHERE task_description = ? "
+                "ORDER BY datetime DESC, score ASC LIMIT 3", (task,)).fetchall(), self._probes[path])
+        return {"size_bytes": _file_size(path), "entries": entries,
+                "query_ms": query_ms if self._probes[path] else None}
+
+    def measure(self) -> Dict[str, Dict[str, Any]]:
+        """Size, entry count and median query latency (ms) of every store."""
+        stores = {self._name(store): self._measure_vector_store(store) for store in self.vector_stores()}
+        long_term = os.path.join(self.storage_dir, LONG_TERM_FILE_NAME)
+        if os.path.exists(long_term):
+            stores[LONG_TERM_FILE_NAME] = self._measure_long_term(long_term)
+        cache = os.path.join(self.storage_dir, CACHE_FILE_NAME)
+        if os.path.exists(cache):
+            embedding_cache = EmbeddingCache(cache)
+            try:
+                entries = embedding_cache.stats()["entries"]
+            finally:
+                embedding_cache.close()
+            stores[CACHE_FILE_NAME] = {"size_bytes": _file_size(cache), "entries": entries, "query_ms": None}
+        return stores
+
+    # ---- maintenance --------------------------------------------------------
+
+    @staticmethod
+    def _created(store: str, collection: Any) -> List[Tuple[str, float]]:
+        # Chroma does not expose insertion times through its API; its SQLite catalog records them
+        with sqlite3.connect(f"file:{os.path.join(store, CHROMA_FILE_NAME)}?mode=ro", uri=True) as connection:
+            return [(entry_id, float(created_at)) for entry_id, created_at in connection.execute(
+                "SELECT e.embedding_id, CAST(strftime('%s', e.created_at) AS REAL) FROM embeddings e "
+                "JOIN segments s ON s.id = e.segment_id WHERE s.collection = ? ORDER BY e.id",
+                (str(collection.id),))]
+
+    def _delete(self, collection: Any, ids: Iterable[str]) -> None:
+        if not self.dry_run:
+            for chunk in _chunks(sorted(ids)):
+                collection.delete(ids=chunk)
+
+    def _rebuild(self, client: Any, collection: Any) -> None:
+        data = collection.get(include=["embeddings", "documents", "metadatas"])
+        fresh = client.create_collection(collection.name + _REBUILD_SUFFIX, metadata=collection.metadata,
+                                         embedding_function=None)
+        for start in range(0, len(data["ids"]), _CHUNK):
+            end = start + _CHUNK
+            fresh.add(ids=data["ids"][start:end], embeddings=list(data["embeddings"][start:end]),
+                      documents=data["documents"][start:end], metadatas=data["metadatas"][start:end])
+        client.delete_collection(collection.name)
+        fresh.modify(name=collection.name)
+
+    @staticmethod
+    def _remove_orphaned_segments(store: str) -> int:
+        # Chroma keeps the HNSW directory of a deleted collection; drop those no segment refers to
+        with sqlite3.connect(f"file:{os.path.join(store, CHROMA_FILE_NAME)}?mode=ro", uri=True) as connection:
+            segments = {row[0] for row in connection.execute("SELECT id FROM segments")}
+        orphans = [name for name in os.listdir(store)
+                   if os.path.isdir(os.path.join(store, name)) and name not in segments]
+        for name in orphans:
+            shutil.rmtree(os.path.join(store, name), ignore_errors=True)
+        return len(orphans)
+
+    def _recover_rebuilds(self, client: Any) -> None:
+        # A rebuild interrupted after deleting the original leaves only the copy behind
+        names = {getattr(item, "name", item) for item in client.list_collections()}
+        for name in names:
+            if name.endswith(_REBUILD_SUFFIX):
+                original = name[:-len(_REBUILD_SUFFIX)]
+                if original in names:
+                    client.delete_collection(name)
+                else:
+                    client.get_collection(name, embedding_function=None).modify(name=original)
+
+    def _maintain_vector_store(self, store: str, now: float) -> Dict[str, Any]:
+        client = self._client(store)
+        if not self.dry_run:
+            self._recover_rebuilds(client)
+        result = {"expired": 0, "duplicates": 0, "rebuilt": False}
+        for collection in self._collections(client):
+            expired = expired_keys(self._created(store, collection), now, self.max_age, self.max_entries)
+            self._delete(collection, expired)
+            result["expired"] += len(expired)
+
+            if self.dedup_similarity > 0 and collection.count() > 1:
+                order = [entry_id for entry_id, _ in self._created(store, collection) if entry_id not in expired]
+                data = collection.get(ids=order, include=["embeddings"])
+                by_id = dict(zip(data["ids"], data["embeddings"]))
+                order = [entry_id for entry_id in order if entry_id in by_id]
+                vectors = [by_id[entry_id] for entry_id in order]
+                neighbours: List[List[str]] = []
+                for chunk in _chunks(vectors):
+                    neighbours += collection.query(query_embeddings=[list(vector) for vector in chunk],
+                                                   n_results=min(_NEIGHBOURS + 1, len(order)), include=[])["ids"]
+                duplicates = near_duplicates(order, vectors, neighbours, self.dedup_similarity)
+                self._delete(collection, duplicates)
+                result["duplicates"] += len(duplicates)
+
+            if self.rebuild_index and not self.dry_run:
+                self._rebuild(client, collection)
+                result["rebuilt"] = True
+        if result["rebuilt"]:
+            self._remove_orphaned_segments(store)
+        return result
+
+    def _maintain_long_term(self, path: str, now: float) -> Dict[str, Any]:
+        with sqlite3.connect(path) as connection:
+            rows = connection.execute(
+                "SELECT id, CAST(datetime AS REAL) FROM long_term_memories ORDER BY id").fetchall()
+            expired = expired_keys(rows, now, self.max_age, self.max_entries)
+            duplicates = {row[0] for row in connection.execute(
+                "SELECT id FROM long_term_memories WHERE id NOT IN "
+                "(SELECT MAX(id) FROM long_term_memories GROUP BY task_description, metadata)")} - expired
+            if not self.dry_run:
+                connection.executemany("DELETE FROM long_term_memories WHERE id = ?",
+                                       [(row_id,) for row_id in expired | duplicates])
+        return {"expired": len(expired), "duplicates": len(duplicates)}
+
+    def _maintain_cache(self, path: str, now: float) -> Dict[str, Any]:
+        cache = EmbeddingCache(path)
+        try:
+            expired = cache.prune(now - self.max_age, dry_run=self.dry_run) if self.max_age is not None else 0
+        finally:
+            cache.close()
+        return {"expired": expired, "duplicates": 0}
+
+    @staticmethod
+    def _vacuum(path: str) -> Optional[str]:
+        try:
+            connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+            try:
+                connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                connection.execute("VACUUM")
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            return str(e)
+        return None
+
+    def run(self) -> Dict[str, Any]:
+        """Runs every maintenance step and returns the before/after report."""
+        started = time.monotonic()
+        now = time.time()
+        before = self.measure()
+        actions: Dict[str, Dict[str, Any]] = {}
+        for store in self.vector_stores():
+            actions[self._name(store)] = self._maintain_vector_store(store, now)
+        long_term = os.path.join(self.storage_dir, LONG_TERM_FILE_NAME)
+        if os.path.exists(long_term):
+            actions[LONG_TERM_FILE_NAME] = self._maintain_long_term(long_term, now)
+        cache = os.path.join(self.storage_dir, CACHE_FILE_NAME)
+        if os.path.exists(cache):
+            actions[CACHE_FILE_NAME] = self._maintain_cache(cache, now)
+        vacuum_errors = {}
+        if self.vacuum and not self.dry_run:
+            for path in self.sqlite_files():
+                error = self._vacuum(path)
+                if error is not None:
+                    vacuum_errors[self._name(path)] = error
+        after = self.measure()
+
+        stores = {
+            name: {"before": before[name], "after": after.get(name, before[name]), **actions.get(name, {})}
+            for name in before
+        }
+        return {
+            "storage_dir": self.storage_dir,
+            "dry_run": self.dry_run,
+            "seconds": round(time.monotonic() - started, 3),
+            "stores": stores,
+            "vacuum_errors": vacuum_errors,
+            "totals": {
+                "size_before": sum(store["before"]["size_bytes"] for store in stores.values()),
+                "size_after": sum(store["after"]["size_bytes"] for store in stores.values()),
+                "expired": sum(store.get("expired", 0) for store in stores.values()),
+                "duplicates": sum(store.get("duplicates", 0) for store in stores.values()),
+            },
+        }
+
+
+def maintenance_from_env(storage_dir: Optional[str] = None, **overrides: Any) -> MemoryMaintenance:
+    """
+    Builds a `MemoryMaintenance` from MEMORY_RETENTION_DAYS,
+    MEMORY_MAX_ENTRIES and MEMORY_DEDUP_SIMILARITY (unset means no age or
+    count limit; similarity defaults to 0.98). The storage directory
+    defaults to CrewAI's memory storage path.
+    """
+    if storage_dir is None:
+        from crewai.utilities.paths import db_storage_path
+
+        storage_dir = db_storage_path()
+    max_age_days = os.getenv("MEMORY_RETENTION_DAYS")
+    max_entries = os.getenv("MEMORY_MAX_ENTRIES")
+    options = {
+        "max_age_days": float(max_age_days) if max_age_days else None,
+        "max_entries": int(max_entries) if max_entries else None,
+        "dedup_similarity": float(os.getenv("MEMORY_DEDUP_SIMILARITY", str(DEFAULT_DEDUP_SIMILARITY))),
+    }
+    options.update(overrides)
+    return MemoryMaintenance(storage_dir, **options)
+
+
+class MaintenanceScheduler:
+    """
+    Runs memory maintenance every `interval` seconds on a daemon thread.
+
+    The index is never rebuilt here, since running sessions hold the
+    collections by id. When background memory writes are on, each run is
+    queued on the memory write queue so it never races a write. The most
+    recent report is kept in `last_report`.
+    """
+
+    def __init__(self, maintenance: MemoryMaintenance, interval: float) -> None:
+        maintenance.rebuild_index = False
+        self.maintenance = maintenance
+        self.interval = interval
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="memory-maintenance", daemon=True)
+
+    def start(self) -> "MaintenanceScheduler":
+        self._thread.start()
+        return self
+
+    def run_once(self) -> None:
+        try:
+            report = self.maintenance.run()
+        except Exception as e:
+            print(f"⚠️ memory 维护失败: {e}")
+            return
+        self.last_report = report
+        totals = report["totals"]
+        print(f"🧹 memory 维护完成: 过期 {totals['expired']} 条, 重复 {totals['duplicates']} 条, "
+              f"{totals['size_before'] / 1e6:.1f}MB -> {totals['size_after'] / 1e6:.1f}MB")
+
+    def _loop(self) -> None:
+        from .memory_writer import get_memory_write_queue
+
+        while not self._stop.wait(self.interval):
+            writer = get_memory_write_queue()
+            if writer is not None:
+                writer.submit(self.run_once, name="maintenance")
+            else:
+                self.run_once()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def start_memory_maintenance() -> Optional[MaintenanceScheduler]:
+    """
+    Starts scheduled maintenance every MEMORY_MAINTENANCE_INTERVAL_HOURS
+    (unset or 0: off) with the retention settings of `maintenance_from_env`.
+    """
+    hours = float(os.getenv("MEMORY_MAINTENANCE_INTERVAL_HOURS", "0") or 0)
+    if hours <= 0 or os.getenv("CREW_MEMORY", "true").lower() != "true":
+        return None
+    return MaintenanceScheduler(maintenance_from_env(), hours * 3600).start()
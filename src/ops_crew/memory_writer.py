@@ -0,0 +1,368 @@
+import atexit
+import collections
+import contextvars
+import copy
+import functools
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .metrics import MEMORY_ATTRIBUTES, get_metrics_registry, timed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 0.05
+DEFAULT_MAX_BATCH = 64
+DEFAULT_QUEUE_DEPTH = 100
+
+# Memory writes CrewAI's agent executor makes once the final answer is ready
+_EXECUTOR_MEMORY_HOOKS = ("_create_short_term_memory", "_create_long_term_memory", "_create_external_memory")
+
+
+def _is_vector_storage(storage: Any) -> bool:
+    # CrewAI's RAGStorage (short-term and entity memory); long-term memory is plain SQLite
+    return hasattr(storage, "collection") and hasattr(storage, "_generate_embedding")
+
+
+class MemoryWriteBatcher:
+    """
+    Batches memory writes so their texts are embedded in one request.
+
+    CrewAI saves each memory item on its own, and each save embeds its text
+    with a separate call to the embeddings endpoint: one for the short-term
+    item and one per extracted entity. Once attached to a crew, saves to its
+    vector stores are buffered instead. The buffer is written out when it
+    holds `max_batch` items, `window` seconds after its first item, on
+    `flush()`, or before a search of a store with pending items. Each flush
+    embeds all buffered texts with a single call per embedding function and
+    adds them to their collections with the precomputed vectors.
+
+    As with CrewAI's own saves, a failed write is logged and dropped.
+    """
+
+    def __init__(self, window: float = DEFAULT_WINDOW, max_batch: int = DEFAULT_MAX_BATCH) -> None:
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[Tuple[Any, str, Dict[str, Any]]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self.batches = 0
+        self.items = 0
+        self.embed_calls = 0
+        self.failed = 0
+
+    def attach(self, crew: Any) -> int:
+        """Routes saves of the crew's vector-backed memory stores through the batcher."""
+        attached = 0
+        for attribute in MEMORY_ATTRIBUTES:
+            storage = getattr(getattr(crew, attribute, None), "storage", None)
+            if not _is_vector_storage(storage) or getattr(storage.save, "__ops_crew_batched__", False):
+                continue
+            self._shadow(storage)
+            attached += 1
+        return attached
+
+    def _shadow(self, storage: Any) -> None:
+        search = storage.search
+
+        def save(value: Any, metadata: Dict[str, Any]) -> None:
+            self.add(storage, value, metadata)
+
+        def search_after_flush(*args: Any, **kwargs: Any) -> Any:
+            if self.pending_for(storage):
+                self.flush()
+            return search(*args, **kwargs)
+
+        save.__ops_crew_batched__ = True
+        storage.save = save
+        storage.search = search_after_flush
+
+    def add(self, storage: Any, value: Any, metadata: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._pending.append((storage, str(value), metadata or {}))
+            full = len(self._pending) >= self.max_batch
+            if not full and self._timer is None:
+                # The window flush runs in the saving request's context, so it is attributed to it
+                context = contextvars.copy_context()
+                self._timer = threading.Timer(self.window, context.run, (self.flush,))
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def pending_for(self, storage: Any) -> bool:
+        with self._lock:
+            return any(item[0] is storage for item in self._pending)
+
+    def flush(self) -> int:
+        """Writes out every buffered item; returns how many were buffered."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not pending:
+                return 0
+            with timed("memory_write", "batch", items=len(pending)):
+                groups: Dict[int, List[Tuple[Any, str, Dict[str, Any]]]] = {}
+                for item in pending:
+                    groups.setdefault(id(item[0].embedder_config), []).append(item)
+                for items in groups.values():
+                    self._write(items)
+            self.batches += 1
+            self.items += len(pending)
+            return len(pending)
+
+    def _write(self, items: List[Tuple[Any, str, Dict[str, Any]]]) -> None:
+        texts = list(dict.fromkeys(text for _, text, _ in items))
+        try:
+            self.embed_calls += 1
+            by_text = dict(zip(texts, items[0][0].embedder_config(texts)))
+        except Exception as e:
+            self.failed += len(items)
+            logger.error(f"Error embedding {len(items)} memory items: {e}")
+            return
+        by_storage: Dict[int, List[Tuple[Any, str, Dict[str, Any]]]] = {}
+        for item in items:
+            by_storage.setdefault(id(item[0]), []).append(item)
+        for batch in by_storage.values():
+            storage = batch[0][0]
+            try:
+                storage.collection.add(
+                    documents=[text for _, text, _ in batch],
+                    metadatas=[metadata for _, _, metadata in batch],
+                    ids=[str(uuid.uuid4()) for _ in batch],
+                    embeddings=[by_text[text] for _, text, _ in batch],
+                )
+            except Exception as e:
+                self.failed += len(batch)
+                logger.error(f"Error during {getattr(storage, 'type', 'memory')} save: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "batches": self.batches,
+            "items": self.items,
+            "embed_calls": self.embed_calls,
+            "failed": self.failed,
+        }
+
+
+def batch_memory_writes(crew: Any) -> Optional[MemoryWriteBatcher]:
+    """
+    Attaches a write batcher to the crew's memory, or returns None when
+    MEMORY_WRITE_BATCH=false or the crew has no vector-backed memory.
+
+    MEMORY_BATCH_WINDOW_MS (default 50) and MEMORY_BATCH_MAX (default 64)
+    bound how long and how many items are buffered before a flush.
+    """
+    if os.getenv("MEMORY_WRITE_BATCH", "true").lower() != "true":
+        return None
+    batcher = MemoryWriteBatcher(
+        window=float(os.getenv("MEMORY_BATCH_WINDOW_MS", str(DEFAULT_WINDOW * 1000))) / 1000,
+        max_batch=int(os.getenv("MEMORY_BATCH_MAX", str(DEFAULT_MAX_BATCH))),
+    )
+    return batcher if batcher.attach(crew) else None
+
+
+class MemoryWriteQueue:
+    """
+    Runs memory writes on a background thread, off the response path.
+
+    Jobs run one at a time in submission order, outside any request's
+    metrics context. At most `max_depth` jobs wait; `submit` blocks while
+    the queue is full, so a writer that falls behind slows requests down
+    instead of growing without bound. `lag()` is how long the oldest
+    unfinished job has been waiting, and the time from submission to
+    completion of each job is observed as the `memory_write_lag` phase.
+    Once closed, jobs run inline in the submitting thread.
+    """
+
+    def __init__(self, max_depth: int = DEFAULT_QUEUE_DEPTH) -> None:
+        self.max_depth = max_depth
+        self._jobs: "queue.Queue[Optional[Tuple[float, str, Callable[[], Any]]]]" = queue.Queue(max_depth)
+        self._submitted_at: Deque[float] = collections.deque()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_lag = 0.0
+
+    def submit(self, job: Callable[[], Any], name: str = "memory") -> None:
+        with self._lock:
+            closed = self._closed
+            if not closed and self._thread is None:
+                self._thread = threading.Thread(target=self._work, name="memory-writer", daemon=True)
+                self._thread.start()
+        if closed:
+            self._run(name, job)
+            return
+        submitted_at = time.monotonic()
+        with self._lock:
+            self._submitted_at.append(submitted_at)
+            self.submitted += 1
+        self._jobs.put((submitted_at, name, job))
+
+    def _run(self, name: str, job: Callable[[], Any]) -> bool:
+        try:
+            contextvars.Context().run(job)
+            return True
+        except Exception as e:
+            logger.error(f"Memory write {name} failed: {e}")
+            return False
+
+    def _work(self) -> None:
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                self._jobs.task_done()
+                return
+            submitted_at, name, job = item
+            ok = self._run(name, job)
+            lag = time.monotonic() - submitted_at
+            get_metrics_registry().observe("memory_write_lag", lag)
+            with self._lock:
+                if self._submitted_at:
+                    self._submitted_at.popleft()
+                self.completed += 1
+                if not ok:
+                    self.failed += 1
+                self.max_lag = max(self.max_lag, lag)
+            self._jobs.task_done()
+
+    def depth(self) -> int:
+        """Jobs submitted (or waiting to be) but not finished yet."""
+        with self._lock:
+            return len(self._submitted_at)
+
+    def lag(self) -> float:
+        with self._lock:
+            return time.monotonic() - self._submitted_at[0] if self._submitted_at else 0.0
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits for every submitted job; returns False if `timeout` expired first."""
+        with self._jobs.all_tasks_done:
+            return self._jobs.all_tasks_done.wait_for(lambda: not self._jobs.unfinished_tasks, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Flushes pending jobs and stops the worker thread."""
+        flushed = self.flush(timeout)
+        with self._lock:
+            self._closed, thread = True, self._thread
+        if thread is not None and flushed:
+            self._jobs.put(None)
+            thread.join(timeout)
+        return flushed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            depth = len(self._submitted_at)
+            lag = time.monotonic() - self._submitted_at[0] if self._submitted_at else 0.0
+            return {
+                "depth": depth,
+                "max_depth": self.max_depth,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "lag_seconds": lag,
+                "max_lag_seconds": self.max_lag,
+            }
+
+
+def _deferred_hook(writer: MemoryWriteQueue, method: Callable, executor: Any, llm: Any) -> Callable:
+    def hook(output: Any) -> None:
+        # The task template is re-interpolated by the next request and the agent's LLM may be
+        # streaming by the time the job runs, so the job works on a snapshot of both
+        state = SimpleNamespace(
+            crew=executor.crew,
+            agent=SimpleNamespace(role=executor.agent.role, llm=llm),
+            task=copy.copy(executor.task),
+            _printer=executor._printer,
+        )
+        writer.submit(functools.partial(method, state, output), name=method.__name__.strip("_"))
+
+    return hook
+
+
+def defer_memory_writes(crew: Any, writer: MemoryWriteQueue) -> int:
+    """
+    Hands the memory writes of the crew's agents to `writer`.
+
+    CrewAI writes short-term, long-term and entity memory (including the
+    LLM-based task evaluation that extracts entities) in the agent
+    executor before `kickoff()` returns. Each agent's executor is patched
+    when it is created, so these writes are submitted as background jobs
+    instead. Returns the number of agents patched.
+    """
+    patched = 0
+    for agent in getattr(crew, "agents", None) or []:
+        create = agent.create_agent_executor
+        if getattr(create, "__ops_crew_deferred__", False):
+            continue
+        # Task evaluation gets its own non-streaming LLM handle, so it never feeds a streamed answer
+        llm = copy.copy(agent.llm)
+        if hasattr(llm, "stream"):
+            llm.stream = False
+
+        def create_agent_executor(*args: Any, _create: Callable = create, _agent: Any = agent,
+                                  _llm: Any = llm, **kwargs: Any) -> Any:
+            result = _create(*args, **kwargs)
+            executor = _agent.agent_executor
+            for name in _EXECUTOR_MEMORY_HOOKS:
+                method = getattr(type(executor), name, None)
+                if method is not None:
+                    setattr(executor, name, _deferred_hook(writer, method, executor, _llm))
+            return result
+
+        create_agent_executor.__ops_crew_deferred__ = True
+        # Agents are pydantic models; bypass field validation to shadow the method
+        object.__setattr__(agent, "create_agent_executor", create_agent_executor)
+        patched += 1
+    return patched
+
+
+_writer: Optional[MemoryWriteQueue] = None
+_writer_lock = threading.Lock()
+
+
+def get_memory_write_queue() -> Optional[MemoryWriteQueue]:
+    """
+    Returns the shared background memory writer, or None when
+    MEMORY_ASYNC_WRITES=false.
+
+    At most MEMORY_WRITE_QUEUE_DEPTH jobs (default 100) wait at a time.
+    The queue is flushed at interpreter exit, and its depth and lag are
+    exported as the `ops_crew_memory_write_queue_depth` and
+    `ops_crew_memory_write_lag_seconds` gauges.
+    """
+    global _writer
+    if os.getenv("MEMORY_ASYNC_WRITES", "true").lower() != "true":
+        return None
+    with _writer_lock:
+        if _writer is None:
+            _writer = MemoryWriteQueue(int(os.getenv("MEMORY_WRITE_QUEUE_DEPTH", str(DEFAULT_QUEUE_DEPTH))))
+            registry = get_metrics_registry()
+            registry.register_gauge("memory_write_queue_depth",
+                                    "Memory write jobs not yet finished.", _writer.depth)
+            registry.register_gauge("memory_write_lag_seconds",
+                                    "Age of the oldest unfinished memory write job.", _writer.lag)
+            atexit.register(_writer.close)
+        return _writer
+
+
+def close_memory_write_queue(timeout: Optional[float] = None) -> bool:
+    """Flushes and stops the shared memory writer if one was created."""
+    with _writer_lock:
+        writer = _writer
+    return writer.close(timeout) if writer is not None else True
@@ -0,0 +1,444 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from . import tracing
+
+# Request phases with a latency histogram each
+PHASES = (
+    "request",
+    "fast_path",
+    "crew_construction",
+    "mcp_connect",
+    "tool_call",
+    "llm_call",
+    "memory_read",
+    "memory_write",
+    "embedding",
+)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+TOKEN_TYPES = ("prompt", "completion", "cached_prompt")
+
+# Phases that call out of the process, traced as CLIENT spans
+_CLIENT_PHASES = ("mcp_connect", "tool_call", "llm_call", "embedding")
+
+# Crew attributes holding memory stores whose reads and writes are timed
+MEMORY_ATTRIBUTES = ("_short_term_memory", "_long_term_memory", "_entity_memory", "_user_memory",
+                      "_external_memory")
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus layout."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class MetricsRegistry:
+    """Process-wide phase histograms and token/request counters."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self._buckets = buckets
+        self.histograms: Dict[str, Histogram] = {}
+        self.tokens: Dict[str, int] = dict.fromkeys(TOKEN_TYPES, 0)
+        self.requests: Dict[str, int] = defaultdict(int)
+        self.tool_calls: Dict[str, int] = defaultdict(int)
+        self.cache_lookups: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.histograms.get(phase)
+            if histogram is None:
+                histogram = self.histograms[phase] = Histogram(self._buckets)
+            histogram.observe(seconds)
+
+    def add_tokens(self, **counts: int) -> None:
+        with self._lock:
+            for token_type, count in counts.items():
+                self.tokens[token_type] = self.tokens.get(token_type, 0) + count
+
+    def count_request(self, status: str) -> None:
+        with self._lock:
+            self.requests[status] += 1
+
+    def count_tool_call(self, tool_name: str) -> None:
+        with self._lock:
+            self.tool_calls[tool_name] += 1
+
+    def count_cache_lookups(self, cache: str, hits: int, misses: int) -> None:
+        with self._lock:
+            self.cache_lookups[cache, "hit"] += hits
+            self.cache_lookups[cache, "miss"] += misses
+
+    def register_gauge(self, name: str, help_text: str, read: Callable[[], float]) -> None:
+        """Exposes `ops_crew_<name>` as a gauge whose value is read at scrape time."""
+        with self._lock:
+            self.gauges[name] = (help_text, read)
+
+    def render_prometheus(self) -> str:
+        """Renders all metrics in the Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            lines = [
+                "# HELP ops_crew_phase_seconds Wall time spent per request phase.",
+                "# TYPE ops_crew_phase_seconds histogram",
+            ]
+            for phase in sorted(self.histograms, key=lambda name: (name not in PHASES, name)):
+                histogram = self.histograms[phase]
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    lines.append(f"ops_crew_phase_seconds_bucket{_labels(phase=phase, le=f'{bound:g}')} {count}")
+                lines.append(f"ops_crew_phase_seconds_bucket{_labels(phase=phase, le='+Inf')} {histogram.count}")
+                lines.append(f"ops_crew_phase_seconds_sum{_labels(phase=phase)} {histogram.sum:.6f}")
+                lines.append(f"ops_crew_phase_seconds_count{_labels(phase=phase)} {histogram.count}")
+
+            lines += [
+                "# HELP ops_crew_llm_tokens_total LLM tokens used, by type.",
+                "# TYPE ops_crew_llm_tokens_total counter",
+            ]
+            lines += [f"ops_crew_llm_tokens_total{_labels(type=token_type)} {count}"
+                      for token_type, count in sorted(self.tokens.items())]
+
+            lines += [
+                "# HELP ops_crew_requests_total Requests handled, by outcome.",
+                "# TYPE ops_crew_requests_total counter",
+            ]
+            lines += [f"ops_crew_requests_total{_labels(status=status)} {count}"
+                      for status, count in sorted(self.requests.items())]
+
+            lines += [
+                "# HELP ops_crew_tool_calls_total MCP tool calls, by tool.",
+                "# TYPE ops_crew_tool_calls_total counter",
+            ]
+            lines += [f"ops_crew_tool_calls_total{_labels(tool=tool)} {count}"
+                      for tool, count in sorted(self.tool_calls.items())]
+
+            lines += [
+                "# HELP ops_crew_cache_lookups_total Cache lookups, by cache and result.",
+                "# TYPE ops_crew_cache_lookups_total counter",
+            ]
+            lines += [f"ops_crew_cache_lookups_total{_labels(cache=cache, result=result)} {count}"
+                      for (cache, result), count in sorted(self.cache_lookups.items())]
+
+            for name, (help_text, read) in sorted(self.gauges.items()):
+                lines += [
+                    f"# HELP ops_crew_{name} {help_text}",
+                    f"# TYPE ops_crew_{name} gauge",
+                    f"ops_crew_{name} {read():g}",
+                ]
+        return "\n".join(lines) + "\n"
+
+
+class RequestMetrics:
+    """Timeline of one request: every timed phase plus LLM token counts."""
+
+    def __init__(self, user_input: str = "") -> None:
+        self.request_id = uuid.uuid4().hex[:12]
+        self.user_input = user_input
+        self.started_at = datetime.now().isoformat()
+        self._started = time.monotonic()
+        self.events: List[Dict[str, Any]] = []
+        self.tokens: Dict[str, int] = dict.fromkeys(TOKEN_TYPES, 0)
+        self.fields: Dict[str, Any] = {}
+        # Object exposing the agent's running token totals, see `bind_token_counter`
+        self.token_counter: Any = None
+        self._llm_calls: Dict[int, Tuple[float, Dict[str, int]]] = {}
+        self._lock = threading.Lock()
+
+    def add_event(self, phase: str, seconds: float, name: Optional[str] = None, **fields: Any) -> None:
+        event = {"phase": phase, "seconds": round(seconds, 6),
+                 "offset": round(time.monotonic() - self._started - seconds, 6)}
+        if name is not None:
+            event["name"] = name
+        event.update(fields)
+        with self._lock:
+            self.events.append(event)
+
+    def add_tokens(self, **counts: int) -> None:
+        with self._lock:
+            for token_type, count in counts.items():
+                self.tokens[token_type] = self.tokens.get(token_type, 0) + count
+
+    def phase_totals(self) -> Dict[str, Dict[str, float]]:
+        totals: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            for event in self.events:
+                total = totals.setdefault(event["phase"], {"count": 0, "seconds": 0.0})
+                total["count"] += 1
+                total["seconds"] = round(total["seconds"] + event["seconds"], 6)
+        return totals
+
+    def to_record(self, status: str, wall_seconds: float, error: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "request_id": self.request_id,
+            "started_at": self.started_at,
+            "input": self.user_input[:200],
+            "status": status,
+            "error": error,
+            "wall_seconds": round(wall_seconds, 6),
+            "phases": self.phase_totals(),
+            "tokens": dict(self.tokens),
+            **self.fields,
+            "events": list(self.events),
+        }
+
+
+_registry = MetricsRegistry()
+_current_request: "contextvars.ContextVar[Optional[RequestMetrics]]" = contextvars.ContextVar(
+    "ops_crew_request_metrics", default=None
+)
+_log_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _registry
+
+
+def current_request() -> Optional[RequestMetrics]:
+    return _current_request.get()
+
+
+def record(phase: str, seconds: float, name: Optional[str] = None, **fields: Any) -> None:
+    """Observes a phase duration and adds it to the current request's timeline, if any."""
+    _registry.observe(phase, seconds)
+    if phase == "tool_call" and name is not None:
+        _registry.count_tool_call(name)
+    request = _current_request.get()
+    if request is not None:
+        request.add_event(phase, seconds, name, **fields)
+
+
+def annotate(**fields: Any) -> None:
+    """Adds extra top-level fields to the current request's log record."""
+    request = _current_request.get()
+    if request is not None:
+        request.fields.update(fields)
+
+
+@contextmanager
+def timed(phase: str, name: Optional[str] = None, **fields: Any) -> Iterator[None]:
+    """
+    Times the `with` block as one `phase` event; failures are recorded with `error=True`.
+
+    The block is also traced as a span named after the phase when tracing
+    is enabled.
+    """
+    started = time.monotonic()
+    attributes = {"ops_crew.name": name} if name is not None else {}
+    try:
+        with tracing.span(phase, "CLIENT" if phase in _CLIENT_PHASES else "INTERNAL", **attributes):
+            yield
+    except BaseException:
+        record(phase, time.monotonic() - started, name, error=True, **fields)
+        raise
+    record(phase, time.monotonic() - started, name, **fields)
+
+
+def _write_log(entry: Dict[str, Any]) -> None:
+    path = os.getenv("METRICS_LOG")
+    if not path:
+        return
+    line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with _log_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+    except OSError as e:
+        print(f"⚠️ 写入指标日志失败 {path}: {e}")
+
+
+@contextmanager
+def track_request(user_input: str = "") -> Iterator[RequestMetrics]:
+    """
+    Collects the per-request timeline of the `with` block.
+
+    On exit the request's wall time is observed, and when METRICS_LOG is
+    set a JSON line with the phase totals, token counts and all events is
+    appended to that file.
+    """
+    request = RequestMetrics(user_input)
+    token = _current_request.set(request)
+    status, error = "ok", None
+    try:
+        with tracing.span("request", **{"ops_crew.request_id": request.request_id,
+                                        "ops_crew.input": user_input[:200]}):
+            yield request
+    except BaseException as e:
+        status, error = "error", str(e) or type(e).__name__
+        raise
+    finally:
+        _current_request.reset(token)
+        wall_seconds = time.monotonic() - request._started
+        _registry.observe("request", wall_seconds)
+        _registry.count_request(status)
+        _write_log(request.to_record(status, wall_seconds, error))
+
+
+# ---- CrewAI integration -----------------------------------------------------
+
+
+def bind_token_counter(agent: Any) -> None:
+    """Lets the current request attribute LLM token usage using the agent's token totals."""
+    request = _current_request.get()
+    if request is not None:
+        request.token_counter = getattr(agent, "_token_process", None)
+
+
+def _token_totals(counter: Any) -> Dict[str, int]:
+    if counter is None:
+        return {}
+    try:
+        summary = counter.get_summary()
+    except Exception:
+        return {}
+    return {
+        "prompt": getattr(summary, "prompt_tokens", 0) or 0,
+        "completion": getattr(summary, "completion_tokens", 0) or 0,
+        "cached_prompt": getattr(summary, "cached_prompt_tokens", 0) or 0,
+    }
+
+
+def _llm_call_started(source: Any) -> None:
+    request = _current_request.get()
+    if request is not None:
+        with request._lock:
+            request._llm_calls[threading.get_ident()] = (
+                time.monotonic(),
+                _token_totals(request.token_counter),
+                tracing.start_llm_span(getattr(source, "model", None)),
+            )
+
+
+def _llm_call_finished(source: Any, failed: bool = False) -> None:
+    request = _current_request.get()
+    if request is None:
+        return
+    with request._lock:
+        started = request._llm_calls.pop(threading.get_ident(), None)
+    if started is None:
+        return
+    started_at, tokens_before, llm_span = started
+    tokens_after = _token_totals(request.token_counter)
+    used = {token_type: max(0, tokens_after.get(token_type, 0) - tokens_before.get(token_type, 0))
+            for token_type in TOKEN_TYPES}
+    request.add_tokens(**used)
+    _registry.add_tokens(**used)
+    tracing.end_span(llm_span, error=failed, **{"llm.tokens": used})
+    fields = {"error": True} if failed else {}
+    record("llm_call", time.monotonic() - started_at, getattr(source, "model", None), tokens=used, **fields)
+
+
+_handlers_registered = False
+_handlers_lock = threading.Lock()
+
+
+def register_llm_handlers() -> None:
+    """Subscribes once to CrewAI's event bus to time LLM calls of tracked requests."""
+    global _handlers_registered
+    with _handlers_lock:
+        if _handlers_registered:
+            return
+        _handlers_registered = True
+
+    from crewai.utilities.events import (
+        LLMCallCompletedEvent,
+        LLMCallFailedEvent,
+        LLMCallStartedEvent,
+        crewai_event_bus,
+    )
+
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def _on_llm_started(source, event):
+        _llm_call_started(source)
+
+    @crewai_event_bus.on(LLMCallCompletedEvent)
+    def _on_llm_completed(source, event):
+        _llm_call_finished(source)
+
+    @crewai_event_bus.on(LLMCallFailedEvent)
+    def _on_llm_failed(source, event):
+        _llm_call_finished(source, failed=True)
+
+
+def _timed_method(method: Callable, phase: str, name: str) -> Callable:
+    @functools.wraps(method)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with timed(phase, name):
+            return method(*args, **kwargs)
+
+    wrapper.__ops_crew_timed__ = True
+    return wrapper
+
+
+def instrument_memory(crew: Any) -> None:
+    """Times `search` (memory_read) and `save` (memory_write) of the crew's memory stores."""
+    for attribute in MEMORY_ATTRIBUTES:
+        memory = getattr(crew, attribute, None)
+        if memory is None:
+            continue
+        name = attribute.strip("_")
+        for method_name, phase in (("search", "memory_read"), ("save", "memory_write")):
+            method = getattr(memory, method_name, None)
+            if method is None or getattr(method, "__ops_crew_timed__", False):
+                continue
+            # Memory stores are pydantic models; bypass field validation to shadow the method
+            object.__setattr__(memory, method_name, _timed_method(method, phase, name))
+
+
+# ---- Prometheus endpoint ----------------------------------------------------
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = _registry.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def start_metrics_server(host: str = "127.0.0.1", port: int = 9464) -> ThreadingHTTPServer:
+    """Serves GET /metrics from a daemon thread, for the interactive CLI."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,254 @@
+import asyncio
+import hashlib
+import json
+import math
+import re
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .mock_mcp import STREAM_HEAD, http_chunk, http_response, read_request
+from .output_budget import estimate_tokens
+
+DEFAULT_EMBEDDING_DIMENSIONS = 1024
+
+DEFAULT_ANSWER = "Final Answer: Benchmark answer after {steps} tool calls."
+
+# Prompts CrewAI sends after a task to score it for long-term memory
+_EVALUATION_MARKERS = ("Assess the quality of the task completed", "TaskEvaluation")
+
+Plan = List[Tuple[str, Dict[str, Any]]]
+
+
+def hash_embedding(text: str, dimensions: int = DEFAULT_EMBEDDING_DIMENSIONS) -> List[float]:
+    """Deterministic bag-of-words embedding: each word hashes into one normalized dimension."""
+    vector = [0.0] * dimensions
+    for word in re.findall(r"\w+", str(text).lower()):
+        vector[int(hashlib.sha256(word.encode("utf-8")).hexdigest()[:8], 16) % dimensions] += 1.0
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content or "")
+
+
+class ChatScript:
+    """
+    Deterministic agent replies following a per-query tool plan.
+
+    `plans` maps a query (matched as a substring of the prompt) to the
+    tool calls the agent should make, in order. Each reply looks at how
+    many tool results the conversation already holds and asks for the
+    next call of the plan, then gives a final answer once the plan is
+    done. Tool calls are written in CrewAI's ReAct text format, or as
+    OpenAI `tool_calls` when the request offers that tool as a function.
+    Task-evaluation prompts (long-term memory) get a valid evaluation.
+    """
+
+    def __init__(self, plans: Optional[Dict[str, Sequence]] = None,
+                 answer: str = DEFAULT_ANSWER) -> None:
+        self.plans: Dict[str, Plan] = {
+            query: [(step[0], dict(step[1])) for step in plan] for query, plan in (plans or {}).items()
+        }
+        self.answer = answer
+
+    @classmethod
+    def from_file(cls, path: str) -> "ChatScript":
+        """Loads `{"plans": {"<query>": [["TOOL", {args}], ...]}, "answer": "..."}`."""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("plans", {}), data.get("answer", DEFAULT_ANSWER))
+
+    def plan_for(self, prompt: str) -> Plan:
+        for query, plan in self.plans.items():
+            if query in prompt:
+                return plan
+        return []
+
+    @staticmethod
+    def _entities(plan: Plan) -> List[Dict[str, Any]]:
+        # One entity per resource the plan touched, so memory writes scale with the answer like real ones
+        entities: Dict[str, Dict[str, Any]] = {}
+        for tool_name, arguments in plan:
+            for kind, name in arguments.items():
+                if isinstance(name, str) and name not in entities:
+                    entities[name] = {"name": name, "type": kind, "description": f"{kind} inspected with {tool_name}",
+                                      "relationships": []}
+        return list(entities.values())
+
+    def reply(self, messages: Any, tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Returns the assistant message: `{"content": ..., "tool_calls": [...] or None}`."""
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        prompt = "\n".join(_content_text(message.get("content")) for message in messages)
+        if any(marker in prompt for marker in _EVALUATION_MARKERS):
+            evaluation = {"suggestions": ["Reuse cluster names from memory"], "quality": 8,
+                          "entities": self._entities(self.plan_for(prompt))}
+            return {"content": json.dumps(evaluation), "tool_calls": None}
+
+        assistant_text = "\n".join(
+            _content_text(message.get("content")) for message in messages if message.get("role") == "assistant"
+        )
+        steps_done = len(re.findall(r"^Observation:", assistant_text, flags=re.MULTILINE)) + sum(
+            message.get("role") == "tool" for message in messages
+        )
+        plan = self.plan_for(prompt)
+        if steps_done >= len(plan):
+            return {"content": "Thought: I now know the final answer\n" + self.answer.format(steps=steps_done),
+                    "tool_calls": None}
+
+        tool_name, arguments = plan[steps_done]
+        functions = {tool.get("function", {}).get("name") for tool in tools or []}
+        if tool_name in functions:
+            call = {"id": f"call_{steps_done}", "type": "function",
+                    "function": {"name": tool_name, "arguments": json.dumps(arguments)}}
+            return {"content": None, "tool_calls": [call]}
+        return {"content": (f"Thought: I need more data from {tool_name}.\n"
+                            f"Action: {tool_name}\n"
+                            f"Action Input: {json.dumps(arguments)}"),
+                "tool_calls": None}
+
+
+class MockLLMServer:
+    """
+    OpenAI-compatible chat completions and embeddings server for benchmarks.
+
+    `POST /v1/chat/completions` answers from a `ChatScript`, streamed as
+    server-sent events when the request asks for it. Every reply waits
+    `ttft` seconds before its first token and then emits
+    `tokens_per_second` tokens per second (0 means instantly), so agent
+    overhead can be measured against a known, repeatable model speed.
+    `POST /v1/embeddings` returns deterministic hash embeddings, and
+    `GET /health` reports request and token counts.
+    """
+
+    def __init__(self, script: Optional[ChatScript] = None, ttft: float = 0.0, tokens_per_second: float = 0.0,
+                 model: str = "mock-llm", embedding_dimensions: int = DEFAULT_EMBEDDING_DIMENSIONS) -> None:
+        self.script = script or ChatScript()
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.model = model
+        self.embedding_dimensions = embedding_dimensions
+        self.port: Optional[int] = None
+        self.counts = {"chat": 0, "streamed": 0, "embeddings": 0, "embedding_requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    def _generation_delay(self, tokens: int) -> float:
+        return tokens / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def _completion(self, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        message = self.script.reply(payload.get("messages") or [], payload.get("tools"))
+        prompt_tokens = estimate_tokens(json.dumps(payload.get("messages") or [], ensure_ascii=False))
+        completion_tokens = estimate_tokens(message["content"] or json.dumps(message["tool_calls"]))
+        self.counts["chat"] += 1
+        self.counts["prompt_tokens"] += prompt_tokens
+        self.counts["completion_tokens"] += completion_tokens
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        return message, usage
+
+    def _envelope(self, kind: str) -> Dict[str, Any]:
+        return {"id": f"chatcmpl-mock-{self.counts['chat']}", "object": kind,
+                "created": int(time.time()), "model": self.model}
+
+    async def chat(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Non-streaming chat completion."""
+        message, usage = self._completion(payload)
+        await asyncio.sleep(self.ttft + self._generation_delay(usage["completion_tokens"]))
+        finish_reason = "tool_calls" if message["tool_calls"] else "stop"
+        choice_message = {"role": "assistant", "content": message["content"]}
+        if message["tool_calls"]:
+            choice_message["tool_calls"] = message["tool_calls"]
+        return {**self._envelope("chat.completion"),
+                "choices": [{"index": 0, "message": choice_message, "finish_reason": finish_reason}],
+                "usage": usage}
+
+    async def stream_chat(self, payload: Dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        """Streaming chat completion, one content delta per word."""
+        message, usage = self._completion(payload)
+        self.counts["streamed"] += 1
+        envelope = self._envelope("chat.completion.chunk")
+
+        async def send(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> None:
+            chunk = {**envelope, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            writer.write(http_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"))
+            await writer.drain()
+
+        writer.write(STREAM_HEAD)
+        await asyncio.sleep(self.ttft)
+        await send({"role": "assistant", "content": ""})
+        if message["tool_calls"]:
+            await asyncio.sleep(self._generation_delay(usage["completion_tokens"]))
+            await send({"tool_calls": [{"index": index, **call} for index, call in enumerate(message["tool_calls"])]})
+        else:
+            for piece in re.findall(r"\s*\S+", message["content"]):
+                await asyncio.sleep(self._generation_delay(estimate_tokens(piece)))
+                await send({"content": piece})
+        await send({}, "tool_calls" if message["tool_calls"] else "stop")
+        if (payload.get("stream_options") or {}).get("include_usage"):
+            writer.write(http_chunk(f"data: {json.dumps({**envelope, 'choices': [], 'usage': usage})}\n\n"))
+        writer.write(http_chunk("data: [DONE]\n\n") + http_chunk(""))
+        await writer.drain()
+
+    def embeddings(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        inputs = payload.get("input") or []
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dimensions = int(payload.get("dimensions") or self.embedding_dimensions)
+        self.counts["embeddings"] += len(inputs)
+        self.counts["embedding_requests"] += 1
+        tokens = sum(estimate_tokens(str(text)) for text in inputs)
+        return {
+            "object": "list",
+            "data": [{"object": "embedding", "index": index, "embedding": hash_embedding(text, dimensions)}
+                     for index, text in enumerate(inputs)],
+            "model": payload.get("model") or self.model,
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {"status": "ok", **self.counts}
+
+    # ---- HTTP plumbing ----------------------------------------------------
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, path, _, body = await read_request(reader)
+                payload = json.loads(body) if body else {}
+            except (ValueError, asyncio.IncompleteReadError):
+                writer.write(http_response(400, {"error": {"message": "Malformed request"}}))
+                await writer.drain()
+                return
+
+            if path.endswith("/chat/completions") and method == "POST":
+                if payload.get("stream"):
+                    await self.stream_chat(payload, writer)
+                    return
+                writer.write(http_response(200, await self.chat(payload)))
+            elif path.endswith("/embeddings") and method == "POST":
+                writer.write(http_response(200, self.embeddings(payload)))
+            elif path.endswith("/models") and method == "GET":
+                writer.write(http_response(200, {"object": "list",
+                                                 "data": [{"id": self.model, "object": "model", "owned_by": "mock"}]}))
+            elif path == "/health" and method == "GET":
+                writer.write(http_response(200, self.stats()))
+            else:
+                writer.write(http_response(404, {"error": {"message": f"No route for {method} {path}"}}))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int, ready: Optional[asyncio.Event] = None) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        self.port = server.sockets[0].getsockname()[1]
+        print(f"🧪 Mock LLM server listening on http://{host}:{self.port}/v1")
+        print(f"   TTFT: {self.ttft:g}s, 生成速度: {self.tokens_per_second or '∞'} tokens/s, "
+              f"场景: {len(self.script.plans)}")
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
@@ -0,0 +1,461 @@
+import asyncio
+import hashlib
+import json
+import random
+import secrets
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs
+
+from .tool_cache import DEFAULT_CACHE_PATH, load_tools_cache
+
+PROTOCOL_VERSION = "2024-11-05"
+
+_CLUSTER_NAMES = ("prod-east", "prod-west", "staging", "dev", "qa")
+_NAMESPACES = ("default", "kube-system", "payments", "orders", "monitoring")
+_APPS = ("api", "checkout", "inventory", "billing", "gateway", "worker", "search", "notifier")
+_LOG_START = datetime(2025, 6, 30, 13, 0, tzinfo=timezone.utc)
+
+_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+MAX_BODY_BYTES = 1024 * 1024
+
+
+def _seed(*parts: Any) -> int:
+    return int(hashlib.sha256("/".join(map(str, parts)).encode("utf-8")).hexdigest()[:12], 16)
+
+
+def parse_overrides(spec: str) -> Dict[str, float]:
+    """Parses per-tool overrides like `"LIST_NODES=0.5,GET_POD_LOGS=0.1"` into a mapping."""
+    overrides = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, value = item.partition("=")
+        overrides[name.strip()] = float(value)
+    return overrides
+
+
+class MockToolError(Exception):
+    """A tool call the mock cluster rejects, reported to the client as `isError`."""
+
+
+class MockDataset:
+    """
+    Deterministic synthetic inventory of clusters, nodes, pods, metrics and logs.
+
+    Scaled by `clusters` x `nodes` (per cluster) x `pods` (per cluster);
+    the same parameters and `seed` always produce the same data, so runs
+    against the mock server are reproducible. Clusters are generated
+    lazily, so large inventories cost nothing until they are queried.
+    """
+
+    def __init__(self, clusters: int = 3, nodes: int = 6, pods: int = 20, seed: int = 0) -> None:
+        self.nodes_per_cluster = nodes
+        self.pods_per_cluster = pods
+        self.seed = seed
+        self.cluster_names = [
+            _CLUSTER_NAMES[index] if index < len(_CLUSTER_NAMES) else f"cluster-{index}"
+            for index in range(clusters)
+        ]
+        self._clusters = lru_cache(maxsize=64)(self._build_cluster)
+
+    # ---- inventory --------------------------------------------------------
+
+    def _build_cluster(self, name: str) -> Dict[str, Any]:
+        rng = random.Random(_seed(self.seed, name))
+        nodes = [
+            {
+                "name": f"{name}-node-{index}",
+                "status": "NotReady" if rng.random() < 0.05 else "Ready",
+                "roles": "control-plane" if index == 0 else "worker",
+                "version": "v1.29.4",
+                "capacity": {"cpu": "8", "memory": "32Gi", "pods": "110"},
+                "cpuUsage": f"{rng.randint(200, 7600)}m",
+                "memoryUsage": f"{rng.randint(2048, 30000)}Mi",
+            }
+            for index in range(self.nodes_per_cluster)
+        ]
+        pods = []
+        for index in range(self.pods_per_cluster):
+            app = _APPS[index % len(_APPS)]
+            crashing = rng.random() < 0.1
+            pods.append({
+                "name": f"{app}-{_seed(self.seed, name, index) % 0xfffff:05x}",
+                "namespace": _NAMESPACES[index % len(_NAMESPACES)],
+                "node": nodes[index % len(nodes)]["name"] if nodes else None,
+                "status": "CrashLoopBackOff" if crashing else "Running",
+                "restarts": rng.randint(5, 40) if crashing else rng.randint(0, 1),
+                "labels": {"app": app},
+                "cpuUsage": f"{rng.randint(5, 900)}m",
+                "memoryUsage": f"{rng.randint(32, 2048)}Mi",
+            })
+        return {"name": name, "nodes": nodes, "pods": pods}
+
+    def cluster(self, name: Optional[str]) -> Dict[str, Any]:
+        if name not in self.cluster_names:
+            raise MockToolError(f"cluster '{name}' not found")
+        return self._clusters(name)
+
+    def pod(self, cluster: Optional[str], name: Optional[str]) -> Dict[str, Any]:
+        for pod in self.cluster(cluster)["pods"]:
+            if pod["name"] == name:
+                return pod
+        raise MockToolError(f"pod '{name}' not found in cluster '{cluster}'")
+
+    def pod_logs(self, pod: Dict[str, Any], lines: int, timestamps: bool = True) -> List[str]:
+        """Synthetic application log; crash-looping pods end in errors with stack traces."""
+        rng = random.Random(_seed(self.seed, pod["name"], "logs"))
+        output: List[str] = []
+        moment = _LOG_START
+        while len(output) < lines:
+            moment += timedelta(milliseconds=rng.randint(5, 900))
+            roll = rng.random()
+            if pod["status"] == "CrashLoopBackOff" and roll < 0.08:
+                entry = [f"ERROR [main] Unhandled exception while processing order {rng.randint(1000, 9999)}",
+                         "java.lang.IllegalStateException: connection pool exhausted",
+                         "    at com.example.db.Pool.acquire(Pool.java:118)",
+                         "    at com.example.orders.OrderService.save(OrderService.java:57)"]
+            elif roll < 0.12:
+                entry = [f"WARN  [db] slow query took {rng.randint(500, 4000)}ms table=orders"]
+            else:
+                entry = [f"INFO  [http] GET /api/{pod['labels']['app']}/{rng.randint(1, 50000)} "
+                         f"{rng.choice((200, 200, 200, 201, 404))} {rng.randint(2, 180)}ms"]
+            stamp = moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z "
+            output.extend((stamp if timestamps and index == 0 else "") + line for index, line in enumerate(entry))
+        return output[-lines:]
+
+    # ---- tools ------------------------------------------------------------
+
+    def call(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """Returns the result data of a tool call; raises `MockToolError` for invalid calls."""
+        arguments = {key: value for key, value in arguments.items() if value is not None}
+        handler = getattr(self, f"_tool_{tool_name.lower()}", None)
+        if handler is None:
+            return {"tool": tool_name, "arguments": arguments, "ok": True}
+        return handler(**arguments)
+
+    def _tool_list_clusters(self, **_: Any) -> List[Dict[str, Any]]:
+        return [{"name": name, "status": "Healthy", "version": "v1.29.4", "nodes": self.nodes_per_cluster}
+                for name in self.cluster_names]
+
+    def _tool_get_cluster_info(self, cluster: str = None, **_: Any) -> Dict[str, Any]:
+        data = self.cluster(cluster)
+        return {
+            "name": cluster,
+            "version": "v1.29.4",
+            "endpoint": f"https://{cluster}.k8s.local:6443",
+            "status": "Healthy",
+            "nodes": len(data["nodes"]),
+            "readyNodes": sum(node["status"] == "Ready" for node in data["nodes"]),
+            "pods": len(data["pods"]),
+            "namespaces": len(_NAMESPACES),
+        }
+
+    def _tool_list_namespaces(self, cluster: str = None, **_: Any) -> List[Dict[str, Any]]:
+        self.cluster(cluster)
+        return [{"name": name, "status": "Active"} for name in _NAMESPACES]
+
+    def _tool_list_nodes(self, cluster: str = None, **_: Any) -> List[Dict[str, Any]]:
+        return [{key: node[key] for key in ("name", "status", "roles", "version", "capacity")}
+                for node in self.cluster(cluster)["nodes"]]
+
+    def _tool_get_node_metrics(self, cluster: str = None, nodeName: str = None, sortBy: str = None,
+                               **_: Any) -> List[Dict[str, Any]]:
+        nodes = [{key: node[key] for key in ("name", "cpuUsage", "memoryUsage")}
+                 for node in self.cluster(cluster)["nodes"] if nodeName in (None, node["name"])]
+        return _sorted_by_usage(nodes, sortBy)
+
+    def _tool_get_pod_metrics(self, cluster: str = None, namespace: str = None, podName: str = None,
+                              sortBy: str = None, limit: int = None, **_: Any) -> List[Dict[str, Any]]:
+        pods = [{key: pod[key] for key in ("name", "namespace", "cpuUsage", "memoryUsage")}
+                for pod in self.cluster(cluster)["pods"]
+                if namespace in (None, pod["namespace"]) and podName in (None, pod["name"])]
+        pods = _sorted_by_usage(pods, sortBy)
+        return pods[:int(limit)] if limit else pods
+
+    def _tool_get_pod_logs(self, cluster: str = None, name: str = None, tailLines: int = 100,
+                           timestamps: bool = True, **_: Any) -> str:
+        return "\n".join(self.pod_logs(self.pod(cluster, name), int(tailLines), timestamps))
+
+    def _tool_analyze_pod_logs(self, cluster: str = None, name: str = None, tailLines: int = 1000,
+                               **_: Any) -> Dict[str, Any]:
+        pod = self.pod(cluster, name)
+        lines = self.pod_logs(pod, int(tailLines))
+        errors = [line for line in lines if " ERROR " in line]
+        return {
+            "pod": name,
+            "status": pod["status"],
+            "restarts": pod["restarts"],
+            "linesAnalyzed": len(lines),
+            "errors": len(errors),
+            "warnings": sum(" WARN " in line for line in lines),
+            "lastError": errors[-1] if errors else None,
+        }
+
+    def _tool_search_resources(self, cluster: str = None, query: str = "", kinds: List[str] = None,
+                               namespaces: List[str] = None, **_: Any) -> List[Dict[str, Any]]:
+        results = []
+        for pod in self.cluster(cluster)["pods"]:
+            if query.lower() not in pod["name"] or (namespaces and pod["namespace"] not in namespaces):
+                continue
+            for kind, name in (("Deployment", pod["labels"]["app"]), ("Pod", pod["name"])):
+                if not kinds or kind in kinds:
+                    results.append({"kind": kind, "name": name, "namespace": pod["namespace"]})
+        return list({json.dumps(item, sort_keys=True): item for item in results}.values())
+
+
+async def read_request(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, List[str]], bytes]:
+    """Reads one HTTP/1.1 request; returns method, path, query parameters and body."""
+    parts = (await reader.readline()).decode("latin-1").split()
+    if len(parts) != 3:
+        raise ValueError("Malformed request line")
+    method, target, _ = parts
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", "0") or 0)
+    if length > MAX_BODY_BYTES:
+        raise ValueError("Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    path, _, query = target.partition("?")
+    return method.upper(), path, parse_qs(query), body
+
+
+def http_response(status: int, payload: Any) -> bytes:
+    """A complete response: JSON for dicts and lists, plain text for strings."""
+    if isinstance(payload, str):
+        data, content_type = payload.encode("utf-8"), "text/plain"
+    else:
+        data, content_type = json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json"
+    return (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n").encode("latin-1") + data
+
+
+STREAM_HEAD = (b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+               b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n")
+
+
+def http_chunk(text: str) -> bytes:
+    """One chunk of a `Transfer-Encoding: chunked` body."""
+    data = text.encode("utf-8")
+    return f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n"
+
+
+def _usage_value(usage: str) -> float:
+    return float(usage.rstrip("mMiGi") or 0)
+
+
+def _sorted_by_usage(rows: List[Dict[str, Any]], sort_by: Optional[str]) -> List[Dict[str, Any]]:
+    if sort_by in ("cpu", "memory"):
+        return sorted(rows, key=lambda row: _usage_value(row[f"{sort_by}Usage"]), reverse=True)
+    return rows
+
+
+class MockMCPServer:
+    """
+    MCP server speaking the SSE transport, backed by a `MockDataset`.
+
+    `GET /sse` opens an event stream whose first `endpoint` event names
+    the URL for JSON-RPC messages (`POST /messages/?session_id=...`);
+    responses are delivered as `message` events on the stream, as with
+    the production server. Tools and their schemas come from
+    `tools_cache.json`.
+
+    Each tool call waits `latency` seconds (per-tool overrides in
+    `latencies`) and fails with probability `error_rate` (overrides in
+    `error_rates`), so caching, fan-out and concurrency can be measured
+    against a known upstream. `GET /health` reports call counts.
+    """
+
+    def __init__(
+        self,
+        dataset: Optional[MockDataset] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        latency: float = 0.0,
+        latencies: Optional[Dict[str, float]] = None,
+        error_rate: float = 0.0,
+        error_rates: Optional[Dict[str, float]] = None,
+        seed: int = 0,
+    ) -> None:
+        self.dataset = dataset or MockDataset(seed=seed)
+        self.tools = tools if tools is not None else load_tools_cache(DEFAULT_CACHE_PATH)
+        self.latency = latency
+        self.latencies = latencies or {}
+        self.error_rate = error_rate
+        self.error_rates = error_rates or {}
+        self.calls: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.port: Optional[int] = None
+        self._sessions: Dict[str, asyncio.Queue] = {}
+        # In-flight message deliveries; referenced here so they are not garbage-collected
+        self._deliveries: Set[asyncio.Task] = set()
+        self._random = random.Random(seed)
+
+    # ---- JSON-RPC ---------------------------------------------------------
+
+    def _tool_schemas(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "name": entry["name"],
+                "description": entry.get("description", ""),
+                "inputSchema": {"type": "object", **entry.get("parameters", {"properties": {}})},
+            }
+            for entry in self.tools
+        ]
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Runs one tool call with the configured latency and error injection."""
+        self.calls[name] = self.calls.get(name, 0) + 1
+        latency = self.latencies.get(name, self.latency)
+        if latency:
+            await asyncio.sleep(latency)
+        try:
+            if self._random.random() < self.error_rates.get(name, self.error_rate):
+                raise MockToolError(f"injected failure for {name}")
+            data = self.dataset.call(name, arguments)
+        except Exception as e:
+            # Rejected calls and crashes alike are answered, so the client never waits on a lost response
+            self.errors[name] = self.errors.get(name, 0) + 1
+            message = str(e) if isinstance(e, MockToolError) else f"internal error in {name}: {e!r}"
+            return {"content": [{"type": "text", "text": f"Error: {message}"}], "isError": True}
+        text = data if isinstance(data, str) else json.dumps(data, ensure_ascii=False)
+        return {"content": [{"type": "text", "text": text}], "isError": False}
+
+    async def handle_rpc(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Answers one JSON-RPC message; notifications get no response.
+
+        Any failure while handling a request is answered with an internal
+        error (-32603) rather than leaving the client without a response.
+        """
+        if not isinstance(message, dict) or "id" not in message:
+            return None
+        try:
+            return await self._dispatch(message)
+        except Exception as e:
+            return {"jsonrpc": "2.0", "id": message["id"],
+                    "error": {"code": -32603, "message": f"Internal error: {e!r}"}}
+
+    async def _dispatch(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        method, params = message.get("method"), message.get("params") or {}
+        if method == "initialize":
+            result: Dict[str, Any] = {
+                "protocolVersion": params.get("protocolVersion", PROTOCOL_VERSION),
+                "capabilities": {"tools": {"listChanged": False}},
+                "serverInfo": {"name": "ops-crew-mock-mcp", "version": "1.0.0"},
+            }
+        elif method == "ping":
+            result = {}
+        elif method == "tools/list":
+            result = {"tools": self._tool_schemas()}
+        elif method == "tools/call":
+            if params.get("name") not in {entry["name"] for entry in self.tools}:
+                return {"jsonrpc": "2.0", "id": message["id"],
+                        "error": {"code": -32602, "message": f"Unknown tool: {params.get('name')}"}}
+            result = await self.call_tool(params["name"], params.get("arguments") or {})
+        else:
+            return {"jsonrpc": "2.0", "id": message["id"],
+                    "error": {"code": -32601, "message": f"Method not found: {method}"}}
+        return {"jsonrpc": "2.0", "id": message["id"], "result": result}
+
+    async def _deliver(self, session_id: str, message: Dict[str, Any]) -> None:
+        response = await self.handle_rpc(message)
+        queue = self._sessions.get(session_id)
+        if response is not None and queue is not None:
+            queue.put_nowait(response)
+
+    def _delivery_done(self, task: asyncio.Task) -> None:
+        self._deliveries.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠️ Mock MCP message handling failed: {task.exception()!r}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "sessions": len(self._sessions),
+            "calls": sum(self.calls.values()),
+            "errors": sum(self.errors.values()),
+            "by_tool": dict(sorted(self.calls.items())),
+        }
+
+    # ---- HTTP plumbing ----------------------------------------------------
+
+    async def _stream_events(self, writer: asyncio.StreamWriter) -> None:
+        session_id = secrets.token_hex(16)
+        queue: asyncio.Queue = asyncio.Queue()
+        self._sessions[session_id] = queue
+
+        writer.write(STREAM_HEAD)
+        writer.write(http_chunk(f"event: endpoint\r\ndata: /messages/?session_id={session_id}\r\n\r\n"))
+        try:
+            await writer.drain()
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=15)
+                    writer.write(http_chunk(f"event: message\r\ndata: {json.dumps(message, ensure_ascii=False)}\r\n\r\n"))
+                except asyncio.TimeoutError:
+                    writer.write(http_chunk(": ping\r\n\r\n"))
+                await writer.drain()
+        finally:
+            self._sessions.pop(session_id, None)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, path, query, body = await read_request(reader)
+            except (ValueError, asyncio.IncompleteReadError):
+                writer.write(http_response(400, {"error": "Malformed request"}))
+                await writer.drain()
+                return
+
+            if path == "/sse" and method == "GET":
+                await self._stream_events(writer)
+            elif path.rstrip("/") == "/messages" and method == "POST":
+                session_id = (query.get("session_id") or [""])[0]
+                if session_id not in self._sessions:
+                    writer.write(http_response(404, "Could not find session"))
+                else:
+                    try:
+                        payload = json.loads(body)
+                    except ValueError:
+                        payload = None
+                    if not isinstance(payload, (dict, list)):
+                        writer.write(http_response(400, "Could not parse message"))
+                    else:
+                        for message in payload if isinstance(payload, list) else [payload]:
+                            task = asyncio.create_task(self._deliver(session_id, message))
+                            self._deliveries.add(task)
+                            task.add_done_callback(self._delivery_done)
+                        writer.write(http_response(202, "Accepted"))
+                await writer.drain()
+            elif path == "/health" and method == "GET":
+                writer.write(http_response(200, self.stats()))
+                await writer.drain()
+            else:
+                writer.write(http_response(404, {"error": f"No route for {method} {path}"}))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int, ready: Optional[asyncio.Event] = None) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        self.port = server.sockets[0].getsockname()[1]
+        print(f"🧪 Mock MCP server listening on http://{host}:{self.port}/sse")
+        print(f"   工具: {len(self.tools)}, 集群: {len(self.dataset.cluster_names)}, "
+              f"节点/集群: {self.dataset.nodes_per_cluster}, Pod/集群: {self.dataset.pods_per_cluster}")
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in list(self._deliveries):
+                task.cancel()
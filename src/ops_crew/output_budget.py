@@ -0,0 +1,294 @@
+import contextvars
+import itertools
+import json
+import math
+import os
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .tool_results import parse_tool_result
+
+PAGE_TOOL_NAME = "GET_MORE_RESULTS"
+
+# Per-tool output budgets in (estimated) tokens for tools known to return
+# large listings; every other tool gets the default budget.
+DEFAULT_TOKEN_BUDGETS = {
+    "SEARCH_RESOURCES": 2000,
+    "LIST_NODES": 2000,
+    "GET_POD_METRICS": 2000,
+    "GET_NODE_METRICS": 2000,
+    "CLUSTER_FAN_OUT": 6000,
+}
+
+# Columns with at most this many distinct values get value counts in the aggregates
+_MAX_CATEGORIES = 10
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate: ~4 ASCII characters per token, one token per other character."""
+    ascii_chars = sum(1 for char in text if char < "\x80")
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+def parse_budgets(spec: str) -> Dict[str, int]:
+    """Parses `"LIST_NODES=4000,SEARCH_RESOURCES=1000"` into a budget mapping."""
+    budgets = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, tokens = item.partition("=")
+        budgets[name.strip()] = int(tokens)
+    return budgets
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def _find_rows(data: Any) -> Tuple[Optional[List], Dict[str, Any], Optional[str]]:
+    """Returns the main list of a result, the remaining top-level fields and the list's key."""
+    if isinstance(data, list):
+        return data, {}, None
+    if isinstance(data, dict):
+        lists = [(key, value) for key, value in data.items() if isinstance(value, list)]
+        if lists:
+            key, rows = max(lists, key=lambda item: len(item[1]))
+            return rows, {name: value for name, value in data.items() if name != key}, key
+    return None, {}, None
+
+
+def summarize_rows(rows: List) -> Tuple[List[str], Dict[str, Any]]:
+    """Returns the column names of dict rows and per-column aggregates."""
+    columns: Dict[str, None] = {}
+    for row in rows:
+        if isinstance(row, dict):
+            columns.update(dict.fromkeys(row))
+
+    aggregates: Dict[str, Any] = {}
+    for column in columns:
+        values = [row.get(column) for row in rows if isinstance(row, dict) and row.get(column) is not None]
+        numbers = [value for value in values if isinstance(value, (int, float)) and not isinstance(value, bool)]
+        if numbers and len(numbers) == len(values):
+            aggregates[column] = {"min": min(numbers), "max": max(numbers), "sum": round(sum(numbers), 3)}
+            continue
+        counts = Counter(str(value) for value in values if not isinstance(value, (dict, list)))
+        if counts and len(counts) <= _MAX_CATEGORIES and len(counts) < len(values):
+            aggregates[column] = dict(counts.most_common())
+    return list(columns), aggregates
+
+
+class ResultPages:
+    """Bounded LRU store of full over-budget results, addressed by page handles."""
+
+    def __init__(self, max_entries: int = 64) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def put(self, tool_name: str, rows: List, fields: Dict[str, Any], rows_key: Optional[str],
+            text: bool = False) -> str:
+        handle = f"{tool_name.lower()}-{next(self._ids)}"
+        with self._lock:
+            self._entries[handle] = {
+                "tool": tool_name, "rows": rows, "fields": fields, "rows_key": rows_key, "text": text,
+            }
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return handle
+
+    def get(self, handle: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is not None:
+                self._entries.move_to_end(handle)
+            return entry
+
+
+class _Savings:
+    def __init__(self) -> None:
+        self.tokens_saved = 0
+        self.outputs_shaped = 0
+        self._lock = threading.Lock()
+
+    def record(self, tokens_saved: int) -> None:
+        with self._lock:
+            self.tokens_saved += tokens_saved
+            self.outputs_shaped += 1
+
+    def as_dict(self) -> Dict[str, int]:
+        return {"tokens_saved": self.tokens_saved, "outputs_shaped": self.outputs_shaped}
+
+
+_request_savings: "contextvars.ContextVar[Optional[_Savings]]" = contextvars.ContextVar(
+    "output_budget_savings", default=None
+)
+
+
+@contextmanager
+def track_savings() -> Iterator[_Savings]:
+    """Collects the tokens saved by output shaping within the `with` block (one request)."""
+    savings = _Savings()
+    token = _request_savings.set(savings)
+    try:
+        yield savings
+    finally:
+        _request_savings.reset(token)
+
+
+_full_output: "contextvars.ContextVar[bool]" = contextvars.ContextVar("output_budget_full_output", default=False)
+
+
+@contextmanager
+def full_output() -> Iterator[None]:
+    """Leaves tool results unshaped within the `with` block, for callers that render them for a person."""
+    token = _full_output.set(True)
+    try:
+        yield
+    finally:
+        _full_output.reset(token)
+
+
+class OutputBudget:
+    """
+    Per-tool token budgets for tool output that goes to the LLM.
+
+    Results within their tool's budget pass through unchanged. Larger
+    results are shaped deterministically: a JSON listing keeps its other
+    top-level fields, the column names, per-column aggregates and as many
+    leading rows as fit; plain text keeps its leading lines. The full result
+    is stored under a page handle that `GET_MORE_RESULTS` pages through.
+    Saved tokens are added to the current `track_savings()` block and to
+    running totals.
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, int]] = None, default_budget: int = 4000,
+                 max_pages: int = 64) -> None:
+        self.budgets = dict(DEFAULT_TOKEN_BUDGETS if budgets is None else budgets)
+        self.default_budget = default_budget
+        self.pages = ResultPages(max_pages)
+        self.outputs_shaped = 0
+        self.tokens_saved = 0
+        self._lock = threading.Lock()
+
+    def budget_for(self, tool_name: str) -> int:
+        return self.budgets.get(tool_name, self.default_budget)
+
+    def _record(self, original_tokens: int, shaped: str) -> None:
+        saved = max(0, original_tokens - estimate_tokens(shaped))
+        with self._lock:
+            self.outputs_shaped += 1
+            self.tokens_saved += saved
+        savings = _request_savings.get()
+        if savings is not None:
+            savings.record(saved)
+
+    def _page_of_rows(self, handle: str, entry: Dict[str, Any], offset: int, budget: int) -> str:
+        rows = entry["rows"]
+        columns, aggregates = summarize_rows(rows)
+        shaped = {
+            **entry["fields"],
+            "truncated": True,
+            "total_rows": len(rows),
+            "columns": columns,
+            "aggregates": aggregates,
+            "offset": offset,
+        }
+        page_rows: List = []
+        shaped[entry["rows_key"] or "rows"] = page_rows
+        used = estimate_tokens(_dumps(shaped)) + 60
+        for row in rows[offset:]:
+            cost = estimate_tokens(_dumps(row)) + 1
+            # Always show at least one row so paging makes progress
+            if page_rows and used + cost > budget:
+                break
+            page_rows.append(row)
+            used += cost
+        next_offset = offset + len(page_rows)
+        if next_offset < len(rows):
+            shaped["next_page"] = {"tool": PAGE_TOOL_NAME, "handle": handle, "offset": next_offset}
+        else:
+            shaped["next_page"] = None
+        return _dumps(shaped)
+
+    def _page_of_lines(self, handle: str, lines: List[str], offset: int, budget: int) -> str:
+        shown: List[str] = []
+        used = 60
+        for line in lines[offset:]:
+            cost = estimate_tokens(line) + 1
+            if shown and used + cost > budget:
+                break
+            shown.append(line)
+            used += cost
+        next_offset = offset + len(shown)
+        if next_offset < len(lines):
+            shown.append(
+                f"... [truncated: lines {offset + 1}-{next_offset} of {len(lines)} shown; "
+                f"call {PAGE_TOOL_NAME} with handle={handle} offset={next_offset} for more]"
+            )
+        return "\n".join(shown)
+
+    def _render(self, handle: str, entry: Dict[str, Any], offset: int, budget: int) -> str:
+        if entry["text"]:
+            return self._page_of_lines(handle, entry["rows"], offset, budget)
+        return self._page_of_rows(handle, entry, offset, budget)
+
+    def shape(self, tool_name: str, result: Any) -> Any:
+        """Returns `result` unchanged if it fits the tool's budget, otherwise its first page."""
+        budget = self.budget_for(tool_name)
+        if budget <= 0 or _full_output.get():
+            return result
+        text = result if isinstance(result, str) else _dumps(result)
+        original_tokens = estimate_tokens(text)
+        if original_tokens <= budget:
+            return result
+
+        rows, fields, rows_key = _find_rows(parse_tool_result(result))
+        if rows:
+            handle = self.pages.put(tool_name, rows, fields, rows_key)
+        else:
+            handle = self.pages.put(tool_name, text.splitlines(), {}, None, text=True)
+        shaped = self._render(handle, self.pages.get(handle), 0, budget)
+        self._record(original_tokens, shaped)
+        return shaped
+
+    def page(self, handle: str, offset: int) -> str:
+        """Returns the page of a stored result that starts at row/line `offset`."""
+        entry = self.pages.get(handle)
+        if entry is None:
+            return f"Unknown or expired page handle {handle}; call the original tool again."
+        if offset < 0 or offset >= len(entry["rows"]):
+            return f"Offset {offset} is out of range; the result has {len(entry['rows'])} rows."
+        return self._render(handle, entry, offset, self.budget_for(entry["tool"]))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"outputs_shaped": self.outputs_shaped, "tokens_saved": self.tokens_saved}
+
+
+_budget: Optional[OutputBudget] = None
+_budget_lock = threading.Lock()
+
+
+def get_output_budget() -> Optional[OutputBudget]:
+    """
+    Returns the shared output budget, or None when OUTPUT_BUDGET=false.
+
+    OUTPUT_TOKEN_BUDGET sets the default budget (tokens, default 4000) and
+    OUTPUT_TOKEN_BUDGETS overrides it per tool (e.g. "LIST_NODES=4000,SEARCH_RESOURCES=1000";
+    0 disables shaping for a tool).
+    """
+    global _budget
+    if os.getenv("OUTPUT_BUDGET", "true").lower() != "true":
+        return None
+    with _budget_lock:
+        if _budget is None:
+            budgets = dict(DEFAULT_TOKEN_BUDGETS)
+            budgets.update(parse_budgets(os.getenv("OUTPUT_TOKEN_BUDGETS", "")))
+            _budget = OutputBudget(
+                budgets=budgets,
+                default_budget=int(os.getenv("OUTPUT_TOKEN_BUDGET", "4000")),
+            )
+        return _budget
@@ -0,0 +1,177 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .tool_results import is_error_result
+
+# Read-only tools and how long (seconds) their results stay fresh.
+# Tools missing here, or with a TTL of 0, are never cached.
+DEFAULT_TOOL_TTLS = {
+    "LIST_CLUSTERS": 300,
+    "GET_CLUSTER_INFO": 120,
+    "LIST_NAMESPACES": 60,
+    "LIST_NODES": 60,
+    "SEARCH_RESOURCES": 30,
+    "GET_NODE_METRICS": 15,
+    "GET_POD_METRICS": 10,
+}
+
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """Parses `"LIST_CLUSTERS=600,GET_POD_METRICS=5"` into a TTL mapping."""
+    ttls = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, seconds = item.partition("=")
+        ttls[name.strip()] = float(seconds)
+    return ttls
+
+
+def cache_key(tool_name: str, arguments: Dict) -> Tuple[str, str]:
+    """Keys a call by tool name and canonicalized arguments (sorted, no None values)."""
+    canonical = {key: value for key, value in arguments.items() if value is not None}
+    return tool_name, json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ToolResultCache:
+    """
+    Bounded LRU cache of MCP tool results with per-tool TTLs.
+
+    Fresh entries are returned directly. Entries up to `max_stale` seconds
+    past their TTL are still returned, while a single background refresh
+    replaces them. Errors are never cached, whether the call raises or
+    returns an error result.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        max_entries: int = 512,
+        max_stale: float = 60,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttls = dict(DEFAULT_TOOL_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.max_stale = max_stale
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def ttl_for(self, tool_name: str) -> float:
+        return self.ttls.get(tool_name, 0)
+
+    def _store(self, key: Tuple[str, str], value: Any) -> None:
+        if is_error_result(value):
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_for(key[0]), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _refresh(self, key: Tuple[str, str], call: Callable[[], Any]) -> None:
+        try:
+            self._store(key, call())
+        except Exception as e:
+            print(f"⚠️ 后台刷新工具结果失败 {key[0]}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get_or_call(self, tool_name: str, arguments: Dict, call: Callable[[], Any]) -> Any:
+        """Returns a cached result for the call, invoking `call` on a miss."""
+        if self.ttl_for(tool_name) <= 0:
+            return call()
+
+        key = cache_key(tool_name, arguments)
+        refresh = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                now = self._clock()
+                if now < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                if now < expires_at + self.max_stale:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        refresh = True
+                else:
+                    del self._entries[key]
+                    entry = None
+            if entry is None:
+                self.misses += 1
+
+        if entry is not None:
+            if refresh:
+                threading.Thread(
+                    target=self._refresh, args=(key, call),
+                    name=f"tool-cache-refresh-{tool_name}", daemon=True
+                ).start()
+            return value
+
+        value = call()
+        self._store(key, value)
+        return value
+
+    def invalidate(self, tool_name: Optional[str] = None) -> None:
+        """Drops all entries, or only those of one tool."""
+        with self._lock:
+            if tool_name is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == tool_name]:
+                    del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            }
+
+
+_cache: Optional[ToolResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ToolResultCache]:
+    """
+    Returns the shared result cache, or None when MCP_RESULT_CACHE=false.
+
+    MCP_CACHE_TTLS overrides per-tool TTLs (e.g. "LIST_CLUSTERS=600,GET_POD_METRICS=5"),
+    MCP_CACHE_MAX_ENTRIES bounds the size and MCP_CACHE_MAX_STALE sets how long
+    expired entries may still be served while refreshing.
+    """
+    global _cache
+    if os.getenv("MCP_RESULT_CACHE", "true").lower() != "true":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            ttls = dict(DEFAULT_TOOL_TTLS)
+            ttls.update(parse_ttls(os.getenv("MCP_CACHE_TTLS", "")))
+            _cache = ToolResultCache(
+                ttls=ttls,
+                max_entries=int(os.getenv("MCP_CACHE_MAX_ENTRIES", "512")),
+                max_stale=float(os.getenv("MCP_CACHE_MAX_STALE", "60")),
+            )
+        return _cache
@@ -0,0 +1,222 @@
+import asyncio
+import json
+import math
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from .metrics import PROMETHEUS_CONTENT_TYPE, get_metrics_registry
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    504: "Gateway Timeout",
+}
+
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class AgentService:
+    """
+    Minimal HTTP/JSON front end for the platform agent.
+
+    Endpoints:
+        POST /v1/query   {"input": "...", "timeout": 120}  ->  {"result": "...", "elapsed": 1.23}
+        GET  /healthz                                       ->  {"status": "ok", "running": 0, "queued": 0}
+        GET  /metrics                                       ->  Prometheus text format
+
+    At most `max_concurrency` requests run at once and up to `max_queue`
+    more wait for a slot; beyond that requests are rejected with 429.
+    Each request is bounded by a timeout (504 when exceeded).
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[str], Awaitable[str]],
+        max_concurrency: int = 4,
+        max_queue: int = 16,
+        request_timeout: float = 300,
+    ) -> None:
+        self.handler = handler
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.request_timeout = request_timeout
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._admitted = 0
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    # ---- request handling -------------------------------------------------
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "running": self._running,
+            "queued": self._admitted - self._running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+    async def query(self, payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        user_input = payload.get("input")
+        if not isinstance(user_input, str) or not user_input.strip():
+            return 400, {"error": "'input' must be a non-empty string"}
+        timeout = payload.get("timeout")
+        if timeout is None:
+            timeout = self.request_timeout
+        elif isinstance(timeout, bool) or not isinstance(timeout, (int, float)) \
+                or not math.isfinite(timeout) or timeout <= 0:
+            return 400, {"error": "'timeout' must be a positive number of seconds"}
+        timeout = min(float(timeout), self.request_timeout)
+
+        if self._admitted >= self.max_concurrency + self.max_queue:
+            self.rejected += 1
+            return 429, {"error": "Server is busy, retry later"}
+
+        self._admitted += 1
+        started = time.monotonic()
+        try:
+            async with self._slots:
+                self._running += 1
+                try:
+                    remaining = max(0.0, timeout - (time.monotonic() - started))
+                    result = await asyncio.wait_for(self.handler(user_input.strip()), remaining)
+                finally:
+                    self._running -= 1
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            return 504, {"error": f"Request timed out after {timeout:g}s"}
+        except Exception as e:
+            return 500, {"error": str(e)}
+        finally:
+            self._admitted -= 1
+
+        self.completed += 1
+        return 200, {"result": result, "elapsed": round(time.monotonic() - started, 3)}
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Union[Dict[str, Any], str]]:
+        """Routes a request; JSON endpoints return a dict, /metrics returns text."""
+        if path == "/healthz":
+            if method != "GET":
+                raise _HTTPError(405, "Use GET")
+            return 200, {"status": "ok", **self.stats()}
+
+        if path == "/metrics":
+            if method != "GET":
+                raise _HTTPError(405, "Use GET")
+            return 200, get_metrics_registry().render_prometheus()
+
+        if path == "/v1/query":
+            if method != "POST":
+                raise _HTTPError(405, "Use POST")
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                raise _HTTPError(400, "Body must be JSON")
+            if not isinstance(payload, dict):
+                raise _HTTPError(400, "Body must be a JSON object")
+            return await self.query(payload)
+
+        raise _HTTPError(404, f"No route for {path}")
+
+    # ---- HTTP plumbing ----------------------------------------------------
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        parts = request_line.split()
+        if len(parts) != 3:
+            raise _HTTPError(400, "Malformed request line")
+        method, target, _ = parts
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", "0") or 0)
+        if length > MAX_BODY_BYTES:
+            raise _HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], body
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, path, body = await self._read_request(reader)
+                status, payload = await self.dispatch(method, path, body)
+            except _HTTPError as e:
+                status, payload = e.status, {"error": str(e)}
+            except (ValueError, asyncio.IncompleteReadError):
+                status, payload = 400, {"error": "Malformed request"}
+
+            if isinstance(payload, str):
+                data, content_type = payload.encode("utf-8"), PROMETHEUS_CONTENT_TYPE
+            else:
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                content_type = "application/json; charset=utf-8"
+            head = (
+                f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                "Connection: close\r\n"
+            )
+            if status == 429:
+                head += "Retry-After: 1\r\n"
+            writer.write(head.encode("latin-1") + b"\r\n" + data)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int, ready: Optional[asyncio.Event] = None) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        self.port = server.sockets[0].getsockname()[1]
+        print(f"🌐 Platform Agent service listening on http://{host}:{self.port}")
+        print(f"   并发上限: {self.max_concurrency}, 队列上限: {self.max_queue}, 超时: {self.request_timeout:g}s")
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+
+def serve(host: str = "127.0.0.1", port: int = 8080) -> None:
+    """
+    Runs the agent as an HTTP service until interrupted.
+
+    Limits come from SERVICE_MAX_CONCURRENCY (default 4), SERVICE_MAX_QUEUE
+    (default 16) and SERVICE_REQUEST_TIMEOUT (seconds, default 300). The
+    crew session pool is sized to the concurrency limit unless
+    OPS_CREW_POOL_SIZE is set explicitly.
+    """
+    max_concurrency = int(os.getenv("SERVICE_MAX_CONCURRENCY", "4"))
+    os.environ.setdefault("OPS_CREW_POOL_SIZE", str(max_concurrency))
+
+    from .crew import run_crew_async
+
+    service = AgentService(
+        run_crew_async,
+        max_concurrency=max_concurrency,
+        max_queue=int(os.getenv("SERVICE_MAX_QUEUE", "16")),
+        request_timeout=float(os.getenv("SERVICE_REQUEST_TIMEOUT", "300")),
+    )
+    try:
+        asyncio.run(service.serve(host, port))
+    except KeyboardInterrupt:
+        print("\n👋 Service stopped")
@@ -0,0 +1,78 @@
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls.
+
+    While a call for a key is in flight, further callers with the same key
+    wait for it and receive its result (or its exception) instead of
+    issuing their own upstream request. Nothing is remembered once the
+    call completes; caching is the job of `ToolResultCache`.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+            }
+
+
+_flight: Optional[SingleFlight] = None
+_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """Returns the shared coalescer for MCP calls, or None when MCP_SINGLE_FLIGHT=false."""
+    global _flight
+    if os.getenv("MCP_SINGLE_FLIGHT", "true").lower() != "true":
+        return None
+    with _flight_lock:
+        if _flight is None:
+            _flight = SingleFlight()
+        return _flight
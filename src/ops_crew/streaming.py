@@ -0,0 +1,181 @@
+import contextvars
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, NamedTuple, Optional
+
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+
+class StreamEvent(NamedTuple):
+    """
+    One item of a streamed request.
+
+    `type` is one of "tool_started", "tool_finished", "tool_error",
+    "token" (a piece of the final answer) or "final" (the complete answer,
+    always last).
+    """
+
+    type: str
+    data: Dict[str, Any]
+
+
+class FinalAnswerFilter:
+    """
+    Extracts the final answer from streamed ReAct output.
+
+    The agent's LLM output also contains thoughts and tool actions; only the
+    text after "Final Answer:" in an LLM call is passed on. Call `reset()`
+    when a new LLM call starts.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self._buffer = ""
+        self._emitted_upto: Optional[int] = None
+
+    def feed(self, chunk: str) -> str:
+        """Adds a chunk and returns the new final-answer text it revealed, if any."""
+        self._buffer += chunk
+        if self._emitted_upto is None:
+            index = self._buffer.find(FINAL_ANSWER_MARKER)
+            if index < 0:
+                return ""
+            start = index + len(FINAL_ANSWER_MARKER)
+            # Skip the whitespace between the marker and the answer
+            while start < len(self._buffer) and self._buffer[start] in " \t\n":
+                start += 1
+            if start == len(self._buffer):
+                return ""
+            self._emitted_upto = start
+        text = self._buffer[self._emitted_upto:]
+        self._emitted_upto = len(self._buffer)
+        return text
+
+
+class _Listener:
+    def __init__(self) -> None:
+        self.events: "queue.Queue[Optional[StreamEvent]]" = queue.Queue()
+        self.answer_filter = FinalAnswerFilter()
+        self.tool_started_at: Dict[str, float] = {}
+
+    def put(self, event_type: str, **data: Any) -> None:
+        self.events.put(StreamEvent(event_type, data))
+
+
+# Listeners keyed by id() of the LLM and agent objects of a streaming session
+_listeners: Dict[int, _Listener] = {}
+_listeners_lock = threading.Lock()
+_handlers_registered = False
+
+
+def _listener_for(obj: Any) -> Optional[_Listener]:
+    if obj is None:
+        return None
+    with _listeners_lock:
+        return _listeners.get(id(obj))
+
+
+def _register_handlers() -> None:
+    """Subscribes once to CrewAI's global event bus and routes events to listeners."""
+    global _handlers_registered
+    with _listeners_lock:
+        if _handlers_registered:
+            return
+        _handlers_registered = True
+
+    from crewai.utilities.events import (
+        LLMCallStartedEvent,
+        LLMStreamChunkEvent,
+        ToolUsageErrorEvent,
+        ToolUsageFinishedEvent,
+        ToolUsageStartedEvent,
+        crewai_event_bus,
+    )
+
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def _on_llm_started(source, event):
+        listener = _listener_for(source)
+        if listener is not None:
+            listener.answer_filter.reset()
+
+    @crewai_event_bus.on(LLMStreamChunkEvent)
+    def _on_chunk(source, event):
+        listener = _listener_for(source)
+        if listener is not None:
+            text = listener.answer_filter.feed(event.chunk)
+            if text:
+                listener.put("token", text=text)
+
+    @crewai_event_bus.on(ToolUsageStartedEvent)
+    def _on_tool_started(source, event):
+        listener = _listener_for(getattr(source, "agent", None))
+        if listener is not None:
+            listener.tool_started_at[event.tool_name] = time.monotonic()
+            listener.put("tool_started", tool=event.tool_name, arguments=event.tool_args)
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def _on_tool_finished(source, event):
+        listener = _listener_for(getattr(source, "agent", None))
+        if listener is not None:
+            started = listener.tool_started_at.pop(event.tool_name, time.monotonic())
+            listener.put("tool_finished", tool=event.tool_name, seconds=time.monotonic() - started)
+
+    @crewai_event_bus.on(ToolUsageErrorEvent)
+    def _on_tool_error(source, event):
+        listener = _listener_for(getattr(source, "agent", None))
+        if listener is not None:
+            listener.tool_started_at.pop(event.tool_name, None)
+            listener.put("tool_error", tool=event.tool_name, error=str(event.error))
+
+
+def stream_kickoff(llm: Any, agent: Any, kickoff: Callable[[], Any]) -> Iterator[StreamEvent]:
+    """
+    Runs `kickoff` on a worker thread and yields its events as they happen.
+
+    Events are attributed to this request by the identity of its LLM and
+    agent, so concurrent sessions each see only their own stream. If the
+    consumer stops early (closes the generator or hits Ctrl-C) the kickoff
+    cannot be interrupted; the daemon worker is left to finish on its own
+    and the caller should not reuse the session.
+    """
+    _register_handlers()
+    listener = _Listener()
+    outcome: Dict[str, Any] = {}
+
+    def _worker() -> None:
+        try:
+            outcome["result"] = kickoff()
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            listener.events.put(None)
+
+    with _listeners_lock:
+        _listeners[id(llm)] = listener
+        _listeners[id(agent)] = listener
+
+    # The worker inherits the caller's context (e.g. per-request metrics)
+    context = contextvars.copy_context()
+    worker = threading.Thread(target=context.run, args=(_worker,), name="crew-stream", daemon=True)
+    worker.start()
+    finished = False
+    try:
+        while True:
+            event = listener.events.get()
+            if event is None:
+                finished = True
+                break
+            yield event
+
+        if "error" in outcome:
+            raise outcome["error"]
+        yield StreamEvent("final", {"text": str(outcome["result"])})
+    finally:
+        if finished:
+            worker.join()
+        with _listeners_lock:
+            _listeners.pop(id(llm), None)
+            _listeners.pop(id(agent), None)
@@ -0,0 +1,120 @@
+import json
+import pathlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_CACHE_PATH = "tools_cache.json"
+
+# CrewAI's BaseTool rewrites `description` into this layout on construction
+_CREWAI_DESCRIPTION_MARKER = "Tool Description:"
+
+
+def _strip_titles(schema: Any) -> Any:
+    """Drops pydantic's auto-generated `title` keys so the cache mirrors the MCP schema."""
+    if isinstance(schema, dict):
+        return {
+            key: _strip_titles(value)
+            for key, value in schema.items()
+            if not (key == "title" and isinstance(value, str))
+        }
+    if isinstance(schema, list):
+        return [_strip_titles(item) for item in schema]
+    return schema
+
+
+def tool_description(tool) -> str:
+    """Returns a tool's original description, without CrewAI's generated prefix."""
+    description = getattr(tool, "description", "") or ""
+    if _CREWAI_DESCRIPTION_MARKER in description:
+        description = description.split(_CREWAI_DESCRIPTION_MARKER, 1)[1]
+    return description.strip()
+
+
+def tool_parameters(tool) -> Dict:
+    """Returns a tool's JSON schema in the `{"properties", "required"}` cache layout."""
+    args_schema = getattr(tool, "args_schema", None)
+    if args_schema is None:
+        return {"properties": {}}
+
+    schema = _strip_titles(args_schema.model_json_schema())
+    parameters = {"properties": schema.get("properties", {})}
+    if schema.get("required"):
+        parameters["required"] = sorted(schema["required"])
+    if schema.get("$defs"):
+        parameters["$defs"] = schema["$defs"]
+    return parameters
+
+
+def build_tools_cache(tools: Iterable, fetched_at: Optional[datetime] = None) -> Dict:
+    """
+    Serializes live tool objects into the tools cache structure.
+
+    Tools are sorted by name so the `tools` section is identical for an
+    unchanged server inventory, whatever order the server lists them in.
+    """
+    entries = [
+        {
+            "name": tool.name,
+            "description": tool_description(tool),
+            "parameters": tool_parameters(tool),
+        }
+        for tool in tools
+    ]
+    entries.sort(key=lambda entry: entry["name"])
+    return {
+        "fetched_at": (fetched_at or datetime.now()).isoformat(),
+        "tools": entries,
+    }
+
+
+def dump_tools_cache(cache_data: Dict) -> str:
+    """Renders cache data as stable, human-readable JSON."""
+    return json.dumps(cache_data, indent=2, sort_keys=True, ensure_ascii=False) + "\n"
+
+
+def write_tools_cache(cache_data: Dict, path: str = DEFAULT_CACHE_PATH) -> pathlib.Path:
+    """Atomically writes cache data, so readers never observe a half-written file."""
+    cache_path = pathlib.Path(path)
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    tmp_path.write_text(dump_tools_cache(cache_data), encoding="utf-8")
+    tmp_path.replace(cache_path)
+    return cache_path
+
+
+def same_tools(entries: Iterable[Dict], other: Iterable[Dict]) -> bool:
+    """Returns True when two lists of cache entries describe the same tools, in any order."""
+    return {entry["name"]: entry for entry in entries} == {entry["name"]: entry for entry in other}
+
+
+def refresh_tools_cache(tools: Iterable, path: str = DEFAULT_CACHE_PATH) -> Tuple[Dict, bool]:
+    """
+    Writes the cache for live `tools`; returns the cache data and whether the inventory changed.
+
+    An unchanged inventory keeps the previous `fetched_at`, so the file stays
+    byte-identical and a checked-in cache is not dirtied. Its modification
+    time is still updated to record when it was last verified.
+    """
+    cache_data = build_tools_cache(tools)
+    cache_path = pathlib.Path(path)
+    changed = True
+    if cache_path.exists():
+        try:
+            previous = json.loads(cache_path.read_text(encoding="utf-8"))
+        except ValueError:
+            previous = {}
+        if "fetched_at" in previous and same_tools(cache_data["tools"], previous.get("tools", [])):
+            cache_data["fetched_at"] = previous["fetched_at"]
+            changed = False
+    if not changed and cache_path.read_text(encoding="utf-8") == dump_tools_cache(cache_data):
+        cache_path.touch()
+    else:
+        write_tools_cache(cache_data, path)
+    return cache_data, changed
+
+
+def load_tools_cache(path: str = DEFAULT_CACHE_PATH) -> List[Dict]:
+    """Returns the cached tool entries, or an empty list if the cache is missing."""
+    cache_path = pathlib.Path(path)
+    if not cache_path.exists():
+        return []
+    return json.loads(cache_path.read_text(encoding="utf-8")).get("tools", [])
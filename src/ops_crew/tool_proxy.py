@@ -0,0 +1,322 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field, PrivateAttr, create_model
+
+from .fanout import DEFAULT_PLAN, fan_out
+from .log_digest import digest_pod_logs
+from .mcp_manager import get_mcp_manager
+from .metrics import timed
+from .output_budget import PAGE_TOOL_NAME, full_output, get_output_budget
+from .result_cache import cache_key, get_result_cache
+from .single_flight import get_single_flight
+from .tool_cache import (
+    DEFAULT_CACHE_PATH,
+    build_tools_cache,
+    load_tools_cache,
+    same_tools,
+    tool_description,
+)
+
+_JSON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+}
+
+
+def _digest_logs(result: Any) -> Any:
+    if os.getenv("LOG_DIGEST", "true").lower() != "true":
+        return result
+    return digest_pod_logs(result, min_lines=int(os.getenv("LOG_DIGEST_MIN_LINES", "50")))
+
+
+# Local post-processing applied to a tool's (possibly cached) raw result
+# before it reaches the agent
+OUTPUT_PROCESSORS = {
+    "GET_POD_LOGS": _digest_logs,
+    "ANALYZE_POD_LOGS": _digest_logs,
+}
+
+
+def schema_to_model(tool_name: str, parameters: Dict) -> Type[BaseModel]:
+    """Builds a pydantic args model from a cached `{"properties", "required"}` schema."""
+    required = set(parameters.get("required", []))
+    fields = {}
+    for field_name, spec in parameters.get("properties", {}).items():
+        field_type = _JSON_TYPES.get(spec.get("type"), Any)
+        description = spec.get("description", "")
+        if field_name in required:
+            fields[field_name] = (field_type, Field(..., description=description))
+        else:
+            fields[field_name] = (
+                Optional[field_type],
+                Field(spec.get("default"), description=description),
+            )
+    return create_model(f"{tool_name}Schema", **fields)
+
+
+class LazyMCPTool(BaseTool):
+    """
+    Stand-in for an MCP tool, usually built from `tools_cache.json`.
+
+    Agents can be constructed from these proxies without touching the
+    network. The MCP connection is opened on the first invocation of any
+    proxy and the call is forwarded to the live tool of the same name.
+
+    Every agent-facing MCP call goes through a proxy, which makes it the
+    single place where results are cached, identical concurrent calls are
+    coalesced into one upstream request, and large outputs are shaped by
+    `OUTPUT_PROCESSORS` and the output token budget before they reach the
+    agent.
+    """
+
+    server_params: List[Dict] = Field(default_factory=list)
+    _target: Optional[BaseTool] = PrivateAttr(default=None)
+
+    def _resolve(self) -> BaseTool:
+        if self._target is None:
+            for tool in get_mcp_manager().get_tools(self.server_params):
+                if tool.name == self.name:
+                    self._target = tool
+                    break
+            else:
+                raise RuntimeError(
+                    f"❌ MCP服务器不再提供工具 {self.name}，"
+                    "请运行 python src/tool_inspector.py --refresh 更新缓存"
+                )
+        return self._target
+
+    def _run(self, **kwargs: Any) -> Any:
+        # Drop unset optional arguments so server-side defaults apply
+        arguments = {key: value for key, value in kwargs.items() if value is not None}
+        with timed("tool_call", self.name):
+            return self._invoke(arguments)
+
+    def _invoke(self, arguments: Dict[str, Any]) -> Any:
+        def upstream() -> Any:
+            return self._resolve().run(**arguments)
+
+        single_flight = get_single_flight()
+
+        def call() -> Any:
+            if single_flight is None:
+                return upstream()
+            return single_flight.do(cache_key(self.name, arguments), upstream)
+
+        result_cache = get_result_cache()
+        if result_cache is None:
+            result = call()
+        else:
+            result = result_cache.get_or_call(self.name, arguments, call)
+
+        processor = OUTPUT_PROCESSORS.get(self.name)
+        if processor is not None:
+            result = processor(result)
+        output_budget = get_output_budget()
+        return result if output_budget is None else output_budget.shape(self.name, result)
+
+
+def _required_fields(tool: BaseTool) -> List[str]:
+    if tool.args_schema is None:
+        return []
+    return [name for name, field in tool.args_schema.model_fields.items() if field.is_required()]
+
+
+class MCPToolDispatcherSchema(BaseModel):
+    tool_name: str = Field(..., description="Name of the MCP tool to call")
+    arguments: Dict[str, Any] = Field(
+        default_factory=dict, description="Arguments for the tool, as a JSON object"
+    )
+
+
+class MCPToolDispatcher(BaseTool):
+    """
+    Fallback for query-aware tool subsetting.
+
+    Agents only get the full schemas of the tools selected for a request;
+    this single tool lists the remaining ones and can call any of them by
+    name, so the agent is never stuck when the selection was too narrow.
+    """
+
+    name: str = "CALL_MCP_TOOL"
+    description: str = "Call an MCP tool that is not otherwise available."
+    args_schema: Type[BaseModel] = MCPToolDispatcherSchema
+    _tools: Dict[str, BaseTool] = PrivateAttr(default_factory=dict)
+
+    def _run(self, tool_name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
+        tool = self._tools.get(tool_name)
+        if tool is None:
+            return f"Unknown tool {tool_name}. Available tools: {', '.join(sorted(self._tools))}"
+        return tool.run(**(arguments or {}))
+
+
+def build_dispatcher(hidden_tools: List[BaseTool]) -> MCPToolDispatcher:
+    """Returns a dispatcher whose description lists the hidden tools and their required arguments."""
+    lines = [
+        "Call one of these additional MCP tools by name when the other tools are not enough.",
+        "Pass `tool_name` and an `arguments` object.",
+    ]
+    for tool in hidden_tools:
+        required = _required_fields(tool)
+        lines.append(f"- {tool.name}({', '.join(required)}): {tool_description(tool)}")
+
+    dispatcher = MCPToolDispatcher(description="\n".join(lines))
+    dispatcher._tools = {tool.name: tool for tool in hidden_tools}
+    return dispatcher
+
+
+class ClusterFanOutSchema(BaseModel):
+    clusters: Optional[str] = Field(
+        None, description="Comma-separated cluster names (default: every cluster from LIST_CLUSTERS)"
+    )
+    tools: Optional[str] = Field(
+        None,
+        description="Comma-separated per-cluster tools to run (default: " + ",".join(DEFAULT_PLAN) + ")",
+    )
+
+
+class ClusterFanOutTool(BaseTool):
+    """
+    Runs a per-cluster tool plan across many clusters in one step.
+
+    Replaces the agent's sequential LIST_CLUSTERS -> GET_CLUSTER_INFO ->
+    LIST_NODES -> GET_NODE_METRICS loop (one LLM turn per call) with
+    concurrent calls through the regular MCP proxies, so results are still
+    cached and coalesced.
+    """
+
+    name: str = "CLUSTER_FAN_OUT"
+    description: str = (
+        "Collect information about several or all Kubernetes clusters at once. "
+        "Runs the given per-cluster tools (only tools whose single required argument is `cluster`) "
+        "for every cluster concurrently and returns one merged JSON report. "
+        "Use this for multi-cluster overviews and reports instead of calling tools cluster by cluster."
+    )
+    args_schema: Type[BaseModel] = ClusterFanOutSchema
+    _tools: Dict[str, BaseTool] = PrivateAttr(default_factory=dict)
+
+    def _run(self, clusters: Optional[str] = None, tools: Optional[str] = None) -> str:
+        plan = [name.strip() for name in tools.split(",") if name.strip()] if tools else list(DEFAULT_PLAN)
+        for tool_name in plan:
+            tool = self._tools.get(tool_name)
+            if tool is None or _required_fields(tool) != ["cluster"]:
+                return f"Tool {tool_name} cannot be fanned out; use tools that only require `cluster`."
+
+        cluster_list = [name.strip() for name in clusters.split(",") if name.strip()] if clusters else None
+        # Sub-results are merged in full and only the merged report is budgeted,
+        # so the agent gets one consistent page handle
+        with full_output():
+            report = fan_out(
+                self._tools,
+                plan=plan,
+                clusters=cluster_list,
+                max_parallel=int(os.getenv("FANOUT_MAX_PARALLEL", "8")),
+            )
+        merged = json.dumps(report, ensure_ascii=False)
+        output_budget = get_output_budget()
+        return merged if output_budget is None else output_budget.shape(self.name, merged)
+
+
+def build_fan_out_tool(tools: List[BaseTool]) -> ClusterFanOutTool:
+    """Returns a fan-out tool that calls through the given MCP tools."""
+    fan_out_tool = ClusterFanOutTool()
+    fan_out_tool._tools = {tool.name: tool for tool in tools}
+    return fan_out_tool
+
+
+class ResultPageSchema(BaseModel):
+    handle: str = Field(..., description="Page handle from the `next_page` of a truncated result")
+    offset: int = Field(..., description="Row (or line) offset to continue from")
+
+
+class ResultPageTool(BaseTool):
+    """Pages through tool results that were truncated to fit the output token budget."""
+
+    name: str = PAGE_TOOL_NAME
+    description: str = (
+        "Fetch the next page of a tool result that was truncated to save tokens. "
+        "Pass the `handle` and `offset` given in the truncated result's `next_page`. "
+        "Only request more pages when the rows shown and the aggregates are not enough."
+    )
+    args_schema: Type[BaseModel] = ResultPageSchema
+
+    def _run(self, handle: str, offset: int) -> str:
+        output_budget = get_output_budget()
+        if output_budget is None:
+            return "Output budgets are disabled; results are never truncated."
+        return output_budget.page(handle, offset)
+
+
+def build_proxy_tools(server_params: List[Dict], cache_path: str = DEFAULT_CACHE_PATH) -> List[LazyMCPTool]:
+    """Returns one lazy proxy per cached tool, or an empty list if there is no cache."""
+    return [
+        LazyMCPTool(
+            name=entry["name"],
+            description=entry.get("description", ""),
+            args_schema=schema_to_model(entry["name"], entry.get("parameters", {})),
+            server_params=server_params,
+        )
+        for entry in load_tools_cache(cache_path)
+    ]
+
+
+def proxy_live_tools(tools: List[BaseTool], server_params: List[Dict]) -> List[LazyMCPTool]:
+    """Wraps already-connected MCP tools in proxies so they share the same call path."""
+    proxies = []
+    for tool in tools:
+        proxy = LazyMCPTool(
+            name=tool.name,
+            description=tool_description(tool),
+            args_schema=tool.args_schema,
+            server_params=server_params,
+        )
+        proxy._target = tool
+        proxies.append(proxy)
+    return proxies
+
+
+def validate_tools_cache(server_params: List[Dict], cache_path: str = DEFAULT_CACHE_PATH) -> bool:
+    """
+    Compares the cached inventory with the live servers.
+
+    Only reports drift: the cache is usually checked in, so it is rewritten
+    by `tool_inspector.py --refresh` rather than at runtime. Returns True
+    when the cache is up to date.
+    """
+    live_cache = build_tools_cache(get_mcp_manager().get_tools(server_params))
+    if same_tools(live_cache["tools"], load_tools_cache(cache_path)):
+        return True
+
+    print(
+        "⚠️ MCP工具清单已变化，请运行 python src/tool_inspector.py --refresh "
+        "（或 ./run.sh --refresh-tools）更新 tools_cache.json"
+    )
+    return False
+
+
+_validation_started = False
+_validation_lock = threading.Lock()
+
+
+def start_background_validation(server_params: List[Dict], cache_path: str = DEFAULT_CACHE_PATH) -> None:
+    """Validates the cache once per process on a daemon thread."""
+    global _validation_started
+    with _validation_lock:
+        if _validation_started:
+            return
+        _validation_started = True
+
+    def _validate() -> None:
+        try:
+            validate_tools_cache(server_params, cache_path)
+        except Exception as e:
+            print(f"⚠️ 后台校验MCP工具缓存失败: {e}")
+
+    threading.Thread(target=_validate, name="mcp-cache-validation", daemon=True).start()
@@ -0,0 +1,25 @@
+import json
+import re
+from typing import Any
+
+# MCP adapters return a failed call's text content ("Error: ...",
+# "Error executing tool X: ...") instead of raising
+_ERROR_TEXT = re.compile(r"\s*error(?: executing tool \S+)?\s*:", re.IGNORECASE)
+
+
+def parse_tool_result(result: Any) -> Any:
+    """Decodes a JSON tool result; returns None if it is not JSON."""
+    if isinstance(result, (dict, list)):
+        return result
+    try:
+        return json.loads(str(result))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_error_result(result: Any) -> bool:
+    """Returns True for a tool result that reports a failure: error text or an `isError`/`error` payload."""
+    if isinstance(result, str) and _ERROR_TEXT.match(result):
+        return True
+    data = parse_tool_result(result)
+    return isinstance(data, dict) and bool(data.get("isError") or data.get("error"))
@@ -0,0 +1,116 @@
+import re
+from typing import Dict, List, Sequence
+
+from .tool_cache import tool_description
+
+# Query words (English and Chinese) mapped onto the vocabulary used in MCP tool names
+_SYNONYMS = {
+    "cluster": "cluster", "clusters": "cluster", "集群": "cluster",
+    "node": "node", "nodes": "node", "节点": "node", "机器": "node",
+    "pod": "pod", "pods": "pod", "容器": "pod", "容器组": "pod",
+    "namespace": "namespace", "namespaces": "namespace", "ns": "namespace", "命名空间": "namespace",
+    "log": "logs", "logs": "logs", "日志": "logs",
+    "metric": "metrics", "metrics": "metrics", "cpu": "metrics", "memory": "metrics",
+    "mem": "metrics", "usage": "metrics", "utilization": "metrics", "load": "metrics",
+    "指标": "metrics", "使用率": "metrics", "资源使用": "metrics", "负载": "metrics",
+    "search": "search", "find": "search", "lookup": "search", "搜索": "search", "查找": "search",
+    "resource": "resources", "resources": "resources", "资源": "resources",
+    "list": "list", "show": "list", "all": "list", "列出": "list", "所有": "list", "查看": "list",
+    "info": "info", "information": "info", "detail": "info", "details": "info", "describe": "info",
+    "status": "info", "health": "info", "详情": "info", "信息": "info", "状态": "info", "健康": "info",
+    "analyze": "analyze", "analyse": "analyze", "error": "analyze", "errors": "analyze",
+    "crash": "analyze", "why": "analyze", "issue": "analyze", "issues": "analyze",
+    "分析": "analyze", "错误": "analyze", "诊断": "analyze", "异常": "analyze",
+}
+
+_CJK_KEYWORDS = sorted((word for word in _SYNONYMS if not word.isascii()), key=len, reverse=True)
+
+NAME_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 1.0
+# Zero-argument discovery tools (e.g. LIST_CLUSTERS) are cheap and usually needed
+# to find the cluster names every other tool requires
+DISCOVERY_BONUS = 0.5
+
+
+def _canonical(word: str) -> str:
+    word = word.lower()
+    if word in _SYNONYMS:
+        return _SYNONYMS[word]
+    return word[:-1] if word.endswith("s") and len(word) > 3 else word
+
+
+def query_terms(query: str) -> List[str]:
+    """Returns the canonical terms of a free-text (English or Chinese) query."""
+    terms = [_canonical(word) for word in re.findall(r"[a-zA-Z0-9]+", query)]
+    for keyword in _CJK_KEYWORDS:
+        if keyword in query:
+            terms.append(_SYNONYMS[keyword])
+    return list(dict.fromkeys(terms))
+
+
+def _tool_terms(text: str) -> set:
+    return {_canonical(word) for word in re.findall(r"[a-zA-Z0-9]+", text)}
+
+
+def score_tool(terms: Sequence[str], tool) -> float:
+    name_terms = _tool_terms(tool.name.replace("_", " "))
+    description_terms = _tool_terms(tool_description(tool))
+    score = 0.0
+    for term in terms:
+        if term in name_terms:
+            score += NAME_WEIGHT
+        elif term in description_terms:
+            score += DESCRIPTION_WEIGHT
+    return score
+
+
+def _is_discovery_tool(tool) -> bool:
+    args_schema = getattr(tool, "args_schema", None)
+    if args_schema is None:
+        return True
+    fields = getattr(args_schema, "model_fields", None)
+    return fields is not None and not any(field.is_required() for field in fields.values())
+
+
+def rank_tools(query: str, tools: Sequence) -> List:
+    """
+    Returns the tools relevant to the query, best first; empty if nothing matches.
+
+    Equal scores are ordered by tool name, so the ranking does not depend
+    on the order the server or the cache lists the tools in.
+    """
+    terms = query_terms(query)
+    scored: List[Dict] = []
+    for tool in tools:
+        score = score_tool(terms, tool)
+        if score > 0 and _is_discovery_tool(tool):
+            score += DISCOVERY_BONUS
+        scored.append({"tool": tool, "score": score})
+
+    if not any(item["score"] > 0 for item in scored):
+        return []
+    scored.sort(key=lambda item: (-item["score"], item["tool"].name))
+    return [item["tool"] for item in scored if item["score"] > 0]
+
+
+def select_tools(query: str, tools: Sequence, top_k: int) -> List:
+    """
+    Picks the `top_k` best-matching tools for a query, keeping their original order.
+
+    Zero-argument discovery tools are always kept on top of the `top_k`
+    matches, since the agent needs them to find cluster names.
+
+    Returns the full list when `top_k` is 0, the inventory is already
+    small enough, or the query matches no tool with confidence.
+    """
+    if top_k <= 0 or len(tools) <= top_k:
+        return list(tools)
+
+    ranked = rank_tools(query, tools)
+    if not ranked:
+        return list(tools)
+
+    chosen_ids = {id(tool) for tool in ranked[:top_k]}
+    chosen_ids.update(id(tool) for tool in tools if _is_discovery_tool(tool))
+
+    return [tool for tool in tools if id(tool) in chosen_ids]
@@ -0,0 +1,279 @@
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_TRACE_FILE = "logs/traces.jsonl"
+
+ITERATION_SPAN = "agent.iteration"
+
+
+class Span:
+    """
+    One timed operation, following the OpenTelemetry span model.
+
+    Serialized with OTLP/JSON field names (`traceId`, `spanId`,
+    `parentSpanId`, `startTimeUnixNano`, ...), one span per line, with
+    attributes as a flat object.
+    """
+
+    __slots__ = ("trace_id", "span_id", "parent", "name", "kind", "attributes", "start_ns", "end_ns",
+                 "status", "status_message", "iteration")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, kind: str = "INTERNAL",
+                 attributes: Optional[Dict[str, Any]] = None) -> None:
+        self.trace_id = parent.trace_id if parent is not None else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent = parent
+        self.name = name
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "UNSET"
+        self.status_message = ""
+        # The open agent iteration under this span, if any
+        self.iteration: Optional[Span] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, error: BaseException) -> None:
+        self.status = "ERROR"
+        self.status_message = str(error) or type(error).__name__
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        if self.iteration is not None:
+            self.iteration.end()
+            self.iteration = None
+        self.end_ns = time.time_ns()
+        if self.status == "UNSET":
+            self.status = "OK"
+        _exporter.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent.span_id if self.parent is not None else "",
+            "name": self.name,
+            "kind": f"SPAN_KIND_{self.kind}",
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": f"STATUS_CODE_{self.status}", "message": self.status_message},
+        }
+
+
+class FileSpanExporter:
+    """
+    Appends finished spans to a JSONL file.
+
+    Spans of a trace whose root is still open are buffered and written
+    together when the root ends, so a request costs one file write.
+    """
+
+    def __init__(self) -> None:
+        self.path = DEFAULT_TRACE_FILE
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def open_trace(self, trace_id: str) -> None:
+        with self._lock:
+            self._buffers.setdefault(trace_id, [])
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            buffer = self._buffers.get(span.trace_id)
+            if buffer is not None and span.parent is not None:
+                buffer.append(span.to_dict())
+                return
+            spans = self._buffers.pop(span.trace_id, []) + [span.to_dict()]
+        self._write(spans)
+
+    def _write(self, spans: List[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(span, ensure_ascii=False, default=str) + "\n" for span in spans)
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError as e:
+            print(f"⚠️ 写入追踪文件失败 {self.path}: {e}")
+
+
+_exporter = FileSpanExporter()
+_enabled = False
+_current_span: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar(
+    "ops_crew_current_span", default=None
+)
+_NOOP = nullcontext()
+
+
+def configure(enabled: Optional[bool] = None, path: Optional[str] = None) -> None:
+    """
+    Turns tracing on or off; defaults come from TRACING (default false)
+    and TRACE_FILE (default logs/traces.jsonl).
+    """
+    global _enabled
+    _enabled = os.getenv("TRACING", "false").lower() == "true" if enabled is None else enabled
+    _exporter.path = path or os.getenv("TRACE_FILE", DEFAULT_TRACE_FILE)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def _span(name: str, kind: str, attributes: Dict[str, Any]) -> Iterator[Span]:
+    parent = _current_span.get()
+    span = Span(name, parent, kind, attributes)
+    if parent is None:
+        _exporter.open_trace(span.trace_id)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.set_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def span(name: str, kind: str = "INTERNAL", **attributes: Any):
+    """
+    Context manager tracing the `with` block as a child of the current span.
+
+    Yields the `Span`, or None when tracing is disabled; the disabled path
+    costs a single flag check.
+    """
+    if not _enabled:
+        return _NOOP
+    return _span(name, kind, attributes)
+
+
+def _iteration_parent() -> Optional[Span]:
+    current = _current_span.get()
+    if current is not None and current.name == ITERATION_SPAN:
+        return current.parent
+    return current
+
+
+def start_llm_span(model: Optional[str]) -> Optional[Span]:
+    """
+    Starts an LLM call span inside a new agent iteration.
+
+    CrewAI has no iteration events, so each LLM call of a ReAct loop opens
+    an `agent.iteration` span (closing the previous one) that also becomes
+    the parent of the tool calls which follow it. Returns None when tracing
+    is disabled or no request is being traced.
+    """
+    if not _enabled:
+        return None
+    parent = _iteration_parent()
+    if parent is None:
+        return None
+    if parent.iteration is not None:
+        parent.iteration.end()
+    iteration = Span(ITERATION_SPAN, parent)
+    parent.iteration = iteration
+    # Deliberately not reset: the enclosing span's reset restores its own parent
+    _current_span.set(iteration)
+    return Span("llm_call", iteration, "CLIENT", {"llm.model": model} if model else None)
+
+
+def end_span(span: Optional[Span], error: bool = False, **attributes: Any) -> None:
+    if span is None:
+        return
+    span.attributes.update(attributes)
+    if error:
+        span.status = "ERROR"
+    span.end()
+
+
+# ---- reading recorded traces -------------------------------------------------
+
+
+def load_traces(path: str = DEFAULT_TRACE_FILE) -> Dict[str, List[Dict[str, Any]]]:
+    """Reads a trace file into `{trace_id: [span, ...]}`, in file order."""
+    traces: Dict[str, List[Dict[str, Any]]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                span_data = json.loads(line)
+            except ValueError:
+                continue
+            traces.setdefault(span_data["traceId"], []).append(span_data)
+    return traces
+
+
+def _seconds(span_data: Dict[str, Any]) -> float:
+    return (span_data["endTimeUnixNano"] - span_data["startTimeUnixNano"]) / 1e9
+
+
+def trace_root(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ids = {span_data["spanId"] for span_data in spans}
+    roots = [span_data for span_data in spans if span_data["parentSpanId"] not in ids]
+    return min(roots, key=lambda span_data: span_data["startTimeUnixNano"])
+
+
+def _label(span_data: Dict[str, Any]) -> str:
+    attributes = span_data.get("attributes", {})
+    label = span_data["name"]
+    for key in ("ops_crew.name", "llm.model"):
+        if attributes.get(key):
+            label += f" {attributes[key]}"
+    tokens = attributes.get("llm.tokens")
+    if tokens and any(tokens.values()):
+        label += f" [{tokens.get('prompt', 0)}→{tokens.get('completion', 0)} tok]"
+    if span_data["status"]["code"] == "STATUS_CODE_ERROR":
+        label += " ✗"
+    return label
+
+
+def render_flame(spans: List[Dict[str, Any]], width: int = 40) -> str:
+    """
+    Renders one trace as an indented tree with a timeline bar per span.
+
+    Each bar starts at the span's offset within the root span and is as
+    long as its share of the root's duration, so wide and late bars show
+    where the request spent its time.
+    """
+    root = trace_root(spans)
+    children: Dict[str, List[Dict[str, Any]]] = {}
+    for span_data in spans:
+        children.setdefault(span_data["parentSpanId"], []).append(span_data)
+    total = max(_seconds(root), 1e-9)
+    start = root["startTimeUnixNano"]
+
+    rows = []
+
+    def visit(span_data: Dict[str, Any], depth: int) -> None:
+        seconds = _seconds(span_data)
+        offset = int((span_data["startTimeUnixNano"] - start) / 1e9 / total * width)
+        length = max(1, round(seconds / total * width))
+        bar = (" " * offset + "█" * length)[:width].ljust(width)
+        rows.append((f"{'  ' * depth}{_label(span_data)}", f"{seconds:9.3f}s {seconds / total:6.1%}", bar))
+        for child in sorted(children.get(span_data["spanId"], []), key=lambda item: item["startTimeUnixNano"]):
+            visit(child, depth + 1)
+
+    visit(root, 0)
+    label_width = min(70, max(len(label) for label, _, _ in rows))
+    return "\n".join(f"{label[:label_width].ljust(label_width)} {timing} |{bar}|" for label, timing, bar in rows)
+
+
+configure()
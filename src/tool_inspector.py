@@ -7,6 +7,7 @@ MCP tools, useful for development, debugging, and CI/CD pipelines.
 
 Usage:
     python src/tool_inspector.py --refresh    # Force refresh cache
+    python src/tool_inspector.py --refresh --use-crew  # Refresh via the LLM discovery crew
     python src/tool_inspector.py --check      # Check cache status
     python src/tool_inspector.py --list       # List cached tools
 """
@@ -22,14 +23,44 @@ from typing import Dict, List
 sys.path.insert(0, str(pathlib.Path(__file__).parent))
 
 from ops_crew.crew import OpsCrew
+from ops_crew.mcp_manager import close_mcp_manager, get_mcp_manager
+from ops_crew.tool_cache import refresh_tools_cache
 
 
-def refresh_cache() -> Dict:
+def refresh_cache(use_crew: bool = False) -> Dict:
     """Force refresh the tools cache"""
-    print("🔍 Forcing tool discovery and cache refresh...")
+    if use_crew:
+        return refresh_cache_with_crew()
+
+    print("🔍 Reading tool schemas directly from MCP servers...")
+    
+    try:
+        tools = get_mcp_manager().get_tools(OpsCrew.mcp_server_params)
+        if not tools:
+            print("❌ No MCP tools found, check K8S_MCP_URL")
+            return {}
+        
+        cache_data, changed = refresh_tools_cache(tools)
+        if changed:
+            print(f"📋 Successfully cached {len(cache_data['tools'])} tools to tools_cache.json")
+        else:
+            print(f"📋 Tool inventory unchanged ({len(cache_data['tools'])} tools), tools_cache.json kept as is")
+        return cache_data
+        
+    except Exception as e:
+        print(f"❌ Error during tool discovery: {e}")
+        return {}
+    finally:
+        close_mcp_manager()
+
+
+def refresh_cache_with_crew() -> Dict:
+    """Refresh the tools cache by running the LLM-driven discovery crew"""
+    print("🔍 Forcing tool discovery and cache refresh via discovery crew...")
     
     try:
-        ops_crew = OpsCrew()
+        # The crew must see the live inventory, not the cache it is rebuilding
+        ops_crew = OpsCrew(use_tool_cache=False)
         discovery_crew = ops_crew.discovery_crew()
         result = discovery_crew.kickoff()
         
@@ -64,12 +95,15 @@ def check_cache_status() -> None:
         fetched_at = datetime.fromisoformat(cache_data.get("fetched_at", ""))
         tools_count = len(cache_data.get("tools", []))
         
-        age = datetime.now() - fetched_at
+        # A refresh that finds the same tools keeps fetched_at and only touches the file
+        checked_at = max(fetched_at, datetime.fromtimestamp(cache_path.stat().st_mtime))
+        age = datetime.now() - checked_at
         # Check if cache is older than 24 hours
         is_stale = age.total_seconds() > 24 * 3600
         
         print(f"📋 Cache Status:")
         print(f"   📅 Last updated: {fetched_at.strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"   🔎 Last checked: {checked_at.strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"   ⏰ Age: {age}")
         print(f"   🔧 Tools cached: {tools_count}")
         print(f"   {'🔴 STALE' if is_stale else '🟢 FRESH'} (24h threshold)")
@@ -137,6 +171,7 @@ def main():
         epilog="""
 Examples:
   python src/tool_inspector.py --refresh    # Force cache refresh
+  python src/tool_inspector.py --refresh --use-crew  # Refresh via LLM discovery crew
   python src/tool_inspector.py --check      # Check cache status  
   python src/tool_inspector.py --list       # List all cached tools
         """
@@ -144,6 +179,8 @@ Examples:
     
     parser.add_argument("--refresh", action="store_true", 
                        help="Force refresh the tools cache")
+    parser.add_argument("--use-crew", action="store_true",
+                       help="With --refresh, run the LLM discovery crew instead of reading schemas directly")
     parser.add_argument("--check", action="store_true",
                        help="Check current cache status")
     parser.add_argument("--list", action="store_true",
@@ -160,7 +197,7 @@ Examples:
     print("=" * 50)
     
     if args.refresh:
-        refresh_cache()
+        refresh_cache(use_crew=args.use_crew)
         print()
     
     if args.check:
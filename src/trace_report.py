@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Trace Report CLI - Flame-style breakdown of recorded Platform Agent requests
+
+Requests are traced when the agent runs with TRACING=true; spans are
+appended to TRACE_FILE (default logs/traces.jsonl).
+
+Usage:
+    python src/trace_report.py                      # List recorded requests
+    python src/trace_report.py --last               # Breakdown of the latest request
+    python src/trace_report.py --slowest            # Breakdown of the slowest request
+    python src/trace_report.py 3f2a9c               # Breakdown by (prefix of) trace id or request id
+"""
+
+import argparse
+import os
+import pathlib
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, str(pathlib.Path(__file__).parent))
+
+from ops_crew.tracing import DEFAULT_TRACE_FILE, load_traces, render_flame, trace_root
+
+
+def _duration(root):
+    return (root["endTimeUnixNano"] - root["startTimeUnixNano"]) / 1e9
+
+
+def _find(traces, key):
+    matches = []
+    for trace_id, spans in traces.items():
+        request_id = trace_root(spans).get("attributes", {}).get("ops_crew.request_id", "")
+        if trace_id.startswith(key) or request_id.startswith(key):
+            matches.append(trace_id)
+    return matches
+
+
+def main():
+    """Main CLI entry point"""
+    parser = argparse.ArgumentParser(
+        description="Print a flame-style breakdown of traced Platform Agent requests",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("trace", nargs="?", help="Trace id or request id (prefix is enough)")
+    parser.add_argument("-f", "--file", default=os.getenv("TRACE_FILE", DEFAULT_TRACE_FILE),
+                        help=f"Trace file (default: {DEFAULT_TRACE_FILE})")
+    parser.add_argument("--last", action="store_true", help="Show the most recent request")
+    parser.add_argument("--slowest", action="store_true", help="Show the slowest request")
+    parser.add_argument("-w", "--width", type=int, default=40, help="Timeline bar width (default: 40)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(f"❌ Trace file not found: {args.file} (run the agent with TRACING=true)")
+        sys.exit(1)
+    traces = load_traces(args.file)
+    if not traces:
+        print(f"⚠️ No traces recorded in {args.file}")
+        sys.exit(1)
+
+    roots = {trace_id: trace_root(spans) for trace_id, spans in traces.items()}
+    if args.trace:
+        matches = _find(traces, args.trace)
+        if len(matches) != 1:
+            print(f"❌ {len(matches)} traces match '{args.trace}'")
+            sys.exit(1)
+        selected = matches[0]
+    elif args.last:
+        selected = max(roots, key=lambda trace_id: roots[trace_id]["startTimeUnixNano"])
+    elif args.slowest:
+        selected = max(roots, key=lambda trace_id: _duration(roots[trace_id]))
+    else:
+        print(f"📚 {len(traces)} traces in {args.file}")
+        print("=" * 50)
+        for trace_id, root in sorted(roots.items(), key=lambda item: item[1]["startTimeUnixNano"]):
+            attributes = root.get("attributes", {})
+            print(f"{trace_id[:12]}  {_duration(root):9.3f}s  {len(traces[trace_id]):4d} spans  "
+                  f"{root['name']}  {attributes.get('ops_crew.input', '')[:60]}")
+        return
+
+    root = roots[selected]
+    print(f"🔥 Trace {selected} ({_duration(root):.3f}s, {len(traces[selected])} spans)")
+    if root.get("attributes", {}).get("ops_crew.input"):
+        print(f"   Input: {root['attributes']['ops_crew.input']}")
+    print("=" * 50)
+    print(render_flame(traces[selected], width=args.width))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Pod日志模板挖掘性能基准测试
+
+测试目标：
+1. 测量模板挖掘（TemplateMiner）与完整日志摘要（LogDigest）的吞吐量（行/秒）
+2. 统计压缩比：日志行数 / 模板数，以及原始文本与摘要的字符数之比
+3. 验证大 tailLines 下内存有界（模板数不随行数线性增长）
+
+使用方法：
+    uv run test/tools/benchmark_log_templates.py
+    uv run test/tools/benchmark_log_templates.py --lines 200000 --seed 7
+    uv run test/tools/benchmark_log_templates.py --json  # 输出JSON报告
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew.log_digest import LogDigest  # noqa: E402
+from ops_crew.log_templates import TemplateMiner  # noqa: E402
+
+# 模拟 crash-loop Pod 的典型日志：少量模板，大量只在 ID/耗时/时间戳上不同的行
+_TEMPLATES = [
+    (60, "INFO GET /api/v1/orders/{id} 200 {ms}ms request_id={hex}"),
+    (15, "INFO health check ok latency={ms}ms"),
+    (8, "WARN slow query on table orders took {ms}ms (threshold 500ms)"),
+    (6, "ERROR failed to connect to postgres-{n}.db.svc:5432: connection refused (attempt {n})"),
+    (4, "ERROR upstream payment-{n} returned 503 for request_id={hex}"),
+    (4, "DEBUG cache miss key=order:{id} shard={n}"),
+    (2, "WARN retrying job {hex} in {n}s"),
+    (1, "FATAL out of memory: heap {ms}MiB exceeds limit, exiting"),
+]
+
+
+def synthetic_log(lines: int, seed: int = 42):
+    """Yields `lines` timestamped synthetic log lines."""
+    rng = random.Random(seed)
+    weights = [weight for weight, _ in _TEMPLATES]
+    patterns = [pattern for _, pattern in _TEMPLATES]
+    start = 1751288400.0
+    for index in range(lines):
+        pattern = rng.choices(patterns, weights)[0]
+        message = pattern.format(
+            id=rng.randint(1, 10 ** 6), ms=rng.randint(1, 5000), n=rng.randint(0, 9),
+            hex=f"{rng.getrandbits(64):016x}",
+        )
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(start + index * 0.01))
+        yield f"{timestamp}.{index % 100:02d}0000Z {message}"
+
+
+def run_benchmark(lines: int, seed: int) -> dict:
+    log_lines = list(synthetic_log(lines, seed))
+    raw_chars = sum(len(line) + 1 for line in log_lines)
+
+    miner = TemplateMiner()
+    started = time.perf_counter()
+    for line in log_lines:
+        miner.add(line.split(" ", 1)[1])
+    miner_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    digest_text = LogDigest().feed_all(log_lines).render()
+    digest_seconds = time.perf_counter() - started
+
+    stats = miner.stats()
+    return {
+        "lines": lines,
+        "templates": stats["templates"],
+        "line_compression_ratio": stats["compression_ratio"],
+        "miner_lines_per_second": round(lines / miner_seconds),
+        "digest_lines_per_second": round(lines / digest_seconds),
+        "raw_chars": raw_chars,
+        "digest_chars": len(digest_text),
+        "text_compression_ratio": round(raw_chars / len(digest_text), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pod日志模板挖掘性能基准测试")
+    parser.add_argument("--lines", type=int, default=100_000, help="合成日志行数")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出报告")
+    args = parser.parse_args()
+
+    results = [run_benchmark(count, args.seed) for count in sorted({1_000, 10_000, args.lines})]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("🏃‍♂️ Pod日志模板挖掘性能基准测试")
+    print("=" * 60)
+    for result in results:
+        print(f"\n📊 {result['lines']:,} 行")
+        print(f"   模板数:         {result['templates']} (行压缩比 {result['line_compression_ratio']}x)")
+        print(f"   挖掘吞吐量:     {result['miner_lines_per_second']:,} 行/秒")
+        print(f"   摘要吞吐量:     {result['digest_lines_per_second']:,} 行/秒")
+        print(f"   文本压缩比:     {result['raw_chars']:,} → {result['digest_chars']:,} 字符 "
+              f"({result['text_compression_ratio']}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,393 +2,297 @@
 """
 Platform Agent Memory功能性能基准测试
 
+在进程内运行完整的请求路径（run_crew → 会话池 → CrewAI → MCP 工具代理），
+LLM、MCP 服务器和 embedding 由本地替身（standins.py）提供，无需联网。
+
 测试目标：
-1. 测量memory启用前后的响应时间差异
-2. 统计工具调用次数的减少情况
-3. 评估memory对整体性能的影响
-4. 生成详细的性能报告
+1. 每个场景在 memory 启用/禁用下的 p50/p95/p99 延迟，以及 memory 后台写完为止的延迟
+2. 每个请求的 LLM 调用次数、工具调用次数（agent 层与上游）和 token 数
+3. 生成机器可读的 JSON 报告，便于对比不同版本
 
 使用方法：
-    uv run benchmark_memory.py
-    uv run benchmark_memory.py --detailed  # 详细模式
-    uv run benchmark_memory.py --export-csv # 导出CSV格式
+    uv run test/tools/benchmark_memory.py
+    uv run test/tools/benchmark_memory.py --runs 20 --llm-latency 0.2 --tool-latency 0.05
+    uv run test/tools/benchmark_memory.py --modes off          # 只测 memory 禁用
+    uv run test/tools/benchmark_memory.py --compare test/results/memory_benchmark_old.json
 """
 
-import os
-import sys
-import time
-import json
 import argparse
+import json
+import os
+import pathlib
+import platform
 import statistics
 import subprocess
+import sys
+import tempfile
+import time
 from datetime import datetime
-from typing import Dict, List, Tuple, Any
-from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+# 场景：查询 + 替身 LLM 按顺序发起的工具调用
+SCENARIOS = [
+    {
+        "name": "simple_cluster_query",
+        "query": "show me all k8s clusters",
+        "plan": [("LIST_CLUSTERS", {})],
+    },
+    {
+        "name": "cluster_detail_query",
+        "query": "which cluster has the most nodes?",
+        "plan": [("LIST_CLUSTERS", {}), ("GET_CLUSTER_INFO", {"cluster": "prod-east"}),
+                 ("GET_CLUSTER_INFO", {"cluster": "prod-west"})],
+    },
+    {
+        "name": "follow_up_query",
+        "query": "what about the prod-west environment?",
+        "plan": [("GET_CLUSTER_INFO", {"cluster": "prod-west"})],
+    },
+    {
+        "name": "complex_analysis",
+        "query": "analyze the health status of all clusters and recommend actions",
+        "plan": [("LIST_CLUSTERS", {}),
+                 ("CLUSTER_FAN_OUT", {"tools": "GET_CLUSTER_INFO,LIST_NODES,GET_NODE_METRICS"}),
+                 ("CALL_MCP_TOOL", {"tool_name": "GET_POD_METRICS",
+                                    "arguments": {"cluster": "prod-east", "sortBy": "cpu", "limit": 5}})],
+    },
+]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _read_new_records(path: pathlib.Path, offset: int) -> List[Dict[str, Any]]:
+    with path.open(encoding="utf-8") as f:
+        f.seek(offset)
+        return [json.loads(line) for line in f if line.strip()]
 
 
 class MemoryBenchmark:
-    """Memory功能性能基准测试套件"""
-    
-    def __init__(self, detailed: bool = False):
-        self.detailed = detailed
-        self.results = {
+    """Memory功能性能基准测试套件（离线、进程内）"""
+
+    def __init__(self, runs: int, warmup: int, llm_latency: float, tool_latency: float,
+                 fast_path: bool) -> None:
+        self.runs = runs
+        self.warmup = warmup
+        self.settings = {
+            "runs": runs,
+            "warmup": warmup,
+            "llm_latency": llm_latency,
+            "tool_latency": tool_latency,
+            "fast_path": fast_path,
+            "async_memory_writes": os.getenv("MEMORY_ASYNC_WRITES", "true").lower() == "true",
+        }
+        self._work_dir = pathlib.Path(tempfile.mkdtemp(prefix="ops_crew_benchmark_"))
+        self.metrics_log = self._work_dir / "metrics.jsonl"
+
+        os.environ["METRICS_LOG"] = str(self.metrics_log)
+        os.environ["FAST_PATH"] = "true" if fast_path else "false"
+        os.environ["OPS_CREW_POOL_SIZE"] = "1"
+        os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+        os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+        from standins import install_standins
+
+        plans = {scenario["query"]: scenario["plan"] for scenario in SCENARIOS}
+        self.script, self.tool_counter = install_standins(plans, llm_latency, tool_latency)
+
+    def _reset_session_pool(self) -> None:
+        import ops_crew.crew as crew_module
+        from ops_crew.result_cache import get_result_cache
+
+        crew_module._session_pool = None
+        result_cache = get_result_cache()
+        if result_cache is not None:
+            result_cache.invalidate()
+
+    def run_mode(self, memory: bool) -> Dict[str, Any]:
+        """运行一种 memory 模式下的全部场景"""
+        from ops_crew.batch import percentile
+        from ops_crew.crew import get_session_pool, run_crew
+        from ops_crew.memory_writer import get_memory_write_queue
+
+        os.environ["CREW_MEMORY"] = "true" if memory else "false"
+        # 每种模式使用独立的 memory 存储目录
+        os.environ["CREWAI_STORAGE_DIR"] = str(self._work_dir / ("memory_on" if memory else "memory_off"))
+        self._reset_session_pool()
+
+        started = time.monotonic()
+        get_session_pool().warm_up()
+        construction_seconds = time.monotonic() - started
+
+        memory_queue = get_memory_write_queue()
+
+        def wait_for_memory() -> None:
+            # Memory jobs left from one run must not overlap the next
+            if memory_queue is not None:
+                memory_queue.flush()
+
+        scenarios = {}
+        for scenario in SCENARIOS:
+            print(f"   📊 {scenario['name']}: ", end="", flush=True)
+            for _ in range(self.warmup):
+                run_crew(scenario["query"])
+                wait_for_memory()
+
+            latencies, persisted, llm_calls, tool_calls, upstream_calls, failures = [], [], [], [], [], 0
+            tokens = {"prompt": 0, "completion": 0, "cached_prompt": 0}
+            phases: Dict[str, float] = {}
+            for _ in range(self.runs):
+                offset = self.metrics_log.stat().st_size if self.metrics_log.exists() else 0
+                llm_before, upstream_before = self.script.calls, self.tool_counter.total()
+                run_started = time.monotonic()
+                try:
+                    run_crew(scenario["query"])
+                except Exception as e:
+                    failures += 1
+                    print(f"\n      ❌ {e}")
+                latencies.append(time.monotonic() - run_started)
+                wait_for_memory()
+                persisted.append(time.monotonic() - run_started)
+                llm_calls.append(self.script.calls - llm_before)
+                upstream_calls.append(self.tool_counter.total() - upstream_before)
+
+                for entry in _read_new_records(self.metrics_log, offset):
+                    tool_calls.append(entry["phases"].get("tool_call", {}).get("count", 0))
+                    for token_type in tokens:
+                        tokens[token_type] += entry["tokens"].get(token_type, 0)
+                    for phase, total in entry["phases"].items():
+                        phases[phase] = phases.get(phase, 0.0) + total["seconds"]
+                print(".", end="", flush=True)
+            print()
+
+            scenarios[scenario["name"]] = {
+                "query": scenario["query"],
+                "runs": self.runs,
+                "failures": failures,
+                "latency": {
+                    "p50": round(percentile(latencies, 50), 4),
+                    "p95": round(percentile(latencies, 95), 4),
+                    "p99": round(percentile(latencies, 99), 4),
+                    "mean": round(statistics.mean(latencies), 4),
+                    "min": round(min(latencies), 4),
+                    "max": round(max(latencies), 4),
+                },
+                # Until the request's memory is written, which is later than the answer with async writes
+                "persisted_latency": {
+                    "p50": round(percentile(persisted, 50), 4),
+                    "p95": round(percentile(persisted, 95), 4),
+                },
+                "llm_calls_per_request": round(statistics.mean(llm_calls), 2),
+                "tool_calls_per_request": round(statistics.mean(tool_calls), 2) if tool_calls else 0.0,
+                "upstream_tool_calls_per_request": round(statistics.mean(upstream_calls), 2),
+                "tokens_per_request": {key: round(value / self.runs, 1) for key, value in tokens.items()},
+                "phase_seconds_per_request": {key: round(value / self.runs, 4)
+                                              for key, value in sorted(phases.items())},
+            }
+        return {"session_construction_seconds": round(construction_seconds, 4), "scenarios": scenarios}
+
+    def run(self, modes: List[str]) -> Dict[str, Any]:
+        print("🏃‍♂️ Platform Agent Memory性能基准测试（离线替身）")
+        print("=" * 60)
+        report: Dict[str, Any] = {
             "metadata": {
                 "timestamp": datetime.now().isoformat(),
+                "git_commit": _git_commit(),
                 "platform": sys.platform,
-                "python_version": sys.version,
+                "python_version": platform.python_version(),
+                "settings": self.settings,
             },
-            "benchmarks": [],
-            "summary": {}
+            "modes": {},
         }
-        
-        # 测试用例集
-        self.test_cases = [
-            {
-                "name": "simple_cluster_query",
-                "query": "show me all k8s clusters",
-                "expected_tools": ["get_cluster_info"]
-            },
-            {
-                "name": "cluster_detail_query", 
-                "query": "which cluster has the most pods?",
-                "expected_tools": []  # 应该从memory获取
-            },
-            {
-                "name": "follow_up_query",
-                "query": "what about the production environment?",
-                "expected_tools": []  # 应该从memory获取
-            },
-            {
-                "name": "complex_analysis",
-                "query": "analyze the health status of all clusters and recommend actions",
-                "expected_tools": ["get_cluster_info"]  # 可能需要工具调用
-            }
-        ]
-    
-    def measure_response_time(self, query: str, with_memory: bool = True) -> Dict[str, Any]:
-        """测量单个查询的响应时间和工具调用情况"""
-        
-        # 准备测试环境
-        env_vars = os.environ.copy()
-        if with_memory:
-            env_vars["CREWAI_STORAGE_DIR"] = "./crew_memory"
-        else:
-            # 禁用memory（如果支持的话）
-            env_vars["CREWAI_STORAGE_DIR"] = "/tmp/no_memory"
-        
-        # 构造测试脚本
-        test_script = f"""
-import sys
-import time
-import os
-sys.path.insert(0, 'src')
-
-# 设置环境变量
-os.environ.update({repr(dict(env_vars))})
-
-start_time = time.time()
-tool_calls = 0
-
-try:
-    from ops_crew.crew import run_crew
-    
-    # 模拟工具调用计数（需要在实际实现中添加）
-    original_run_crew = run_crew
-    
-    def counting_run_crew(user_input):
-        global tool_calls
-        # 这里需要实际的工具调用计数逻辑
-        result = original_run_crew(user_input)
-        return result
-    
-    result = counting_run_crew("{query}")
-    end_time = time.time()
-    
-    print(f"BENCHMARK_RESULT:{{")
-    print(f"  'response_time': {end_time - start_time:.3f},")
-    print(f"  'tool_calls': {tool_calls},")
-    print(f"  'success': True,")
-    print(f"  'result_length': {len(str(result)) if result else 0}")
-    print(f"}}")
-    
-except Exception as e:
-    end_time = time.time()
-    print(f"BENCHMARK_RESULT:{{")
-    print(f"  'response_time': {end_time - start_time:.3f},")
-    print(f"  'tool_calls': 0,")
-    print(f"  'success': False,")
-    print(f"  'error': '{str(e)}'")
-    print(f"}}")
-        """
-        
-        try:
-            # 运行测试
-            process = subprocess.Popen(
-                ["python", "-c", test_script],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                timeout=120,  # 2分钟超时
-                env=env_vars
-            )
-            
-            stdout, stderr = process.communicate()
-            output = stdout.decode() + stderr.decode()
-            
-            # 解析结果
-            if "BENCHMARK_RESULT:" in output:
-                result_line = output.split("BENCHMARK_RESULT:")[1]
-                # 简单的结果解析（实际应该更robust）
-                result = {
-                    "response_time": 0.0,
-                    "tool_calls": 0, 
-                    "success": False,
-                    "result_length": 0
-                }
-                
-                # 提取响应时间
-                if "'response_time':" in result_line:
-                    time_str = result_line.split("'response_time':")[1].split(",")[0].strip()
-                    result["response_time"] = float(time_str)
-                
-                # 提取成功状态
-                result["success"] = "'success': True" in result_line
-                
-                return result
-            else:
-                return {
-                    "response_time": 999.0,  # 失败的情况
-                    "tool_calls": 0,
-                    "success": False,
-                    "error": "No benchmark result found in output"
+        for mode in modes:
+            print(f"\n🧠 memory {mode}")
+            report["modes"][f"memory_{mode}"] = self.run_mode(memory=(mode == "on"))
+        if len(report["modes"]) == 2:
+            report["memory_overhead"] = {
+                name: {
+                    "p50_delta": round(scenario["latency"]["p50"]
+                                       - report["modes"]["memory_off"]["scenarios"][name]["latency"]["p50"], 4),
+                    "llm_calls_delta": round(scenario["llm_calls_per_request"]
+                                             - report["modes"]["memory_off"]["scenarios"][name]["llm_calls_per_request"], 2),
                 }
-                
-        except subprocess.TimeoutExpired:
-            return {
-                "response_time": 120.0,  # 超时
-                "tool_calls": 0,
-                "success": False,
-                "error": "Timeout"
+                for name, scenario in report["modes"]["memory_on"]["scenarios"].items()
             }
-        except Exception as e:
-            return {
-                "response_time": 999.0,
-                "tool_calls": 0,
-                "success": False,
-                "error": str(e)
-            }
-    
-    def run_benchmark_suite(self) -> Dict[str, Any]:
-        """运行完整的基准测试套件"""
-        
-        print("🏃‍♂️ Platform Agent Memory性能基准测试")
-        print("=" * 60)
-        
-        for i, test_case in enumerate(self.test_cases):
-            print(f"\n📊 测试用例 {i+1}/{len(self.test_cases)}: {test_case['name']}")
-            print(f"   查询: {test_case['query']}")
-            
-            # 多次运行取平均值
-            runs = 3 if not self.detailed else 5
-            
-            with_memory_times = []
-            without_memory_times = []
-            
-            for run in range(runs):
-                print(f"   运行 {run+1}/{runs}...", end=" ")
-                
-                # 测试启用memory的情况
-                result_with = self.measure_response_time(test_case["query"], with_memory=True)
-                with_memory_times.append(result_with["response_time"])
-                
-                # 测试禁用memory的情况（如果支持）
-                result_without = self.measure_response_time(test_case["query"], with_memory=False)
-                without_memory_times.append(result_without["response_time"])
-                
-                print("✓")
-                
-                # 添加延迟避免系统负载
-                time.sleep(1)
-            
-            # 计算统计数据
-            avg_with = statistics.mean(with_memory_times)
-            avg_without = statistics.mean(without_memory_times)
-            improvement = ((avg_without - avg_with) / avg_without * 100) if avg_without > 0 else 0
-            
-            benchmark_result = {
-                "test_case": test_case["name"],
-                "query": test_case["query"],
-                "runs": runs,
-                "with_memory": {
-                    "avg_time": avg_with,
-                    "min_time": min(with_memory_times),
-                    "max_time": max(with_memory_times),
-                    "times": with_memory_times
-                },
-                "without_memory": {
-                    "avg_time": avg_without,
-                    "min_time": min(without_memory_times),
-                    "max_time": max(without_memory_times),
-                    "times": without_memory_times
-                },
-                "improvement_percent": improvement
-            }
-            
-            self.results["benchmarks"].append(benchmark_result)
-            
-            # 输出结果
-            print(f"   📈 结果:")
-            print(f"      启用Memory: {avg_with:.3f}s (平均)")
-            print(f"      禁用Memory: {avg_without:.3f}s (平均)")
-            if improvement > 0:
-                print(f"      性能提升: {improvement:.1f}% ✅")
-            else:
-                print(f"      性能变化: {improvement:.1f}% ⚠️")
-        
-        # 计算总体统计
-        self.calculate_summary()
-        return self.results
-    
-    def calculate_summary(self):
-        """计算总体统计数据"""
-        if not self.results["benchmarks"]:
-            return
-        
-        improvements = [b["improvement_percent"] for b in self.results["benchmarks"]]
-        with_memory_times = [b["with_memory"]["avg_time"] for b in self.results["benchmarks"]]
-        without_memory_times = [b["without_memory"]["avg_time"] for b in self.results["benchmarks"]]
-        
-        self.results["summary"] = {
-            "total_test_cases": len(self.results["benchmarks"]),
-            "avg_improvement_percent": statistics.mean(improvements),
-            "max_improvement_percent": max(improvements),
-            "min_improvement_percent": min(improvements),
-            "avg_response_time_with_memory": statistics.mean(with_memory_times),
-            "avg_response_time_without_memory": statistics.mean(without_memory_times),
-            "performance_grade": self.get_performance_grade(statistics.mean(improvements))
-        }
-    
-    def get_performance_grade(self, improvement_percent: float) -> str:
-        """根据性能提升百分比评定等级"""
-        if improvement_percent >= 50:
-            return "A+ (优秀)"
-        elif improvement_percent >= 30:
-            return "A (良好)"
-        elif improvement_percent >= 10:
-            return "B (合格)"
-        elif improvement_percent >= 0:
-            return "C (待优化)"
-        else:
-            return "D (需要改进)"
-    
-    def print_summary_report(self):
-        """打印总结报告"""
-        summary = self.results["summary"]
-        
-        print("\n" + "=" * 60)
-        print("📊 性能基准测试总结报告")
-        print("=" * 60)
-        
-        print(f"测试用例总数: {summary['total_test_cases']}")
-        print(f"平均性能提升: {summary['avg_improvement_percent']:.1f}%")
-        print(f"最大性能提升: {summary['max_improvement_percent']:.1f}%")
-        print(f"最小性能提升: {summary['min_improvement_percent']:.1f}%")
-        print(f"")
-        print(f"启用Memory平均响应时间: {summary['avg_response_time_with_memory']:.3f}s")
-        print(f"禁用Memory平均响应时间: {summary['avg_response_time_without_memory']:.3f}s")
-        print(f"")
-        print(f"性能等级: {summary['performance_grade']}")
-        
-        # 性能建议
-        print(f"\n💡 性能建议:")
-        if summary['avg_improvement_percent'] >= 30:
-            print("   ✅ Memory功能显著提升了性能，建议启用")
-        elif summary['avg_improvement_percent'] >= 10:
-            print("   ⚠️ Memory功能有一定提升，可以考虑启用")
-        else:
-            print("   ❌ Memory功能提升不明显，需要进一步优化")
-    
-    def save_report(self, filename: str = None, export_csv: bool = False):
-        """保存测试报告"""
-        if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"memory_benchmark_report_{timestamp}.json"
-        
-        # 保存JSON报告
-        with open(filename, "w") as f:
-            json.dump(self.results, f, indent=2)
-        
-        print(f"\n📄 详细报告已保存到: {filename}")
-        
-        # 导出CSV格式
-        if export_csv:
-            csv_filename = filename.replace(".json", ".csv")
-            self.export_csv(csv_filename)
-            print(f"📊 CSV数据已导出到: {csv_filename}")
-    
-    def export_csv(self, filename: str):
-        """导出CSV格式的数据"""
-        import csv
-        
-        with open(filename, "w", newline="") as csvfile:
-            fieldnames = [
-                "test_case", "query", "runs",
-                "avg_time_with_memory", "avg_time_without_memory",
-                "improvement_percent"
-            ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            for benchmark in self.results["benchmarks"]:
-                writer.writerow({
-                    "test_case": benchmark["test_case"],
-                    "query": benchmark["query"],
-                    "runs": benchmark["runs"],
-                    "avg_time_with_memory": benchmark["with_memory"]["avg_time"],
-                    "avg_time_without_memory": benchmark["without_memory"]["avg_time"],
-                    "improvement_percent": benchmark["improvement_percent"]
-                })
+        return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print("\n" + "=" * 60)
+    print("📊 性能基准测试总结报告")
+    print("=" * 60)
+    header = f"{'场景':<24}{'模式':<12}{'p50':>8}{'p95':>8}{'p99':>8}{'LLM':>6}{'工具':>6}{'tokens':>9}"
+    print(header)
+    for mode, result in report["modes"].items():
+        for name, scenario in result["scenarios"].items():
+            latency = scenario["latency"]
+            tokens = scenario["tokens_per_request"]
+            print(f"{name:<24}{mode:<12}{latency['p50']:>8.3f}{latency['p95']:>8.3f}{latency['p99']:>8.3f}"
+                  f"{scenario['llm_calls_per_request']:>6}{scenario['tool_calls_per_request']:>6}"
+                  f"{tokens['prompt'] + tokens['completion']:>9.0f}")
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any]) -> None:
+    """打印与基线报告相比的 p50/p95 变化"""
+    print("\n📈 与基线对比 (当前 - 基线):")
+    for mode, result in current["modes"].items():
+        for name, scenario in result["scenarios"].items():
+            base = baseline.get("modes", {}).get(mode, {}).get("scenarios", {}).get(name)
+            if base is None:
+                continue
+            p50 = scenario["latency"]["p50"] - base["latency"]["p50"]
+            p95 = scenario["latency"]["p95"] - base["latency"]["p95"]
+            llm = scenario["llm_calls_per_request"] - base["llm_calls_per_request"]
+            print(f"   {name:<24}{mode:<12} p50 {p50:+.3f}s  p95 {p95:+.3f}s  LLM {llm:+.2f}")
 
 
 def main():
     """主函数"""
-    parser = argparse.ArgumentParser(description="Platform Agent Memory性能基准测试")
-    parser.add_argument("--detailed", action="store_true", 
-                       help="运行详细测试（更多运行次数）")
-    parser.add_argument("--export-csv", action="store_true",
-                       help="导出CSV格式数据")
-    parser.add_argument("--output", type=str,
-                       help="指定输出文件名")
-    
+    parser = argparse.ArgumentParser(description="Platform Agent Memory性能基准测试（离线）")
+    parser.add_argument("--runs", type=int, default=10, help="每个场景的测量次数（默认 10）")
+    parser.add_argument("--warmup", type=int, default=1, help="每个场景的预热次数（默认 1）")
+    parser.add_argument("--modes", choices=["both", "on", "off"], default="both",
+                        help="测试 memory 启用、禁用或两者（默认 both）")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="替身 LLM 每次调用的延迟（秒）")
+    parser.add_argument("--tool-latency", type=float, default=0.02, help="替身 MCP 工具每次调用的延迟（秒）")
+    parser.add_argument("--fast-path", action="store_true", help="启用快速路径（默认禁用以测量完整链路）")
+    parser.add_argument("--output", type=str, help="JSON 报告路径（默认 test/results/memory_benchmark_<时间>.json）")
+    parser.add_argument("--compare", type=str, help="与之前的 JSON 报告对比")
     args = parser.parse_args()
-    
-    # 创建基准测试实例
-    benchmark = MemoryBenchmark(detailed=args.detailed)
-    
+
+    modes = ["off", "on"] if args.modes == "both" else [args.modes]
+    benchmark = MemoryBenchmark(args.runs, args.warmup, args.llm_latency, args.tool_latency, args.fast_path)
     try:
-        # 运行基准测试
-        results = benchmark.run_benchmark_suite()
-        
-        # 打印总结
-        benchmark.print_summary_report()
-        
-        # 保存报告
-        benchmark.save_report(args.output, args.export_csv)
-        
-        # 根据性能结果设置退出码
-        if results["summary"]["avg_improvement_percent"] >= 10:
-            print("\n🎉 基准测试通过：Memory功能带来了显著的性能提升！")
-            sys.exit(0)
-        else:
-            print("\n⚠️ 基准测试警告：Memory功能的性能提升不够明显")
-            sys.exit(1)
-            
+        report = benchmark.run(modes)
     except KeyboardInterrupt:
         print("\n\n🛑 基准测试被用户中断")
         sys.exit(130)
-    except Exception as e:
-        print(f"\n❌ 基准测试失败: {str(e)}")
-        sys.exit(1)
+
+    print_report(report)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare_reports(json.load(f), report)
+
+    output = pathlib.Path(args.output) if args.output else (
+        ROOT / "test" / "results" / f"memory_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\n📄 详细报告已保存到: {output}")
+
+    failures = sum(scenario["failures"] for result in report["modes"].values()
+                   for scenario in result["scenarios"].values())
+    sys.exit(1 if failures else 0)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
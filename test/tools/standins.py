@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Platform Agent 本地替身（stand-ins）
+
+离线运行基准测试所需的进程内替身：
+1. StandInMCPManager - 按 tools_cache.json 提供 MCP 工具，数据来自 ops_crew.mock_mcp.MockDataset
+2. ScriptedLLM       - 按场景脚本（ops_crew.mock_llm.ChatScript）回复的 LLM，统计调用次数与 token
+3. HashEmbedding     - 基于哈希的确定性 embedding 函数，memory 无需联网
+
+需要真实 HTTP 往返时，改用 src/mock_mcp_server.py 与 src/mock_llm_server.py。
+
+使用方法（在导入 ops_crew.crew 之前安装）：
+    from standins import install_standins
+    script, tool_counter = install_standins(plans, llm_latency=0.05, tool_latency=0.02)
+"""
+
+import json
+import os
+import pathlib
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+
+
+class _Counter:
+    def __init__(self) -> None:
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str) -> None:
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def total(self) -> int:
+        with self._lock:
+            return sum(self.calls.values())
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls.clear()
+
+
+def build_standin_tools(latency: float = 0.0, nodes_per_cluster: int = 6,
+                        cache_path: pathlib.Path = ROOT / "tools_cache.json") -> Tuple[List, _Counter]:
+    """Returns one CrewAI tool per cached tool schema, plus a counter of upstream calls."""
+    from crewai.tools import BaseTool
+
+    from ops_crew.mock_mcp import MockDataset, MockToolError
+    from ops_crew.tool_cache import load_tools_cache
+    from ops_crew.tool_proxy import schema_to_model
+
+    counter = _Counter()
+    dataset = MockDataset(nodes=nodes_per_cluster)
+
+    class StandInTool(BaseTool):
+        def _run(self, **kwargs: Any) -> str:
+            counter.add(self.name)
+            if latency:
+                time.sleep(latency)
+            try:
+                data = dataset.call(self.name, kwargs)
+            except MockToolError as e:
+                return f"Error: {e}"
+            return data if isinstance(data, str) else json.dumps(data, ensure_ascii=False)
+
+    tools = [
+        StandInTool(
+            name=entry["name"],
+            description=entry.get("description", entry["name"]),
+            args_schema=schema_to_model(entry["name"], entry.get("parameters", {})),
+        )
+        for entry in load_tools_cache(str(cache_path))
+    ]
+    return tools, counter
+
+
+class StandInMCPManager:
+    """Drop-in for `MCPConnectionManager` that serves stand-in tools without any network."""
+
+    def __init__(self, tools: List) -> None:
+        self.tools = tools
+
+    def get_tools(self, server_params: List[Dict]) -> List:
+        return list(self.tools)
+
+    def close(self) -> None:
+        pass
+
+
+def _estimate_tokens(text: str) -> int:
+    from ops_crew.output_budget import estimate_tokens
+
+    return estimate_tokens(text)
+
+
+class ScriptedLLM:
+    """
+    Builds an in-process CrewAI LLM that replies from a `ChatScript`.
+
+    Token usage is estimated and reported through CrewAI's token callbacks
+    so the agent's totals stay meaningful.
+    """
+
+    def __init__(self, plans: Dict[str, List[Tuple[str, Dict[str, Any]]]], latency: float = 0.0) -> None:
+        from ops_crew.mock_llm import ChatScript
+
+        self.script = ChatScript(plans)
+        self.latency = latency
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def respond(self, messages: Any) -> str:
+        return self.script.reply(messages)["content"]
+
+    def create(self):
+        """Returns a CrewAI `BaseLLM` instance driven by this script."""
+        from crewai.llms.base_llm import BaseLLM
+        from crewai.utilities.events import LLMCallCompletedEvent, LLMCallStartedEvent, crewai_event_bus
+        from crewai.utilities.events.llm_events import LLMCallType
+
+        script = self
+
+        class _ScriptedLLM(BaseLLM):
+            def call(self, messages, tools=None, callbacks=None, available_functions=None):
+                crewai_event_bus.emit(self, event=LLMCallStartedEvent(
+                    messages=messages, tools=tools, callbacks=callbacks, available_functions=available_functions,
+                ))
+                if script.latency:
+                    time.sleep(script.latency)
+                response = script.respond(messages)
+                prompt_tokens = _estimate_tokens(json.dumps(messages, ensure_ascii=False, default=str))
+                completion_tokens = _estimate_tokens(response)
+                with script._lock:
+                    script.calls += 1
+                    script.prompt_tokens += prompt_tokens
+                    script.completion_tokens += completion_tokens
+                usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                        prompt_tokens_details=None)
+                for callback in callbacks or []:
+                    if hasattr(callback, "log_success_event"):
+                        callback.log_success_event(kwargs={}, response_obj={"usage": usage},
+                                                   start_time=0, end_time=0)
+                crewai_event_bus.emit(self, event=LLMCallCompletedEvent(
+                    response=response, call_type=LLMCallType.LLM_CALL,
+                ))
+                return response
+
+            def supports_function_calling(self) -> bool:
+                return False
+
+            def supports_stop_words(self) -> bool:
+                return True
+
+            def get_context_window_size(self) -> int:
+                return 128000
+
+        llm = _ScriptedLLM(model="scripted-benchmark-llm", temperature=0.0)
+        llm.stream = False
+        return llm
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls = self.prompt_tokens = self.completion_tokens = 0
+
+
+def hash_embedding_function(dimensions: int = 256):
+    """Returns a chromadb embedding function over `ops_crew.mock_llm.hash_embedding`."""
+    from chromadb import Documents, EmbeddingFunction, Embeddings
+
+    from ops_crew.mock_llm import hash_embedding
+
+    class HashEmbedding(EmbeddingFunction):
+        def __init__(self) -> None:
+            pass
+
+        def __call__(self, input: Documents) -> Embeddings:
+            return [hash_embedding(text, dimensions) for text in input]
+
+    return HashEmbedding()
+
+
+def install_standins(plans: Dict[str, List[Tuple[str, Dict[str, Any]]]], llm_latency: float = 0.0,
+                     tool_latency: float = 0.0, nodes_per_cluster: int = 6) -> Tuple[ScriptedLLM, _Counter]:
+    """
+    Routes the agent's LLM, MCP tools and memory embeddings to local stand-ins.
+
+    Must be called before `ops_crew.crew` builds any session. Returns the
+    scripted LLM and the upstream tool-call counter.
+    """
+    # Proxies over live (stand-in) tools: skips background validation, which
+    # could otherwise rewrite tools_cache.json
+    os.environ["MCP_TOOLS_FROM_CACHE"] = "false"
+
+    import ops_crew.crew as crew_module
+    from ops_crew import mcp_manager
+
+    if not any(config.get("url") for config in crew_module.OpsCrew.mcp_server_params):
+        crew_module.OpsCrew.mcp_server_params = [{"url": "http://stand-in.local/sse", "transport": "sse"}]
+
+    tools, counter = build_standin_tools(tool_latency, nodes_per_cluster)
+    mcp_manager._manager = StandInMCPManager(tools)
+
+    script = ScriptedLLM(plans, llm_latency)
+    crew_module.LLM = lambda **kwargs: script.create()
+    crew_module.OpsCrew.embedder_config = lambda self: {
+        "provider": "custom", "config": {"embedder": hash_embedding_function()}
+    }
+    return script, counter
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+批量执行（JSONL）单元测试：并发、增量输出与断点续跑
+
+使用方法：
+    uv run pytest test/unit/test_batch.py
+"""
+
+import asyncio
+import json
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew.batch import BatchRunner, completed_ids, percentile, read_prompts
+
+
+def write_jsonl(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+
+
+def read_jsonl(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_percentile():
+    values = [0.1 * i for i in range(1, 101)]
+
+    assert percentile(values, 50) == values[49]
+    assert percentile(values, 99) == values[98]
+    assert percentile([], 95) == 0.0
+
+
+def test_read_prompts_accepts_repo_request_format(tmp_path):
+    source = tmp_path / "requests.jsonl"
+    write_jsonl(source, [{"request_id": "user-001", "title": "t", "body": "list clusters"}, {"prompt": "nodes"}])
+
+    assert list(read_prompts(str(source))) == [
+        {"id": "user-001", "input": "list clusters"},
+        {"id": "2", "input": "nodes"},
+    ]
+
+
+def test_runs_concurrently_and_resumes(tmp_path):
+    source = tmp_path / "prompts.jsonl"
+    output = tmp_path / "results.jsonl"
+    write_jsonl(source, [{"id": f"q{i}", "input": f"prompt {i}"} for i in range(6)])
+    state = {"running": 0, "peak": 0, "calls": []}
+
+    async def handler(user_input):
+        state["calls"].append(user_input)
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(0.01)
+        state["running"] -= 1
+        if user_input == "prompt 3" and state["calls"].count(user_input) == 1:
+            raise RuntimeError("flaky")
+        return user_input.upper()
+
+    report = asyncio.run(BatchRunner(handler, workers=3).run(str(source), str(output)))
+
+    assert (report["succeeded"], report["failed"]) == (5, 1)
+    assert state["peak"] == 3
+    assert completed_ids(str(output)) == {"q0", "q1", "q2", "q4", "q5"}
+
+    report = asyncio.run(BatchRunner(handler, workers=3).run(str(source), str(output)))
+
+    assert (report["succeeded"], report["skipped"]) == (1, 5)
+    results = [record for record in read_jsonl(output) if record["id"] == "q3"]
+    assert [record["error"] for record in results] == ["flaky", None]
+    assert results[-1]["result"] == "PROMPT 3"
+
+
+def test_malformed_lines_are_recorded_and_the_batch_continues(tmp_path):
+    source = tmp_path / "prompts.jsonl"
+    output = tmp_path / "results.jsonl"
+    source.write_text('{"id": "q0", "input": "prompt 0"}\n{"id": "q1", "input": \n["not", "an object"]\n'
+                      '{"id": "q3", "title": "no prompt"}\n{"id": "q4", "input": "prompt 4"}\n', encoding="utf-8")
+
+    async def handler(user_input):
+        await asyncio.sleep(0.01)
+        return user_input.upper()
+
+    report = asyncio.run(BatchRunner(handler, workers=2).run(str(source), str(output)))
+
+    assert (report["succeeded"], report["failed"]) == (2, 3)
+    records = {record["id"]: record for record in read_jsonl(output)}
+    assert records["q4"]["result"] == "PROMPT 4"
+    assert "invalid JSON" in records["2"]["error"] and "not a JSON object" in records["3"]["error"]
+    assert "no input/prompt/body" in records["q3"]["error"]
+
+
+def test_failing_worker_stops_the_others_before_the_output_closes(tmp_path):
+    source = tmp_path / "prompts.jsonl"
+    output = tmp_path / "results.jsonl"
+    write_jsonl(source, [{"id": f"q{i}", "input": f"prompt {i}"} for i in range(4)])
+
+    class Crash(BaseException):
+        pass
+
+    finished = []
+
+    async def handler(user_input):
+        if user_input == "prompt 0":
+            raise Crash()
+        await asyncio.sleep(0.2)
+        finished.append(user_input)
+        return user_input
+
+    async def main():
+        try:
+            await BatchRunner(handler, workers=3).run(str(source), str(output))
+        except Crash:
+            pass
+        await asyncio.sleep(0.3)
+
+    asyncio.run(main())
+    # The other workers were cancelled rather than left to write to the closed file
+    assert finished == []
+    assert output.read_text(encoding="utf-8") == ""
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+持久化 embedding 缓存单元测试
+
+验证按 (模型, 文本哈希) 命中、LRU 容量上限、多进程共享同一数据库文件、
+只为未命中的文本调用 embedding 接口，以及命中率上报。
+
+使用方法：
+    uv run pytest test/unit/test_embedding_cache.py
+"""
+
+import pathlib
+import sys
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew import embedding_cache
+from ops_crew.embedding_cache import EmbeddingCache, embed_with_cache
+from ops_crew.metrics import get_metrics_registry, track_request
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(text)), 0.5, -1.25] for text in texts]
+
+
+def test_vectors_are_keyed_by_model_and_text(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.db"))
+    cache.put_many("qwen", ["pod api-1 crashed"], [[0.25, -0.5, 1.0]])
+
+    assert cache.get_many("qwen", ["pod api-1 crashed", "other"]) == [[0.25, -0.5, 1.0], None]
+    assert cache.get_many("another-model", ["pod api-1 crashed"]) == [None]
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 1, 2)
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
+
+
+def test_least_recently_used_vectors_are_evicted(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.db"), max_entries=2)
+    cache.put_many("m", ["a"], [[1.0]])
+    cache.put_many("m", ["b"], [[2.0]])
+    cache.get_many("m", ["a"])  # "b" is now the least recently used
+    cache.put_many("m", ["c"], [[3.0]])
+
+    assert cache.get_many("m", ["a", "b", "c"]) == [[1.0], None, [3.0]]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_reads_and_writes_avoid_full_counts_and_per_hit_updates(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.db"), max_entries=1000)
+    statements = []
+    cache._connection.set_trace_callback(statements.append)
+    for index in range(50):
+        cache.put_many("m", [f"text {index}"], [[float(index)]])
+        cache.get_many("m", [f"text {index}", "text 0"])
+    lookups = len(statements)
+    cache.get_many("m", ["text 0", "unknown"])
+
+    assert sum("COUNT(*)" in statement for statement in statements) == 1
+    # Each insert writes the (two) touches buffered since the previous one in the same transaction
+    assert sum(statement.startswith("UPDATE embeddings") for statement in statements) == 1 + 48 * 2
+    assert all(statement.startswith("SELECT") for statement in statements[lookups:])
+    # Buffered hits are written when the cache closes
+    cache.close()
+    reopened = EmbeddingCache(str(tmp_path / "cache.db"), max_entries=1000)
+    last_used = dict(reopened._connection.execute("SELECT text_hash, last_used FROM embeddings").fetchall())
+    assert last_used[embedding_cache.text_hash("text 0")] == max(last_used.values())
+
+
+def test_cache_file_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "shared" / "cache.db")
+    first, second = EmbeddingCache(path), EmbeddingCache(path)
+    first.put_many("m", ["shared text"], [[0.5]])
+
+    assert second.get_many("m", ["shared text"]) == [[0.5]]
+    first.get_many("m", ["unknown"])
+    first.flush()
+    # Lifetime counters cover every process using the file
+    assert (second.stats()["lifetime_hits"], second.stats()["lifetime_misses"]) == (1, 1)
+    assert second.stats()["hits"] == 1 and second.stats()["misses"] == 0
+
+
+def test_embed_with_cache_only_embeds_unseen_texts(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.db"))
+    embedder = FakeEmbedder()
+
+    first = embed_with_cache(cache, "m", ["alpha", "beta", "alpha"], embedder)
+    second = embed_with_cache(cache, "m", ["beta", "gamma", "alpha"], embedder)
+
+    assert embedder.batches == [["alpha", "beta"], ["gamma"]]
+    assert first == [[5.0, 0.5, -1.25], [4.0, 0.5, -1.25], [5.0, 0.5, -1.25]]
+    assert second == [first[1], [5.0, 0.5, -1.25], first[0]]
+
+
+def test_hit_rates_are_reported(tmp_path, monkeypatch):
+    monkeypatch.delenv("METRICS_LOG", raising=False)
+    cache = EmbeddingCache(str(tmp_path / "cache.db"))
+    embed_with_cache(cache, "m", ["warm"], FakeEmbedder())
+
+    with track_request("remember this") as request:
+        embed_with_cache(cache, "m", ["warm", "cold"], FakeEmbedder())
+        embed_with_cache(cache, "m", ["warm"], FakeEmbedder())
+
+    assert request.fields["embedding_cache"] == {"hits": 2, "misses": 1}
+    assert [event["phase"] for event in request.events] == ["embedding"]
+    assert 'ops_crew_cache_lookups_total{cache="embedding",result="hit"}' in \
+        get_metrics_registry().render_prometheus()
+
+
+def test_shared_cache_follows_environment(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_cache, "_cache", None)
+    monkeypatch.setenv("EMBEDDING_CACHE", "false")
+    assert embedding_cache.get_embedding_cache() is None
+    assert embedding_cache.cached_embedder_config({"provider": "openai"}) == {"provider": "openai"}
+
+    monkeypatch.setenv("EMBEDDING_CACHE", "true")
+    monkeypatch.setenv("EMBEDDING_CACHE_PATH", str(tmp_path / "env.db"))
+    monkeypatch.setenv("EMBEDDING_CACHE_MAX_ENTRIES", "7")
+    cache = embedding_cache.get_embedding_cache()
+    assert cache.path == str(tmp_path / "env.db") and cache.max_entries == 7
+    assert embedding_cache.get_embedding_cache() is cache
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+多集群并发扇出执行器单元测试
+
+使用方法：
+    uv run pytest test/unit/test_fanout.py
+"""
+
+import json
+import pathlib
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew.fanout import cluster_names, fan_out
+
+
+class SlowTool:
+    def __init__(self, name, delay=0.1, fail_for=()):
+        self.name = name
+        self.delay = delay
+        self.fail_for = set(fail_for)
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def run(self, **kwargs):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+        if kwargs.get("cluster") in self.fail_for:
+            raise RuntimeError("cluster unreachable")
+        return json.dumps({"tool": self.name, "cluster": kwargs["cluster"]})
+
+
+class ListClusters:
+    name = "LIST_CLUSTERS"
+
+    def run(self):
+        return json.dumps({"clusters": [{"name": "a"}, {"name": "b"}, {"name": "c"}, {"name": "d"}]})
+
+
+def test_cluster_names_formats():
+    assert cluster_names('[{"name": "a"}, {"clusterName": "b"}]') == ["a", "b"]
+    assert cluster_names(["x", "y"]) == ["x", "y"]
+    with pytest.raises(ValueError):
+        cluster_names("not json")
+
+
+def test_fan_out_runs_concurrently_and_merges():
+    info = SlowTool("GET_CLUSTER_INFO")
+    nodes = SlowTool("LIST_NODES", fail_for={"c"})
+    tools = {"LIST_CLUSTERS": ListClusters(), "GET_CLUSTER_INFO": info, "LIST_NODES": nodes}
+
+    started = time.monotonic()
+    report = fan_out(tools, plan=["GET_CLUSTER_INFO", "LIST_NODES"], max_parallel=8)
+    elapsed = time.monotonic() - started
+
+    # 8 calls of 0.1s each finish in roughly one round
+    assert elapsed < 0.5
+    assert [entry["cluster"] for entry in report["clusters"]] == ["a", "b", "c", "d"]
+    assert report["clusters"][0]["LIST_NODES"] == {"tool": "LIST_NODES", "cluster": "a"}
+    assert report["clusters"][2]["errors"] == {"LIST_NODES": "cluster unreachable"}
+    assert report["summary"]["calls"] == 8
+    assert report["summary"]["failed_calls"] == 1
+
+
+def test_fan_out_respects_parallelism_bound():
+    info = SlowTool("GET_CLUSTER_INFO", delay=0.05)
+
+    fan_out({"GET_CLUSTER_INFO": info}, plan=["GET_CLUSTER_INFO"], clusters=["a", "b", "c", "d", "e"], max_parallel=2)
+
+    assert info.peak == 2
+
+
+def test_fan_out_rejects_unknown_tools():
+    with pytest.raises(ValueError, match="Unknown tools"):
+        fan_out({}, plan=["LIST_PODS"], clusters=["a"])
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+常见查询快速路径（绕过LLM）单元测试
+
+使用方法：
+    uv run pytest test/unit/test_fast_path.py
+"""
+
+import json
+import pathlib
+import sys
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew.fast_path import FastPathRouter, match_intent, render_table
+
+
+class FakeTool:
+    def __init__(self, name, result):
+        self.name = name
+        self.result = result
+        self.calls = []
+
+    def run(self, **kwargs):
+        self.calls.append(kwargs)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+@pytest.mark.parametrize("query, tool_name, arguments", [
+    ("list clusters", "LIST_CLUSTERS", {}),
+    ("Show me all the Kubernetes clusters?", "LIST_CLUSTERS", {}),
+    ("列出所有集群", "LIST_CLUSTERS", {}),
+    ("show namespaces in cluster prod-01", "LIST_NAMESPACES", {"cluster": "prod-01"}),
+    ("nodes in staging", "LIST_NODES", {"cluster": "staging"}),
+    ("查看 prod-01 集群的节点", "LIST_NODES", {"cluster": "prod-01"}),
+    ("prod-01的命名空间", "LIST_NAMESPACES", {"cluster": "prod-01"}),
+    ("describe cluster Prod.East", "GET_CLUSTER_INFO", {"cluster": "Prod.East"}),
+    ("nodes in all-prod", "LIST_NODES", {"cluster": "all-prod"}),
+    ("查看k8s-prod集群的节点", "LIST_NODES", {"cluster": "k8s-prod"}),
+])
+def test_match_intent(query, tool_name, arguments):
+    intent = match_intent(query)
+
+    assert intent is not None
+    assert (intent.tool_name, intent.arguments) == (tool_name, arguments)
+
+
+@pytest.mark.parametrize("query", [
+    "Please provide a report on all Kubernetes clusters",
+    "which cluster has the most pods?",
+    "show nodes",
+    "why is my pod crashing",
+    "show nodes in the cluster",
+    "list namespaces in my cluster",
+    "get nodes for each cluster",
+    "show namespaces for every cluster",
+    "describe cluster health",
+    "查看k8s集群的节点",
+])
+def test_open_questions_fall_through(query):
+    assert match_intent(query) is None
+
+
+def test_render_table_variants():
+    assert render_table({"clusters": [{"name": "a", "status": "Ready"}, {"name": "b", "version": "1.29"}]}) == (
+        "| name | status | version |\n| --- | --- | --- |\n| a | Ready | - |\n| b | - | 1.29 |"
+    )
+    assert render_table(["default", "kube-system"]).splitlines()[2] == "| default |"
+    assert render_table({"name": "a", "nodes": 3}).startswith("| Field | Value |")
+    assert render_table([]) == "_No items found._"
+    assert render_table("plain text") is None
+
+
+def test_router_answers_and_falls_through():
+    clusters = FakeTool("LIST_CLUSTERS", json.dumps([{"name": "prod", "status": "Ready"}]))
+    nodes = FakeTool("LIST_NODES", "not json")
+    info = FakeTool("GET_CLUSTER_INFO", RuntimeError("mcp down"))
+    provided = []
+
+    def provider():
+        provided.append(1)
+        return [clusters, nodes, info]
+
+    router = FastPathRouter(provider)
+
+    assert router.try_answer("what's wrong with prod?") is None
+    assert provided == []
+
+    answer = router.try_answer("list clusters")
+    assert answer.startswith("### Clusters\n\n| name | status |")
+    assert router.try_answer("nodes in prod") is None
+    assert router.try_answer("describe cluster prod") is None
+    assert nodes.calls == [{"cluster": "prod"}]
+    assert (router.answered, router.fell_through) == (1, 2)
+    assert provided == [1]
+
+
+@pytest.mark.parametrize("result", [
+    "Error: cluster 'staging' not found",
+    json.dumps({"error": "cluster 'staging' not found"}),
+])
+def test_router_falls_through_on_error_results(result):
+    router = FastPathRouter(lambda: [FakeTool("LIST_NODES", result)])
+
+    assert router.try_answer("nodes in staging") is None
+    assert (router.answered, router.fell_through) == (0, 1)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Pod 日志本地预分析（摘要）单元测试
+
+使用方法：
+    uv run pytest test/unit/test_log_digest.py
+"""
+
+import json
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew.log_digest import LogDigest, digest_pod_logs, parse_level, parse_timestamp
+
+
+def sample_log(repeats=200):
+    lines = []
+    for i in range(repeats):
+        second = i % 60
+        lines.append(f"2025-06-30T13:00:{second:02d}.123456Z INFO request {i} served in {i % 17}ms")
+        if i % 10 == 0:
+            lines.append(f"2025-06-30T13:00:{second:02d}.200000Z ERROR connection to db-{i % 3} refused after {i}ms")
+        if i % 25 == 0:
+            lines.append(f"2025-06-30T13:00:{second:02d}.300000Z WARN slow query took {i * 3}ms")
+    lines += [
+        "2025-06-30T13:01:00.000000Z Traceback (most recent call last):",
+        '2025-06-30T13:01:00.000001Z   File "app.py", line 10, in handler',
+        "2025-06-30T13:01:00.000002Z     conn.execute(query)",
+        "2025-06-30T13:01:00.000003Z ConnectionError: db unavailable",
+        "2025-06-30T13:01:01.000000Z INFO shutting down",
+    ]
+    return lines
+
+
+def test_parse_level_variants():
+    assert parse_level("2025-06-30T13:00:00Z ERROR boom") == "ERROR"
+    assert parse_level('{"level":"warning","msg":"x"}') == "WARN"
+    assert parse_level("E0612 10:00:00.123456 1 controller.go:42] sync failed") == "ERROR"
+    assert parse_level("plain text") is None
+
+
+def test_parse_timestamp():
+    assert parse_timestamp("2025-06-30T13:00:01.5Z INFO x") == "2025-06-30T13:00:01.5Z"
+    assert parse_timestamp("[2025-06-30 13:00:01,123] WARN x") == "2025-06-30 13:00:01,123"
+    assert parse_timestamp("no timestamp") is None
+
+
+def test_digest_groups_messages_and_extracts_traces():
+    summary = LogDigest().feed_all(sample_log()).summary()
+
+    assert summary["levels"]["ERROR"] == 20
+    assert summary["levels"]["WARN"] == 8
+    assert summary["time_range"] == ["2025-06-30T13:00:00.123456Z", "2025-06-30T13:01:01.000000Z"]
+    top = summary["templates"][0]
+    assert (top["level"], top["count"]) == ("ERROR", 20)
+    assert top["template"] == "ERROR connection to <*> refused after <*>"
+    assert top["first_seen"] == "2025-06-30T13:00:00.200000Z"
+    assert top["examples"][0] == ["db-0", "0ms"]
+    assert len(summary["stack_traces"]) == 1
+    assert summary["stack_traces"][0][-1] == "ConnectionError: db unavailable"
+    assert summary["tail"][-1].endswith("shutting down")
+
+
+def test_digest_pod_logs_compresses_large_results_only():
+    text = "\n".join(sample_log())
+
+    digest = digest_pod_logs(text)
+
+    assert digest.startswith("Log digest: ")
+    assert len(digest) * 5 < len(text)
+    assert digest_pod_logs("a\nb\nc") == "a\nb\nc"
+    assert digest_pod_logs(json.dumps({"logs": text})).startswith("Log digest: ")
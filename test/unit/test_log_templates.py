@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+日志模板挖掘（Drain）单元测试
+
+使用方法：
+    uv run pytest test/unit/test_log_templates.py
+"""
+
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew.log_templates import WILDCARD, TemplateMiner
+
+
+def test_lines_differing_in_ids_share_a_template():
+    miner = TemplateMiner()
+    for pod in ("api-7f9c", "api-1a2b", "web-3c4d"):
+        miner.add(f"Back-off restarting failed container in pod {pod}")
+
+    assert len(miner.clusters) == 1
+    cluster = miner.clusters[0]
+    assert cluster.template == f"Back-off restarting failed container in pod {WILDCARD}"
+    assert cluster.size == 3
+    assert cluster.examples == [["api-7f9c"], ["api-1a2b"], ["web-3c4d"]]
+
+
+def test_words_that_differ_become_wildcards_above_the_threshold():
+    miner = TemplateMiner()
+    miner.add("login failed for user alice from office")
+    miner.add("login failed for user bob from office")
+    miner.add("disk full")
+
+    assert [cluster.template for cluster in miner.clusters] == [
+        f"login failed for user {WILDCARD} from office",
+        "disk full",
+    ]
+
+
+def test_cluster_limit_bounds_memory():
+    miner = TemplateMiner(max_clusters=2)
+    miner.add("alpha one")
+    miner.add("beta two three")
+    assert miner.add("gamma four five six") is None
+
+    assert miner.stats() == {"lines": 3, "templates": 2, "unclustered": 1, "compression_ratio": 1.5}
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+MCPConnectionManager 单元测试
+
+使用假的 adapter 替代真实 SSE 连接，验证：
+1. 每个服务器只建立一次连接
+2. 多服务器并发连接，且工具合并顺序确定
+3. 单服务器超时与关闭行为
+
+使用方法：
+    uv run pytest test/unit/test_mcp_manager.py
+"""
+
+import pathlib
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew.mcp_manager import MCPConnectionManager
+
+
+class FakeAdapter:
+    def __init__(self, tool_names):
+        self.tools = [SimpleNamespace(name=name) for name in tool_names]
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+
+class FakeManager(MCPConnectionManager):
+    def __init__(self, servers, delays=None, connect_timeout=5):
+        super().__init__(connect_timeout=connect_timeout)
+        self.servers = servers
+        self.delays = delays or {}
+        self.connect_calls = []
+        self.created = []
+        self._calls_lock = threading.Lock()
+
+    def _connect(self, server_config):
+        url = server_config["url"]
+        with self._calls_lock:
+            self.connect_calls.append(url)
+        time.sleep(self.delays.get(url, 0))
+        adapter = FakeAdapter(self.servers[url])
+        self.created.append(adapter)
+        return adapter
+
+
+def params(*urls):
+    return [{"url": url, "transport": "sse"} for url in urls]
+
+
+def test_connects_each_server_once():
+    manager = FakeManager({"http://a": ["LIST_CLUSTERS"]})
+
+    manager.get_tools(params("http://a"))
+    manager.get_tools(params("http://a"))
+
+    assert manager.connect_calls == ["http://a"]
+
+
+def test_servers_connect_concurrently_with_deterministic_order():
+    manager = FakeManager(
+        {"http://a": ["A1", "A2"], "http://b": ["B1"], "http://c": ["C1"]},
+        delays={"http://a": 0.3, "http://b": 0.3, "http://c": 0.3},
+    )
+
+    started = time.monotonic()
+    tools = manager.get_tools(params("http://a", "http://b", "http://c"))
+    elapsed = time.monotonic() - started
+
+    assert [tool.name for tool in tools] == ["A1", "A2", "B1", "C1"]
+    assert elapsed < 0.8
+
+
+def test_duplicate_tool_names_keep_first_server():
+    manager = FakeManager({"http://a": ["LIST_NODES"], "http://b": ["LIST_NODES", "B1"]})
+
+    tools = manager.get_tools(params("http://a", "http://b"))
+
+    assert [tool.name for tool in tools] == ["LIST_NODES", "B1"]
+
+
+def test_slow_server_times_out_and_is_stopped_later():
+    manager = FakeManager(
+        {"http://fast": ["F1"], "http://slow": ["S1"]},
+        delays={"http://slow": 0.5},
+        connect_timeout=0.1,
+    )
+
+    with pytest.raises(RuntimeError, match="超时"):
+        manager.get_tools(params("http://fast", "http://slow"))
+
+    time.sleep(0.6)
+    slow_adapter = next(a for a in manager.created if a.tools[0].name == "S1")
+    assert slow_adapter.stopped
+    # The fast server stays connected and is reused on retry
+    manager.delays = {}
+    manager.get_tools(params("http://fast"))
+    assert manager.connect_calls.count("http://fast") == 1
+
+
+def test_close_stops_adapters_and_rejects_new_calls():
+    manager = FakeManager({"http://a": ["A1"]})
+    manager.get_tools(params("http://a"))
+
+    manager.close()
+    manager.close()
+
+    assert manager.created[0].stopped
+    with pytest.raises(RuntimeError):
+        manager.get_tools(params("http://a"))
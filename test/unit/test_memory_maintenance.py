@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+memory 存储维护单元测试
+
+验证按时间和条数的保留策略、近似重复条目去重、长期记忆表与 embedding 缓存
+的清理、SQLite VACUUM、向量索引重建，以及维护前后的大小/条数/查询延迟报告。
+
+使用方法：
+    uv run pytest test/unit/test_memory_maintenance.py
+"""
+
+import os
+import pathlib
+import sqlite3
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew.embedding_cache import EmbeddingCache, text_hash
+from ops_crew.memory_maintenance import (
+    MemoryMaintenance,
+    expired_keys,
+    maintenance_from_env,
+    near_duplicates,
+    start_memory_maintenance,
+)
+
+DAY = 86400
+
+
+def create_long_term_store(path, rows):
+    """Creates CrewAI's long-term memory table with `(task, metadata, age_days)` rows."""
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE long_term_memories (id INTEGER PRIMARY KEY AUTOINCREMENT, task_description TEXT,"
+            " metadata TEXT, datetime TEXT, score REAL)")
+        connection.executemany(
+            "INSERT INTO long_term_memories (task_description, metadata, datetime, score) VALUES (?, ?, ?, 8)",
+            [(task, metadata, str(time.time() - age * DAY)) for task, metadata, age in rows])
+
+
+def long_term_rows(path):
+    with sqlite3.connect(path) as connection:
+        return connection.execute("SELECT task_description, metadata FROM long_term_memories ORDER BY id").fetchall()
+
+
+def test_retention_by_age_then_count():
+    rows = [("a", 100.0), ("b", 500.0), ("c", 800.0), ("d", 900.0), ("e", 950.0)]
+    assert expired_keys(rows, now=1000.0) == set()
+    assert expired_keys(rows, now=1000.0, max_age=300) == {"a", "b"}
+    assert expired_keys(rows, now=1000.0, max_entries=2) == {"a", "b", "c"}
+    assert expired_keys(rows, now=1000.0, max_age=150, max_entries=1) == {"a", "b", "c", "d"}
+
+
+def test_near_duplicates_keep_the_newest_entry():
+    pytest.importorskip("numpy")
+    ids = ["old", "other", "new"]
+    vectors = [[1.0, 0.0], [0.0, 1.0], [0.999, 0.02]]
+    neighbours = [["old", "new", "other"], ["other", "old", "new"], ["new", "old", "other"]]
+    assert near_duplicates(ids, vectors, neighbours, threshold=0.98) == {"old"}
+    assert near_duplicates(ids, vectors, neighbours, threshold=0.9999) == set()
+
+
+def test_long_term_memory_and_embedding_cache_are_pruned(tmp_path):
+    long_term = str(tmp_path / "long_term_memory_storage.db")
+    create_long_term_store(long_term, [
+        ("list clusters", '{"quality": 8}', 60),
+        ("list clusters", '{"quality": 7}', 2),
+        ("list clusters", '{"quality": 7}', 1),
+        ("check pods", '{"quality": 9}', 0),
+    ])
+    cache = EmbeddingCache(str(tmp_path / "embedding_cache.db"))
+    cache.put_many("m", ["stale", "fresh"], [[0.1], [0.2]])
+    cache._connection.execute("UPDATE embeddings SET last_used = ? WHERE text_hash = ?",
+                              (time.time() - 90 * DAY, text_hash("stale")))
+    cache.close()
+
+    dry_run = MemoryMaintenance(str(tmp_path), max_age_days=30, dry_run=True).run()
+    assert dry_run["totals"]["expired"] == 2 and dry_run["totals"]["duplicates"] == 1
+    assert len(long_term_rows(long_term)) == 4
+
+    report = MemoryMaintenance(str(tmp_path), max_age_days=30).run()
+    assert long_term_rows(long_term) == [("list clusters", '{"quality": 7}'), ("check pods", '{"quality": 9}')]
+    assert EmbeddingCache(str(tmp_path / "embedding_cache.db")).get_many("m", ["stale", "fresh"]) == \
+        [None, pytest.approx([0.2])]
+    store = report["stores"]["long_term_memory_storage.db"]
+    assert (store["before"]["entries"], store["after"]["entries"]) == (4, 2)
+    assert (store["expired"], store["duplicates"]) == (1, 1)
+    assert store["before"]["query_ms"] is not None
+    assert report["vacuum_errors"] == {}
+
+
+def test_vector_store_retention_dedup_and_rebuild(tmp_path):
+    chromadb = pytest.importorskip("chromadb")
+    from chromadb.config import Settings
+
+    store = str(tmp_path / "entities" / "k8s_expert")
+    client = chromadb.PersistentClient(path=store, settings=Settings(allow_reset=True))
+    collection = client.create_collection("entities", embedding_function=None)
+    documents = ["prod-east(cluster): healthy", "prod-west(cluster): degraded", "staging(cluster): healthy",
+                 "prod-west(cluster): degraded", "dev(cluster): idle"]
+    vectors = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0], [0.0, 1.0, 0.001], [0.6, 0.0, 0.8]]
+    for index, (document, vector) in enumerate(zip(documents, vectors)):
+        collection.add(ids=[f"e{index}"], documents=[document], embeddings=[vector])
+    old_segments = set(os.listdir(store))
+
+    report = MemoryMaintenance(str(tmp_path), max_entries=4, rebuild_index=True).run()
+    result = report["stores"][os.path.join("entities", "k8s_expert")]
+    assert (result["expired"], result["duplicates"], result["rebuilt"]) == (1, 1, True)
+    assert (result["before"]["entries"], result["after"]["entries"]) == (5, 3)
+    assert result["before"]["query_ms"] is not None
+
+    rebuilt = client.get_collection("entities", embedding_function=None)
+    assert sorted(rebuilt.get()["ids"]) == ["e2", "e3", "e4"]
+    # The HNSW directory of the replaced collection is gone
+    assert not (set(os.listdir(store)) & old_segments - {"chroma.sqlite3"})
+
+
+def test_maintenance_follows_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMORY_RETENTION_DAYS", "14")
+    monkeypatch.setenv("MEMORY_MAX_ENTRIES", "500")
+    monkeypatch.setenv("MEMORY_DEDUP_SIMILARITY", "0.95")
+    maintenance = maintenance_from_env(str(tmp_path), dry_run=True)
+    assert (maintenance.max_age, maintenance.max_entries, maintenance.dedup_similarity) == (14 * DAY, 500, 0.95)
+    assert maintenance.dry_run
+
+    monkeypatch.delenv("MEMORY_MAINTENANCE_INTERVAL_HOURS", raising=False)
+    assert start_memory_maintenance() is None
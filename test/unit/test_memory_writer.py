@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+memory 写入批处理与后台写入队列单元测试
+
+验证向量型 memory 的写入被缓冲，并在达到批大小、时间窗口到期、显式 flush
+或检索前统一写出，每批只调用一次 embedding 接口；以及 memory 写入移交后台
+队列后按序执行、队列有界、关闭时写完，并导出积压与延迟指标。
+
+使用方法：
+    uv run pytest test/unit/test_memory_writer.py
+"""
+
+import pathlib
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew import memory_writer
+from ops_crew.memory_writer import MemoryWriteBatcher, MemoryWriteQueue, batch_memory_writes, defer_memory_writes
+from ops_crew.metrics import get_metrics_registry
+
+
+class FakeEmbedder:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("embedding endpoint down")
+        return [[float(len(text))] for text in texts]
+
+
+class FakeCollection:
+    def __init__(self):
+        self.documents = []
+        self.embeddings = []
+
+    def add(self, documents, metadatas, ids, embeddings):
+        self.documents += documents
+        self.embeddings += embeddings
+
+
+class FakeStorage:
+    """Shape of CrewAI's RAGStorage: embedding function plus a collection."""
+
+    def __init__(self, embedder):
+        self.embedder_config = embedder
+        self.collection = FakeCollection()
+        self.searched_with = None
+
+    def _generate_embedding(self, text, metadata):
+        raise AssertionError("saves must go through the batcher")
+
+    def save(self, value, metadata):
+        self._generate_embedding(value, metadata)
+
+    def search(self, query, limit=3):
+        self.searched_with = list(self.collection.documents)
+        return []
+
+
+def fake_crew(embedder):
+    return SimpleNamespace(
+        _short_term_memory=SimpleNamespace(storage=FakeStorage(embedder)),
+        _entity_memory=SimpleNamespace(storage=FakeStorage(embedder)),
+        _long_term_memory=SimpleNamespace(storage=object()),
+    )
+
+
+def test_saves_across_stores_are_embedded_in_one_call():
+    embedder = FakeEmbedder()
+    crew = fake_crew(embedder)
+    batcher = MemoryWriteBatcher(window=60)
+    assert batcher.attach(crew) == 2
+
+    crew._short_term_memory.storage.save("listed 5 clusters", {"agent": "k8s"})
+    for name in ("prod-east", "prod-west", "prod-east"):
+        crew._entity_memory.storage.save(f"{name}(cluster): healthy", {})
+    assert embedder.batches == [] and batcher.stats()["pending"] == 4
+
+    assert batcher.flush() == 4
+    assert embedder.batches == [["listed 5 clusters", "prod-east(cluster): healthy", "prod-west(cluster): healthy"]]
+    assert crew._short_term_memory.storage.collection.documents == ["listed 5 clusters"]
+    assert crew._entity_memory.storage.collection.embeddings == [[27.0], [27.0], [27.0]]
+    assert batcher.stats() == {"pending": 0, "batches": 1, "items": 4, "embed_calls": 1, "failed": 0}
+
+
+def test_batch_is_flushed_when_full_or_when_window_expires():
+    embedder = FakeEmbedder()
+    crew = fake_crew(embedder)
+    batcher = MemoryWriteBatcher(window=0.05, max_batch=2)
+    batcher.attach(crew)
+    storage = crew._entity_memory.storage
+
+    storage.save("a", {})
+    storage.save("b", {})
+    assert embedder.batches == [["a", "b"]]
+
+    storage.save("c", {})
+    deadline = time.monotonic() + 2
+    while batcher.stats()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert embedder.batches == [["a", "b"], ["c"]]
+
+
+def test_search_sees_pending_writes():
+    crew = fake_crew(FakeEmbedder())
+    batcher = MemoryWriteBatcher(window=60)
+    batcher.attach(crew)
+    storage = crew._short_term_memory.storage
+
+    storage.save("pod api-1 crashed", {})
+    storage.search("api-1")
+    assert storage.searched_with == ["pod api-1 crashed"]
+
+
+def test_failed_embedding_drops_the_batch():
+    crew = fake_crew(FakeEmbedder(fail=True))
+    batcher = MemoryWriteBatcher(window=60)
+    batcher.attach(crew)
+    crew._entity_memory.storage.save("x", {})
+
+    assert batcher.flush() == 1
+    assert batcher.stats()["failed"] == 1 and crew._entity_memory.storage.collection.documents == []
+
+
+def test_batcher_follows_environment(monkeypatch):
+    crew = fake_crew(FakeEmbedder())
+    monkeypatch.setenv("MEMORY_WRITE_BATCH", "false")
+    assert batch_memory_writes(crew) is None
+
+    monkeypatch.setenv("MEMORY_WRITE_BATCH", "true")
+    monkeypatch.setenv("MEMORY_BATCH_WINDOW_MS", "20")
+    monkeypatch.setenv("MEMORY_BATCH_MAX", "8")
+    batcher = batch_memory_writes(crew)
+    assert (batcher.window, batcher.max_batch) == (0.02, 8)
+    # Stores already routed through a batcher are not wrapped twice
+    assert batch_memory_writes(crew) is None
+    assert batch_memory_writes(SimpleNamespace()) is None
+
+
+def test_queue_runs_jobs_in_order_in_the_background():
+    writer = MemoryWriteQueue()
+    release, done = threading.Event(), []
+    writer.submit(release.wait)
+    writer.submit(lambda: done.append("short_term"))
+    writer.submit(lambda: 1 / 0, name="broken")
+    writer.submit(lambda: done.append("entity"))
+
+    assert done == [] and writer.depth() == 4
+    time.sleep(0.05)
+    assert writer.lag() >= 0.05
+    release.set()
+    assert writer.flush(timeout=2)
+    assert done == ["short_term", "entity"]
+    stats = writer.stats()
+    assert (stats["depth"], stats["completed"], stats["failed"]) == (0, 4, 1)
+    assert stats["lag_seconds"] == 0.0 and stats["max_lag_seconds"] >= 0.05
+
+
+def test_full_queue_blocks_submitters():
+    writer = MemoryWriteQueue(max_depth=1)
+    release = threading.Event()
+    writer.submit(release.wait)
+    time.sleep(0.05)  # the worker has taken the first job
+    writer.submit(lambda: None)
+
+    blocked = threading.Thread(target=writer.submit, args=(lambda: None,))
+    blocked.start()
+    blocked.join(0.1)
+    assert blocked.is_alive()
+    release.set()
+    blocked.join(2)
+    assert not blocked.is_alive() and writer.flush(timeout=2)
+
+
+def test_close_flushes_and_later_jobs_run_inline():
+    writer = MemoryWriteQueue()
+    done = []
+    writer.submit(lambda: (time.sleep(0.05), done.append("queued")))
+    assert writer.close(timeout=2) and done == ["queued"]
+
+    writer.submit(lambda: done.append("inline"))
+    assert done == ["queued", "inline"]
+
+
+RECORDED = []
+
+
+class FakeExecutor:
+    def __init__(self, agent, task):
+        self.crew, self.agent, self.task, self._printer = object(), agent, task, None
+
+    def _create_short_term_memory(self, output):
+        RECORDED.append((threading.current_thread().name, self.task.description, self.agent.llm.stream, output))
+
+
+def test_executor_memory_writes_are_deferred_with_a_snapshot():
+    RECORDED.clear()
+    task = SimpleNamespace(description="show me all k8s clusters")
+    agent = SimpleNamespace(role="k8s expert", llm=SimpleNamespace(stream=True), agent_executor=None)
+    agent.create_agent_executor = lambda **kwargs: setattr(agent, "agent_executor", FakeExecutor(agent, task))
+    writer = MemoryWriteQueue()
+    release = threading.Event()
+    writer.submit(release.wait)
+    assert defer_memory_writes(SimpleNamespace(agents=[agent]), writer) == 1
+    assert defer_memory_writes(SimpleNamespace(agents=[agent]), writer) == 0
+
+    agent.create_agent_executor(task=task)
+    agent.agent_executor._create_short_term_memory("5 clusters")
+    task.description = "the next request"
+    assert RECORDED == []
+
+    release.set()
+    writer.flush(timeout=2)
+    assert RECORDED == [("memory-writer", "show me all k8s clusters", False, "5 clusters")]
+
+
+def test_shared_queue_follows_environment(monkeypatch):
+    monkeypatch.setattr(memory_writer, "_writer", None)
+    monkeypatch.setenv("MEMORY_ASYNC_WRITES", "false")
+    assert memory_writer.get_memory_write_queue() is None
+
+    monkeypatch.setenv("MEMORY_ASYNC_WRITES", "true")
+    monkeypatch.setenv("MEMORY_WRITE_QUEUE_DEPTH", "5")
+    writer = memory_writer.get_memory_write_queue()
+    assert writer.max_depth == 5 and memory_writer.get_memory_write_queue() is writer
+    metrics = get_metrics_registry().render_prometheus()
+    assert "# TYPE ops_crew_memory_write_queue_depth gauge" in metrics
+    assert "ops_crew_memory_write_lag_seconds 0" in metrics
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+请求级延迟与 token 指标单元测试
+
+使用方法：
+    uv run pytest test/unit/test_metrics.py
+"""
+
+import json
+import pathlib
+import sys
+import urllib.request
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew import metrics
+from ops_crew.metrics import (
+    Histogram,
+    MetricsRegistry,
+    instrument_memory,
+    start_metrics_server,
+    timed,
+    track_request,
+)
+
+
+class FakeSummary:
+    def __init__(self, prompt, completion, cached):
+        self.prompt_tokens = prompt
+        self.completion_tokens = completion
+        self.cached_prompt_tokens = cached
+
+
+class FakeTokenProcess:
+    def __init__(self):
+        self.summary = FakeSummary(0, 0, 0)
+
+    def get_summary(self):
+        return self.summary
+
+
+class FakeMemory:
+    def __init__(self):
+        self.saved = []
+
+    def save(self, value):
+        self.saved.append(value)
+
+    def search(self, query):
+        return [value for value in self.saved if query in value]
+
+
+class FakeCrew:
+    def __init__(self):
+        self._short_term_memory = FakeMemory()
+        self._long_term_memory = None
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(0.1, 1, 10))
+    for value in (0.05, 0.5, 5, 50):
+        histogram.observe(value)
+
+    assert histogram.counts == [1, 2, 3]
+    assert histogram.count == 4
+    assert histogram.sum == 55.55
+
+
+def test_prometheus_rendering():
+    registry = MetricsRegistry(buckets=(1, 10))
+    registry.observe("tool_call", 0.5)
+    registry.observe("tool_call", 5)
+    registry.add_tokens(prompt=100, completion=20)
+    registry.count_request("ok")
+    registry.count_tool_call('LIST_"NODES"')
+
+    text = registry.render_prometheus()
+
+    assert 'ops_crew_phase_seconds_bucket{phase="tool_call",le="1"} 1' in text
+    assert 'ops_crew_phase_seconds_bucket{phase="tool_call",le="+Inf"} 2' in text
+    assert 'ops_crew_phase_seconds_count{phase="tool_call"} 2' in text
+    assert 'ops_crew_llm_tokens_total{type="prompt"} 100' in text
+    assert 'ops_crew_requests_total{status="ok"} 1' in text
+    assert 'ops_crew_tool_calls_total{tool="LIST_\\"NODES\\""} 1' in text
+
+
+def test_request_timeline_tokens_and_jsonl_log(tmp_path, monkeypatch):
+    log_path = tmp_path / "metrics.jsonl"
+    monkeypatch.setenv("METRICS_LOG", str(log_path))
+    token_process = FakeTokenProcess()
+    crew = FakeCrew()
+    instrument_memory(crew)
+
+    with track_request("list nodes") as request:
+        request.token_counter = token_process
+        with timed("tool_call", "LIST_NODES"):
+            pass
+        metrics._llm_call_started(None)
+        token_process.summary = FakeSummary(120, 30, 80)
+        metrics._llm_call_finished(None)
+        crew._short_term_memory.save("nodes are ready")
+        assert crew._short_term_memory.search("ready") == ["nodes are ready"]
+
+    record = json.loads(log_path.read_text().strip())
+    assert record["request_id"] == request.request_id
+    assert record["status"] == "ok"
+    assert record["tokens"] == {"prompt": 120, "completion": 30, "cached_prompt": 80}
+    assert set(record["phases"]) == {"tool_call", "llm_call", "memory_write", "memory_read"}
+    assert [event["phase"] for event in record["events"]] == [
+        "tool_call", "llm_call", "memory_write", "memory_read"
+    ]
+    assert record["events"][0]["name"] == "LIST_NODES"
+
+
+def test_failed_request_is_logged_with_error(tmp_path, monkeypatch):
+    log_path = tmp_path / "metrics.jsonl"
+    monkeypatch.setenv("METRICS_LOG", str(log_path))
+
+    try:
+        with track_request("boom"):
+            raise RuntimeError("MCP down")
+    except RuntimeError:
+        pass
+
+    record = json.loads(log_path.read_text().strip())
+    assert (record["status"], record["error"]) == ("error", "MCP down")
+
+
+def test_metrics_server_serves_prometheus_text():
+    server = start_metrics_server("127.0.0.1", 0)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            body = response.read().decode()
+            assert response.headers["Content-Type"].startswith("text/plain")
+        assert "# TYPE ops_crew_phase_seconds histogram" in body
+    finally:
+        server.shutdown()
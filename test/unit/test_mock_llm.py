@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Mock LLM 服务器单元测试
+
+验证脚本化回复（ReAct 文本与 tool_calls）、OpenAI 兼容的非流式/流式响应、
+首 token 延迟与生成速度，以及确定性 embedding 接口。
+
+使用方法：
+    uv run pytest test/unit/test_mock_llm.py
+"""
+
+import asyncio
+import json
+import math
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew.mock_llm import ChatScript, MockLLMServer, hash_embedding
+
+PLANS = {"show me all k8s clusters": [("LIST_CLUSTERS", {}), ("GET_CLUSTER_INFO", {"cluster": "prod-east"})]}
+
+
+def test_script_follows_plan_in_react_format():
+    script = ChatScript(PLANS)
+    messages = [{"role": "system", "content": "You are a k8s expert"},
+                {"role": "user", "content": "Task: show me all k8s clusters"}]
+    first = script.reply(messages)["content"]
+    assert "Action: LIST_CLUSTERS" in first and "Action Input: {}" in first
+
+    messages.append({"role": "assistant", "content": first + "\nObservation: [...]"})
+    second = script.reply(messages)["content"]
+    assert "Action: GET_CLUSTER_INFO" in second and '"prod-east"' in second
+
+    messages.append({"role": "assistant", "content": second + "\nObservation: {...}"})
+    assert "Final Answer:" in script.reply(messages)["content"]
+    assert "Final Answer:" in script.reply("unrelated question")["content"]
+
+
+def test_script_uses_tool_calls_when_offered_functions():
+    script = ChatScript(PLANS)
+    tools = [{"type": "function", "function": {"name": "LIST_CLUSTERS", "parameters": {}}}]
+    messages = [{"role": "user", "content": "show me all k8s clusters"}]
+    reply = script.reply(messages, tools)
+    assert reply["content"] is None and reply["tool_calls"][0]["function"]["name"] == "LIST_CLUSTERS"
+
+    messages += [{"role": "assistant", "tool_calls": reply["tool_calls"]},
+                 {"role": "tool", "tool_call_id": "call_0", "content": "[]"}]
+    # GET_CLUSTER_INFO is not offered as a function, so it falls back to ReAct text
+    assert "Action: GET_CLUSTER_INFO" in script.reply(messages, tools)["content"]
+
+
+def test_task_evaluation_prompt_gets_valid_json():
+    reply = ChatScript(PLANS).reply("Assess the quality of the task completed based on the description")
+    assert json.loads(reply["content"])["quality"] == 8
+
+    prompt = "Assess the quality of the task completed based on the description: show me all k8s clusters"
+    entities = json.loads(ChatScript(PLANS).reply(prompt)["content"])["entities"]
+    assert [(entity["name"], entity["type"]) for entity in entities] == [("prod-east", "cluster")]
+
+
+def test_script_from_file(tmp_path):
+    path = tmp_path / "plans.json"
+    path.write_text(json.dumps({"plans": {"list nodes": [["LIST_NODES", {"cluster": "dev"}]]},
+                                "answer": "Final Answer: ok ({steps})"}))
+    script = ChatScript.from_file(str(path))
+    assert script.plan_for("please list nodes") == [("LIST_NODES", {"cluster": "dev"})]
+    assert script.reply("hi")["content"].endswith("Final Answer: ok (0)")
+
+
+def test_hash_embedding_is_normalized_and_deterministic():
+    vector = hash_embedding("pod api-1 is crash looping", 64)
+    assert len(vector) == 64 and math.isclose(sum(value * value for value in vector), 1.0)
+    assert vector == hash_embedding("pod api-1 is crash looping", 64)
+    assert hash_embedding("", 8) == [0.0] * 8
+
+
+async def http_post(port, path, payload):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode()
+    writer.write(f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+def dechunk(data):
+    body = b""
+    while True:
+        size_line, _, data = data.partition(b"\r\n")
+        size = int(size_line, 16)
+        if size == 0:
+            return body
+        body, data = body + data[:size], data[size + 2:]
+
+
+def run_with_server(server, scenario):
+    async def main():
+        ready = asyncio.Event()
+        task = asyncio.create_task(server.serve("127.0.0.1", 0, ready))
+        await ready.wait()
+        try:
+            return await scenario(server.port)
+        finally:
+            task.cancel()
+
+    return asyncio.run(main())
+
+
+def test_chat_completion_and_embeddings_endpoints():
+    server = MockLLMServer(ChatScript(PLANS), embedding_dimensions=32)
+
+    async def scenario(port):
+        response = await http_post(port, "/v1/chat/completions", {
+            "model": "mock-llm", "messages": [{"role": "user", "content": "show me all k8s clusters"}]})
+        completion = json.loads(response.partition(b"\r\n\r\n")[2])
+        assert completion["choices"][0]["finish_reason"] == "stop"
+        assert "Action: LIST_CLUSTERS" in completion["choices"][0]["message"]["content"]
+        assert completion["usage"]["completion_tokens"] > 0
+
+        response = await http_post(port, "/v1/embeddings", {"model": "text-embedding-v4", "input": ["a", "b c"]})
+        embeddings = json.loads(response.partition(b"\r\n\r\n")[2])
+        assert [len(item["embedding"]) for item in embeddings["data"]] == [32, 32]
+        assert b"404" in (await http_post(port, "/v1/nope", {})).split(b"\r\n")[0]
+
+    run_with_server(server, scenario)
+    assert server.stats()["chat"] == 1 and server.stats()["embeddings"] == 2
+    assert server.stats()["embedding_requests"] == 1
+
+
+def test_streaming_respects_ttft_and_tokens_per_second():
+    server = MockLLMServer(ChatScript(answer="Final Answer: " + "word " * 20), ttft=0.1, tokens_per_second=200)
+
+    async def scenario(port):
+        started = time.monotonic()
+        response = await http_post(port, "/v1/chat/completions", {
+            "messages": [{"role": "user", "content": "hello"}], "stream": True,
+            "stream_options": {"include_usage": True}})
+        elapsed = time.monotonic() - started
+        head, _, body = response.partition(b"\r\n\r\n")
+        assert b"text/event-stream" in head
+        events = [line[6:] for line in dechunk(body).decode().split("\n\n") if line.startswith("data: ")]
+        assert events[-1] == "[DONE]"
+        chunks = [json.loads(event) for event in events[:-1]]
+        content = "".join(chunk["choices"][0]["delta"].get("content", "") for chunk in chunks if chunk["choices"])
+        assert content.startswith("Thought: I now know the final answer\nFinal Answer: word word")
+        assert chunks[-1]["usage"]["completion_tokens"] > 20
+        # 0.1s to first token, then roughly 30 tokens at 200 tokens/s
+        assert 0.2 <= elapsed < 1.0
+
+    run_with_server(server, scenario)
+    assert server.stats()["streamed"] == 1
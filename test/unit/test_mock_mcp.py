@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Mock MCP 服务器单元测试
+
+验证合成数据的确定性与规模参数、JSON-RPC 方法、延迟与错误注入，
+以及 SSE 传输（endpoint 事件 + POST 消息 + message 事件）的完整往返。
+
+使用方法：
+    uv run pytest test/unit/test_mock_mcp.py
+"""
+
+import asyncio
+import json
+import pathlib
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src"))
+
+from ops_crew.log_digest import LogDigest
+from ops_crew.mock_mcp import MockDataset, MockMCPServer, parse_overrides
+from ops_crew.tool_cache import load_tools_cache
+
+TOOLS = load_tools_cache(str(ROOT / "tools_cache.json"))
+
+
+def test_dataset_is_deterministic_and_scaled():
+    dataset = MockDataset(clusters=7, nodes=12, pods=40, seed=3)
+    assert len(dataset.call("LIST_CLUSTERS", {})) == 7
+    assert dataset.cluster_names[:2] == ["prod-east", "prod-west"] and dataset.cluster_names[-1] == "cluster-6"
+    assert len(dataset.call("LIST_NODES", {"cluster": "staging"})) == 12
+    assert dataset.call("GET_CLUSTER_INFO", {"cluster": "dev"})["pods"] == 40
+    assert dataset.call("GET_POD_METRICS", {"cluster": "dev"}) == \
+        MockDataset(clusters=7, nodes=12, pods=40, seed=3).call("GET_POD_METRICS", {"cluster": "dev"})
+
+
+def test_tool_filters_and_errors():
+    dataset = MockDataset(pods=30)
+    metrics = dataset.call("GET_POD_METRICS", {"cluster": "prod-east", "sortBy": "cpu", "limit": 5})
+    cpu = [int(row["cpuUsage"].rstrip("m")) for row in metrics]
+    assert len(metrics) == 5 and cpu == sorted(cpu, reverse=True)
+    assert all(row["namespace"] == "payments"
+               for row in dataset.call("GET_POD_METRICS", {"cluster": "prod-east", "namespace": "payments"}))
+    node = dataset.call("LIST_NODES", {"cluster": "prod-east"})[1]["name"]
+    assert [row["name"] for row in dataset.call("GET_NODE_METRICS", {"cluster": "prod-east", "nodeName": node})] == [node]
+
+    try:
+        dataset.call("LIST_NODES", {"cluster": "nope"})
+        assert False, "unknown cluster should fail"
+    except Exception as e:
+        assert "not found" in str(e)
+
+
+def test_pod_logs_feed_the_log_digest():
+    dataset = MockDataset(pods=40)
+    crashing = next(pod for pod in dataset.cluster("prod-east")["pods"] if pod["status"] == "CrashLoopBackOff")
+    logs = dataset.call("GET_POD_LOGS", {"cluster": "prod-east", "name": crashing["name"], "tailLines": 500})
+    assert len(logs.splitlines()) == 500
+    summary = LogDigest().feed_all(logs.splitlines()).summary()
+    assert summary["levels"].get("ERROR") and summary["stack_traces"]
+
+
+def test_rpc_methods():
+    server = MockMCPServer(MockDataset(), TOOLS)
+
+    async def scenario():
+        init = await server.handle_rpc({"jsonrpc": "2.0", "id": 1, "method": "initialize",
+                                        "params": {"protocolVersion": "2025-03-26"}})
+        assert init["result"]["protocolVersion"] == "2025-03-26"
+        assert await server.handle_rpc({"jsonrpc": "2.0", "method": "notifications/initialized"}) is None
+        listed = await server.handle_rpc({"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        schemas = {tool["name"]: tool for tool in listed["result"]["tools"]}
+        assert set(schemas) == {entry["name"] for entry in TOOLS}
+        assert schemas["LIST_NODES"]["inputSchema"]["type"] == "object"
+        called = await server.handle_rpc({"jsonrpc": "2.0", "id": 3, "method": "tools/call",
+                                          "params": {"name": "LIST_CLUSTERS", "arguments": {}}})
+        assert not called["result"]["isError"]
+        assert json.loads(called["result"]["content"][0]["text"])[0]["name"] == "prod-east"
+        failed = await server.handle_rpc({"jsonrpc": "2.0", "id": 4, "method": "tools/call",
+                                          "params": {"name": "LIST_NODES", "arguments": {"cluster": "nope"}}})
+        assert failed["result"]["isError"]
+        unknown = await server.handle_rpc({"jsonrpc": "2.0", "id": 5, "method": "tools/call",
+                                           "params": {"name": "NOPE"}})
+        assert unknown["error"]["code"] == -32602
+        assert (await server.handle_rpc({"jsonrpc": "2.0", "id": 6, "method": "nope"}))["error"]["code"] == -32601
+
+    asyncio.run(scenario())
+    assert server.stats()["calls"] == 2 and server.stats()["errors"] == 1
+
+
+def test_unexpected_failures_still_get_a_response(monkeypatch):
+    server = MockMCPServer(MockDataset(), TOOLS)
+
+    def crash(*args):
+        raise KeyError("boom")
+
+    async def scenario():
+        monkeypatch.setattr(server.dataset, "call", crash)
+        called = await server.handle_rpc({"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                                          "params": {"name": "LIST_CLUSTERS", "arguments": {}}})
+        assert called["result"]["isError"]
+        assert "internal error in LIST_CLUSTERS" in called["result"]["content"][0]["text"]
+        monkeypatch.setattr(server, "_tool_schemas", crash)
+        listed = await server.handle_rpc({"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        assert listed["id"] == 2 and listed["error"]["code"] == -32603
+        assert await server.handle_rpc(["not", "a", "message"]) is None
+
+    asyncio.run(scenario())
+    assert server.stats()["errors"] == 1
+
+
+def test_parse_overrides():
+    assert parse_overrides("LIST_NODES=0.5, GET_NODE_METRICS=1,") == {"LIST_NODES": 0.5, "GET_NODE_METRICS": 1.0}
+
+
+def test_latency_and_error_injection():
+    server = MockMCPServer(MockDataset(), TOOLS, latency=0.0, latencies={"LIST_NODES": 0.05},
+                           error_rates={"GET_NODE_METRICS": 1.0})
+
+    async def scenario():
+        started = time.monotonic()
+        # Latency is awaited, so concurrent calls overlap like a real upstream
+        await asyncio.gather(*(server.call_tool("LIST_NODES", {"cluster": "prod-east"}) for _ in range(5)))
+        assert 0.05 <= time.monotonic() - started < 0.2
+        result = await server.call_tool("GET_NODE_METRICS", {"cluster": "prod-east"})
+        assert result["isError"] and "injected" in result["content"][0]["text"]
+        assert not (await server.call_tool("LIST_CLUSTERS", {}))["isError"]
+
+    asyncio.run(scenario())
+
+
+def test_sse_round_trip():
+    server = MockMCPServer(MockDataset(), TOOLS)
+
+    async def read_event(reader):
+        fields = {}
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            chunk = (await reader.readexactly(size + 2))[:-2].decode()
+            for line in chunk.split("\r\n"):
+                name, _, value = line.partition(": ")
+                if name in ("event", "data"):
+                    fields[name] = value
+            if "event" in fields:
+                return fields
+
+    async def post(port, path, message):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        body = json.dumps(message).encode()
+        writer.write(f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+        await writer.drain()
+        status = int((await reader.read()).split()[1])
+        writer.close()
+        return status
+
+    async def main():
+        ready = asyncio.Event()
+        task = asyncio.create_task(server.serve("127.0.0.1", 0, ready))
+        await ready.wait()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(b"GET /sse HTTP/1.1\r\nAccept: text/event-stream\r\n\r\n")
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            assert b"200 OK" in head and b"text/event-stream" in head
+            endpoint = await read_event(reader)
+            assert endpoint["event"] == "endpoint" and endpoint["data"].startswith("/messages/?session_id=")
+
+            assert await post(server.port, endpoint["data"], {"jsonrpc": "2.0", "id": 7, "method": "tools/call",
+                                                              "params": {"name": "LIST_CLUSTERS"}}) == 202
+            message = await read_event(reader)
+            assert message["event"] == "message" and json.loads(message["data"])["id"] == 7
+            assert await post(server.port, "/messages/?session_id=unknown", {"jsonrpc": "2.0", "id": 8}) == 404
+            writer.close()
+        finally:
+            task.cancel()
+
+    asyncio.run(main())
+
+
+def test_deliveries_are_tracked_reported_and_cancelled(capsys):
+    server = MockMCPServer(MockDataset(), TOOLS, latencies={"LIST_NODES": 5})
+
+    async def post(message):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        body = json.dumps(message).encode()
+        writer.write(f"POST /messages/?session_id=s1 HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+                     + body)
+        await writer.drain()
+        await reader.read()
+        writer.close()
+
+    async def failing_rpc(message):
+        raise RuntimeError("broken handler")
+
+    async def main():
+        ready = asyncio.Event()
+        task = asyncio.create_task(server.serve("127.0.0.1", 0, ready))
+        await ready.wait()
+        server._sessions["s1"] = asyncio.Queue()
+        await post({"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                    "params": {"name": "LIST_NODES", "arguments": {"cluster": "prod-east"}}})
+        assert len(server._deliveries) == 1
+        slow = next(iter(server._deliveries))
+
+        server.handle_rpc = failing_rpc
+        await post({"jsonrpc": "2.0", "id": 2, "method": "ping"})
+        await asyncio.sleep(0.05)
+        assert server._deliveries == {slow}
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert slow.cancelled() and not server._deliveries
+
+    asyncio.run(main())
+    assert "broken handler" in capsys.readouterr().out
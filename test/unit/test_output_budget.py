@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+工具输出 token 预算与分页单元测试
+
+使用方法：
+    uv run pytest test/unit/test_output_budget.py
+"""
+
+import json
+import pathlib
+import sys
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew.output_budget import (
+    OutputBudget,
+    estimate_tokens,
+    parse_budgets,
+    summarize_rows,
+    track_savings,
+)
+
+
+def node_list(count=300):
+    return {
+        "cluster": "prod",
+        "nodes": [
+            {"name": f"node-{i:03d}", "status": "Ready" if i % 10 else "NotReady", "cpu": i % 8 + 1}
+            for i in range(count)
+        ],
+    }
+
+
+def test_estimate_tokens_and_budget_parsing():
+    assert estimate_tokens("abcdefgh") == 2
+    assert estimate_tokens("节点") == 2
+    assert parse_budgets("LIST_NODES=4000, SEARCH_RESOURCES=0") == {"LIST_NODES": 4000, "SEARCH_RESOURCES": 0}
+
+
+def test_summarize_rows_aggregates_numbers_and_categories():
+    columns, aggregates = summarize_rows(node_list(20)["nodes"])
+
+    assert columns == ["name", "status", "cpu"]
+    assert aggregates["status"] == {"Ready": 18, "NotReady": 2}
+    assert aggregates["cpu"] == {"min": 1, "max": 8, "sum": 82}
+    assert "name" not in aggregates
+
+
+def test_small_results_pass_through_unchanged():
+    budget = OutputBudget(budgets={}, default_budget=1000)
+    result = json.dumps(node_list(3))
+
+    assert budget.shape("LIST_NODES", result) is result
+    assert budget.stats() == {"outputs_shaped": 0, "tokens_saved": 0}
+
+
+def test_large_results_are_shaped_and_paged():
+    budget = OutputBudget(budgets={"LIST_NODES": 500}, default_budget=4000)
+    result = json.dumps(node_list())
+
+    with track_savings() as savings:
+        shaped = json.loads(budget.shape("LIST_NODES", result))
+
+    assert shaped["cluster"] == "prod"
+    assert shaped["truncated"] is True
+    assert shaped["total_rows"] == 300
+    assert shaped["aggregates"]["status"] == {"Ready": 270, "NotReady": 30}
+    shown = len(shaped["nodes"])
+    assert 0 < shown < 300
+    assert estimate_tokens(json.dumps(shaped)) <= 500 + 60
+    assert savings.tokens_saved > 0 and savings.outputs_shaped == 1
+    assert budget.stats()["tokens_saved"] == savings.tokens_saved
+
+    page = shaped["next_page"]
+    seen = [node["name"] for node in shaped["nodes"]]
+    while page is not None:
+        next_page = json.loads(budget.page(page["handle"], page["offset"]))
+        seen += [node["name"] for node in next_page["nodes"]]
+        page = next_page["next_page"]
+    assert seen == [node["name"] for node in node_list()["nodes"]]
+
+
+def test_plain_text_keeps_leading_lines():
+    budget = OutputBudget(budgets={}, default_budget=100)
+    text = "\n".join(f"line {i} " + "x" * 40 for i in range(100))
+
+    shaped = budget.shape("DESCRIBE", text)
+
+    assert shaped.startswith("line 0 ")
+    assert "call GET_MORE_RESULTS with handle=describe-1" in shaped
+    assert budget.page("describe-1", 99).startswith("line 99 ")
+    assert budget.page("missing-1", 0).startswith("Unknown or expired page handle")
+
+
+def test_pager_hint_is_dropped_from_the_task_prompt():
+    yaml = pytest.importorskip("yaml")
+    crew_module = pytest.importorskip("ops_crew.crew", exc_type=ImportError)
+    tasks = pathlib.Path(crew_module.__file__).parent / "config" / "tasks.yaml"
+    description = yaml.safe_load(tasks.read_text())["k8s_analysis_task"]["description"]
+    assert "GET_MORE_RESULTS" in description
+    trimmed = crew_module.without_pager_hint(description)
+    assert "GET_MORE_RESULTS" not in trimmed and "truncated" not in trimmed
+    assert "CLUSTER_FAN_OUT" in trimmed and "{user_input}" in trimmed
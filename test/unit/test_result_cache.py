@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+MCP 工具结果 TTL 缓存单元测试
+
+使用方法：
+    uv run pytest test/unit/test_result_cache.py
+"""
+
+import pathlib
+import sys
+import threading
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew.result_cache import ToolResultCache, cache_key, parse_ttls
+from ops_crew.tool_results import is_error_result
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingCall:
+    def __init__(self, value="result"):
+        self.value = value
+        self.count = 0
+
+    def __call__(self):
+        self.count += 1
+        return f"{self.value}-{self.count}"
+
+
+def test_cache_key_is_canonical():
+    assert cache_key("LIST_NODES", {"b": 1, "a": 2, "c": None}) == cache_key("LIST_NODES", {"a": 2, "b": 1})
+
+
+def test_parse_ttls():
+    assert parse_ttls("LIST_CLUSTERS=600, GET_POD_METRICS=5,") == {"LIST_CLUSTERS": 600.0, "GET_POD_METRICS": 5.0}
+
+
+def test_fresh_hits_and_uncached_tools():
+    cache = ToolResultCache(ttls={"LIST_CLUSTERS": 10}, clock=FakeClock())
+    call = CountingCall()
+
+    assert cache.get_or_call("LIST_CLUSTERS", {}, call) == "result-1"
+    assert cache.get_or_call("LIST_CLUSTERS", {}, call) == "result-1"
+    cache.get_or_call("GET_POD_LOGS", {"name": "p"}, call)
+    cache.get_or_call("GET_POD_LOGS", {"name": "p"}, call)
+
+    assert call.count == 3
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_stale_entry_is_served_while_refreshing():
+    clock = FakeClock()
+    cache = ToolResultCache(ttls={"LIST_NODES": 10}, max_stale=30, clock=clock)
+    refreshed = threading.Event()
+    calls = []
+
+    def call():
+        calls.append(clock.now)
+        if len(calls) > 1:
+            refreshed.set()
+        return f"nodes@{clock.now:g}"
+
+    cache.get_or_call("LIST_NODES", {"cluster": "a"}, call)
+    clock.now = 15
+    assert cache.get_or_call("LIST_NODES", {"cluster": "a"}, call) == "nodes@0"
+    assert refreshed.wait(2)
+    # Give the refresh thread a moment to store its result
+    for _ in range(100):
+        if cache.get_or_call("LIST_NODES", {"cluster": "a"}, call) == "nodes@15":
+            break
+        time.sleep(0.01)
+    assert cache.get_or_call("LIST_NODES", {"cluster": "a"}, call) == "nodes@15"
+    assert cache.stats()["stale_hits"] >= 1
+
+
+def test_expired_beyond_stale_window_is_a_miss():
+    clock = FakeClock()
+    cache = ToolResultCache(ttls={"LIST_NODES": 10}, max_stale=5, clock=clock)
+    call = CountingCall()
+
+    cache.get_or_call("LIST_NODES", {}, call)
+    clock.now = 100
+
+    assert cache.get_or_call("LIST_NODES", {}, call) == "result-2"
+
+
+def test_lru_eviction():
+    cache = ToolResultCache(ttls={"GET_CLUSTER_INFO": 60}, max_entries=2, clock=FakeClock())
+    call = CountingCall()
+
+    for cluster in ("a", "b"):
+        cache.get_or_call("GET_CLUSTER_INFO", {"cluster": cluster}, call)
+    cache.get_or_call("GET_CLUSTER_INFO", {"cluster": "a"}, call)
+    cache.get_or_call("GET_CLUSTER_INFO", {"cluster": "c"}, call)
+
+    assert cache.stats()["evictions"] == 1
+    cache.get_or_call("GET_CLUSTER_INFO", {"cluster": "a"}, call)
+    assert call.count == 3
+
+
+def test_errors_are_not_cached():
+    cache = ToolResultCache(ttls={"LIST_CLUSTERS": 10}, clock=FakeClock())
+
+    def failing():
+        raise RuntimeError("boom")
+
+    for _ in range(2):
+        try:
+            cache.get_or_call("LIST_CLUSTERS", {}, failing)
+        except RuntimeError:
+            pass
+
+    assert cache.stats()["entries"] == 0
+
+
+
+def test_returned_errors_are_not_cached_or_stored_by_refreshes():
+    clock = FakeClock()
+    cache = ToolResultCache(ttls={"GET_CLUSTER_INFO": 10}, max_stale=60, clock=clock)
+    for error in ("Error: cluster 'nope' not found", '{"isError": true, "content": []}', {"error": "timeout"}):
+        assert cache.get_or_call("GET_CLUSTER_INFO", {"cluster": "nope"}, lambda: error) == error
+    assert cache.stats()["entries"] == 0
+
+    cache.get_or_call("GET_CLUSTER_INFO", {"cluster": "a"}, lambda: '{"name": "a"}')
+    clock.now = 15
+    refreshed = threading.Event()
+
+    def failing_refresh():
+        refreshed.set()
+        return "Error executing tool GET_CLUSTER_INFO: upstream unavailable"
+
+    assert cache.get_or_call("GET_CLUSTER_INFO", {"cluster": "a"}, failing_refresh) == '{"name": "a"}'
+    assert refreshed.wait(1)
+    time.sleep(0.05)
+    assert cache.get_or_call("GET_CLUSTER_INFO", {"cluster": "a"}, failing_refresh) == '{"name": "a"}'
+
+
+def test_log_lines_are_not_mistaken_for_errors():
+    assert not is_error_result("ERROR [main] Unhandled exception while processing order 1234")
+    assert not is_error_result('{"name": "a", "error": null}')
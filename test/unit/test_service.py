@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+HTTP 服务模式单元测试
+
+使用假的处理函数验证并发上限、队列背压（429）和请求超时（504）。
+
+使用方法：
+    uv run pytest test/unit/test_service.py
+"""
+
+import asyncio
+import json
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew.service import AgentService
+
+
+async def http_request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, data = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(data) if b"application/json" in head else data.decode()
+
+
+def run_with_service(service, scenario):
+    async def main():
+        ready = asyncio.Event()
+        server = asyncio.create_task(service.serve("127.0.0.1", 0, ready))
+        await ready.wait()
+        try:
+            return await scenario(service.port)
+        finally:
+            server.cancel()
+
+    return asyncio.run(main())
+
+
+def test_query_and_health():
+    async def handler(user_input):
+        return f"echo: {user_input}"
+
+    async def scenario(port):
+        status, payload = await http_request(port, "POST", "/v1/query", {"input": "list clusters"})
+        assert (status, payload["result"]) == (200, "echo: list clusters")
+        for invalid in ({"input": ""}, {"input": "   "}, {"input": ["list clusters"]}, {"input": 42}, {},
+                        {"input": "list clusters", "timeout": [1]}, {"input": "list clusters", "timeout": {}},
+                        {"input": "list clusters", "timeout": "10"}, {"input": "list clusters", "timeout": 0},
+                        {"input": "list clusters", "timeout": -5}, {"input": "list clusters", "timeout": True}):
+            status, payload = await http_request(port, "POST", "/v1/query", invalid)
+            assert status == 400 and "error" in payload
+        assert (await http_request(port, "GET", "/v1/query"))[0] == 405
+        assert (await http_request(port, "GET", "/nope"))[0] == 404
+        status, payload = await http_request(port, "POST", "/v1/query", {"input": "list nodes", "timeout": None})
+        assert (status, payload["result"]) == (200, "echo: list nodes")
+        status, health = await http_request(port, "GET", "/healthz")
+        assert (status, health["completed"]) == (200, 2)
+        status, metrics_text = await http_request(port, "GET", "/metrics")
+        assert status == 200 and "# TYPE ops_crew_phase_seconds histogram" in metrics_text
+
+    run_with_service(AgentService(handler), scenario)
+
+
+def test_concurrency_limit_and_backpressure():
+    state = {"running": 0, "peak": 0}
+
+    async def scenario(port):
+        gate = asyncio.Event()
+
+        async def handler(user_input):
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+            await gate.wait()
+            state["running"] -= 1
+            return user_input
+
+        service.handler = handler
+        requests = [
+            asyncio.create_task(http_request(port, "POST", "/v1/query", {"input": f"q{i}"}))
+            for i in range(3)
+        ]
+        for _ in range(100):
+            if service.stats()["queued"] == 1:
+                break
+            await asyncio.sleep(0.01)
+        status, _ = await http_request(port, "POST", "/v1/query", {"input": "overflow"})
+        gate.set()
+        results = await asyncio.gather(*requests)
+        return status, [result[0] for result in results]
+
+    service = AgentService(None, max_concurrency=2, max_queue=1)
+    rejected_status, statuses = run_with_service(service, scenario)
+
+    assert rejected_status == 429
+    assert statuses == [200, 200, 200]
+    assert state["peak"] == 2
+
+
+def test_request_timeout():
+    async def handler(user_input):
+        await asyncio.sleep(5)
+
+    async def scenario(port):
+        return await http_request(port, "POST", "/v1/query", {"input": "slow", "timeout": 0.1})
+
+    status, payload = run_with_service(AgentService(handler, request_timeout=1), scenario)
+    assert status == 504
+    assert "timed out" in payload["error"]
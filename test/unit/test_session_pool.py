@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+会话池单元测试
+
+使用假的会话验证会话复用与出错会话的丢弃、请求在等待会话或执行中被取消（如服务
+超时）后会话仍归还到池中，以及中途放弃的流式请求会丢弃其会话。
+
+使用方法：
+    uv run pytest test/unit/test_session_pool.py
+"""
+
+import asyncio
+import pathlib
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+crew_module = pytest.importorskip("ops_crew.crew", exc_type=ImportError)
+
+
+class FakeSession:
+    build_seconds = 0.0
+    run_seconds = 0.0
+
+    def __init__(self):
+        time.sleep(self.build_seconds)
+
+    async def run_async(self, user_input):
+        await asyncio.sleep(self.run_seconds)
+        if user_input == "fail":
+            raise RuntimeError("kickoff failed")
+        return (self, user_input)
+
+    def run_stream(self, user_input):
+        yield "tool_started"
+        yield "final"
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(crew_module, "CrewSession", FakeSession)
+    monkeypatch.setattr(FakeSession, "build_seconds", 0.0)
+    monkeypatch.setattr(FakeSession, "run_seconds", 0.0)
+    return crew_module.CrewSessionPool(size=1)
+
+
+def test_sessions_are_reused_and_failed_ones_discarded(pool):
+    async def scenario():
+        first, _ = await pool.run_async("list clusters")
+        second, _ = await pool.run_async("list nodes")
+        assert first is second
+        with pytest.raises(RuntimeError):
+            await pool.run_async("fail")
+        third, _ = await pool.run_async("list pods")
+        assert third is not first
+        assert (pool._created, pool._idle.qsize()) == (1, 1)
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_during_checkout_returns_the_session(pool):
+    FakeSession.build_seconds = 0.2
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(pool.run_async("list clusters"), 0.05)
+        session, user_input = await asyncio.wait_for(pool.run_async("list nodes"), 2)
+        assert user_input == "list nodes"
+        assert (pool._created, pool._idle.qsize()) == (1, 1)
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_during_run_returns_the_session_once_finished(pool):
+    FakeSession.run_seconds = 0.2
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(pool.run_async("list clusters"), 0.05)
+        assert pool._idle.qsize() == 0
+        _, user_input = await asyncio.wait_for(pool.run_async("list nodes"), 2)
+        assert user_input == "list nodes"
+        assert (pool._created, pool._idle.qsize()) == (1, 1)
+
+    asyncio.run(scenario())
+
+
+def test_abandoned_stream_discards_its_session(pool):
+    assert list(pool.stream("list clusters")) == ["tool_started", "final"]
+    assert (pool._created, pool._idle.qsize()) == (1, 1)
+
+    events = pool.stream("list nodes")
+    next(events)
+    events.close()
+    assert (pool._created, pool._idle.qsize()) == (0, 0)
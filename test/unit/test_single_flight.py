@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+相同并发调用合并（single-flight）单元测试
+
+使用方法：
+    uv run pytest test/unit/test_single_flight.py
+"""
+
+import pathlib
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew.single_flight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_upstream_request():
+    flight = SingleFlight()
+    release = threading.Event()
+    upstream_calls = []
+
+    def upstream():
+        upstream_calls.append(1)
+        release.wait(2)
+        return {"cluster": "prod"}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(flight.do, ("GET_CLUSTER_INFO", "prod"), upstream) for _ in range(8)]
+        # Wait until every caller has joined the in-flight request
+        for _ in range(200):
+            if flight.stats()["coalesced"] == 7:
+                break
+            threading.Event().wait(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(upstream_calls) == 1
+    assert all(result == {"cluster": "prod"} for result in results)
+    assert flight.stats() == {"in_flight": 0, "executed": 1, "coalesced": 7}
+
+
+def test_different_keys_are_not_coalesced():
+    flight = SingleFlight()
+
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.stats()["executed"] == 2
+
+
+def test_errors_propagate_to_every_waiter():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def failing():
+        release.wait(2)
+        raise RuntimeError("mcp down")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(flight.do, "k", failing) for _ in range(3)]
+        for _ in range(200):
+            if flight.stats()["coalesced"] == 2:
+                break
+            threading.Event().wait(0.01)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError, match="mcp down"):
+                future.result()
+
+    # A later call starts a fresh request
+    assert flight.do("k", lambda: "ok") == "ok"
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+流式输出最终答案提取单元测试
+
+另验证消费者提前停止（如 Ctrl-C）时不必等待整个 crew 执行结束。
+
+使用方法：
+    uv run pytest test/unit/test_streaming.py
+"""
+
+import pathlib
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew import streaming
+from ops_crew.streaming import FinalAnswerFilter, stream_kickoff
+
+
+def feed_all(answer_filter, chunks):
+    return "".join(answer_filter.feed(chunk) for chunk in chunks)
+
+
+def test_only_text_after_marker_is_emitted():
+    answer_filter = FinalAnswerFilter()
+    chunks = ["Thought: I now know", " the final answer\nFinal ", "Answer:", " | name |", " status |\n", "| a | Ready |"]
+
+    assert feed_all(answer_filter, chunks) == "| name | status |\n| a | Ready |"
+
+
+def test_tool_calls_emit_nothing_and_reset_between_llm_calls():
+    answer_filter = FinalAnswerFilter()
+
+    assert feed_all(answer_filter, ["Thought: check\nAction: LIST_CLUSTERS\n", "Action Input: {}"]) == ""
+    answer_filter.reset()
+    assert feed_all(answer_filter, ["Final Answer:\n\n", "Done."]) == "Done."
+
+
+def test_abandoned_stream_does_not_wait_for_the_kickoff():
+    pytest.importorskip("crewai")
+    llm, agent = object(), object()
+    release = threading.Event()
+
+    def kickoff():
+        streaming._listener_for(llm).put("tool_started", tool="LIST_NODES", arguments={})
+        release.wait(10)
+        return "done"
+
+    events = stream_kickoff(llm, agent, kickoff)
+    assert next(events).type == "tool_started"
+
+    started = time.monotonic()
+    events.close()
+    assert time.monotonic() - started < 1
+    assert streaming._listener_for(llm) is None
+    release.set()
+
+
+def test_finished_stream_yields_the_final_answer():
+    pytest.importorskip("crewai")
+    events = list(stream_kickoff(object(), object(), lambda: "all clusters healthy"))
+
+    assert events == [streaming.StreamEvent("final", {"text": "all clusters healthy"})]
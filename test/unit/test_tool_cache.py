@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+tools_cache.json 序列化单元测试
+
+验证直接从工具对象生成的缓存内容稳定、可复现。
+
+使用方法：
+    uv run pytest test/unit/test_tool_cache.py
+"""
+
+import json
+import pathlib
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew.tool_cache import (
+    build_tools_cache,
+    dump_tools_cache,
+    load_tools_cache,
+    refresh_tools_cache,
+    same_tools,
+    write_tools_cache,
+)
+
+
+class FakeSchema:
+    def __init__(self, schema):
+        self._schema = schema
+
+    def model_json_schema(self):
+        return self._schema
+
+
+def fake_tool(name, description, schema=None):
+    return SimpleNamespace(
+        name=name,
+        description=f"Tool Name: {name}\nTool Arguments: {{}}\nTool Description: {description}",
+        args_schema=FakeSchema(schema) if schema is not None else None,
+    )
+
+
+CLUSTER_SCHEMA = {
+    "title": "GET_CLUSTER_INFOSchema",
+    "type": "object",
+    "properties": {"cluster": {"title": "Cluster", "type": "string", "description": "Cluster name"}},
+    "required": ["cluster"],
+}
+
+
+def test_entries_are_sorted_and_cleaned():
+    tools = [
+        fake_tool("LIST_NODES", "List all nodes", CLUSTER_SCHEMA),
+        fake_tool("GET_CLUSTER_INFO", "Get cluster information", CLUSTER_SCHEMA),
+        fake_tool("LIST_CLUSTERS", "List all clusters"),
+    ]
+
+    cache = build_tools_cache(tools, fetched_at=datetime(2025, 1, 1))
+
+    assert [tool["name"] for tool in cache["tools"]] == ["GET_CLUSTER_INFO", "LIST_CLUSTERS", "LIST_NODES"]
+    assert cache["tools"][0] == {
+        "name": "GET_CLUSTER_INFO",
+        "description": "Get cluster information",
+        "parameters": {
+            "properties": {"cluster": {"type": "string", "description": "Cluster name"}},
+            "required": ["cluster"],
+        },
+    }
+    assert cache["tools"][1]["parameters"] == {"properties": {}}
+
+
+def test_output_is_byte_stable_regardless_of_server_order():
+    tools = [fake_tool("B", "b", CLUSTER_SCHEMA), fake_tool("A", "a")]
+    fetched_at = datetime(2025, 1, 1)
+
+    first = dump_tools_cache(build_tools_cache(tools, fetched_at))
+    second = dump_tools_cache(build_tools_cache(list(reversed(tools)), fetched_at))
+
+    assert first == second
+
+
+def test_write_and_load_round_trip(tmp_path):
+    cache_path = tmp_path / "tools_cache.json"
+    cache = build_tools_cache([fake_tool("LIST_CLUSTERS", "List all clusters")])
+
+    write_tools_cache(cache, str(cache_path))
+
+    assert load_tools_cache(str(cache_path)) == cache["tools"]
+    assert load_tools_cache(str(tmp_path / "missing.json")) == []
+
+
+def test_refresh_keeps_the_file_when_tools_are_unchanged(tmp_path):
+    cache_path = tmp_path / "tools_cache.json"
+    tools = [fake_tool("LIST_NODES", "List all nodes", CLUSTER_SCHEMA), fake_tool("LIST_CLUSTERS", "List all clusters")]
+    write_tools_cache(build_tools_cache(tools, fetched_at=datetime(2025, 1, 1)), str(cache_path))
+    written = cache_path.read_text(encoding="utf-8")
+
+    cache, changed = refresh_tools_cache(list(reversed(tools)), str(cache_path))
+    assert not changed and cache["fetched_at"] == "2025-01-01T00:00:00"
+    assert cache_path.read_text(encoding="utf-8") == written
+
+    cache, changed = refresh_tools_cache(tools[:1], str(cache_path))
+    assert changed and cache["fetched_at"] != "2025-01-01T00:00:00"
+    assert [tool["name"] for tool in load_tools_cache(str(cache_path))] == ["LIST_NODES"]
+
+
+def test_same_tools_ignores_order():
+    tools = build_tools_cache([fake_tool("B", "b", CLUSTER_SCHEMA), fake_tool("A", "a")])["tools"]
+
+    assert same_tools(tools, list(reversed(tools)))
+    assert not same_tools(tools, tools[:1])
+    assert not same_tools(tools, [tools[0], dict(tools[1], description="changed")])
+
+
+def test_checked_in_cache_is_canonical():
+    repo_cache = pathlib.Path(__file__).resolve().parents[2] / "tools_cache.json"
+    cache = json.loads(repo_cache.read_text(encoding="utf-8"))
+
+    assert [tool["name"] for tool in cache["tools"]] == sorted(tool["name"] for tool in cache["tools"])
+    assert repo_cache.read_text(encoding="utf-8") == dump_tools_cache(cache)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+基于 tools_cache.json 的惰性 MCP 工具代理单元测试
+
+验证代理在构建时不连接 MCP 服务器，仅在首次调用时解析真实工具；大结果经输出
+预算裁剪后交给 agent，而快速路径和多集群扇出分别得到完整结果和受预算约束的报告。
+
+使用方法：
+    uv run pytest test/unit/test_tool_proxy.py
+"""
+
+import json
+import pathlib
+import sys
+
+import pytest
+
+pytest.importorskip("crewai")
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew import tool_proxy
+from ops_crew.fast_path import FastPathRouter
+from ops_crew.mock_mcp import MockDataset
+from ops_crew.output_budget import OutputBudget, estimate_tokens
+from ops_crew.tool_cache import build_tools_cache, write_tools_cache
+from ops_crew.tool_proxy import build_fan_out_tool, build_proxy_tools, schema_to_model, validate_tools_cache
+
+REPO_CACHE = pathlib.Path(__file__).resolve().parents[2] / "tools_cache.json"
+
+
+class FakeLiveTool:
+    name = "GET_CLUSTER_INFO"
+
+    def __init__(self):
+        self.calls = []
+
+    def run(self, **kwargs):
+        self.calls.append(kwargs)
+        return {"cluster": kwargs["cluster"], "status": "Ready"}
+
+
+class MockClusterTool:
+    """Live tool answering from a synthetic `MockDataset`."""
+
+    def __init__(self, dataset, name):
+        self.dataset = dataset
+        self.name = name
+
+    def run(self, **kwargs):
+        return json.dumps(self.dataset.call(self.name, kwargs))
+
+
+class FakeManager:
+    def __init__(self, tools):
+        self.tools = tools
+        self.get_tools_calls = 0
+
+    def get_tools(self, server_params):
+        self.get_tools_calls += 1
+        return self.tools
+
+
+def test_schema_to_model_respects_required_and_defaults():
+    model = schema_to_model("GET_POD_LOGS", {
+        "properties": {
+            "cluster": {"type": "string", "description": "Cluster name"},
+            "tailLines": {"type": "integer", "default": 1000},
+        },
+        "required": ["cluster"],
+    })
+
+    instance = model(cluster="prod")
+
+    assert instance.tailLines == 1000
+    with pytest.raises(Exception):
+        model()
+
+
+def test_proxies_connect_only_on_first_call(monkeypatch):
+    live_tool = FakeLiveTool()
+    manager = FakeManager([live_tool])
+    monkeypatch.setattr(tool_proxy, "get_mcp_manager", lambda: manager)
+
+    proxies = {tool.name: tool for tool in build_proxy_tools([{"url": "http://mcp"}], str(REPO_CACHE))}
+    assert manager.get_tools_calls == 0
+
+    proxy = proxies["GET_CLUSTER_INFO"]
+    assert proxy.run(cluster="prod") == {"cluster": "prod", "status": "Ready"}
+    proxy.run(cluster="dev")
+
+    assert manager.get_tools_calls == 1
+    assert live_tool.calls == [{"cluster": "prod"}, {"cluster": "dev"}]
+
+
+def test_validation_ignores_tool_order_and_never_rewrites_the_cache(tmp_path, monkeypatch):
+    live_tools = build_proxy_tools([{"url": "http://mcp"}], str(REPO_CACHE))
+    cache_path = tmp_path / "tools_cache.json"
+    cached = build_tools_cache(live_tools)
+    cached["tools"].reverse()
+    write_tools_cache(cached, str(cache_path))
+    written = cache_path.read_text(encoding="utf-8")
+    monkeypatch.setattr(tool_proxy, "get_mcp_manager", lambda: FakeManager(live_tools))
+
+    assert validate_tools_cache([{"url": "http://mcp"}], str(cache_path)) is True
+    assert cache_path.read_text(encoding="utf-8") == written
+
+    monkeypatch.setattr(tool_proxy, "get_mcp_manager", lambda: FakeManager(live_tools[1:]))
+    assert validate_tools_cache([{"url": "http://mcp"}], str(cache_path)) is False
+    assert cache_path.read_text(encoding="utf-8") == written
+
+
+@pytest.fixture
+def large_cluster_proxies(monkeypatch):
+    dataset = MockDataset(clusters=3, nodes=60)
+    live_tools = [MockClusterTool(dataset, name)
+                  for name in ("LIST_CLUSTERS", "GET_CLUSTER_INFO", "LIST_NODES", "GET_NODE_METRICS")]
+    monkeypatch.setattr(tool_proxy, "get_mcp_manager", lambda: FakeManager(live_tools))
+    monkeypatch.setattr(tool_proxy, "get_output_budget", lambda: OutputBudget())
+    monkeypatch.setenv("MCP_RESULT_CACHE", "false")
+    return {tool.name: tool for tool in build_proxy_tools([{"url": "http://mcp"}], str(REPO_CACHE))}
+
+
+def test_fast_path_renders_the_complete_large_result(large_cluster_proxies):
+    assert json.loads(large_cluster_proxies["LIST_NODES"].run(cluster="prod-east"))["truncated"] is True
+
+    answer = FastPathRouter(lambda: large_cluster_proxies.values()).try_answer("list nodes in prod-east")
+
+    assert answer.startswith("### Nodes in prod-east\n\n| name | status |")
+    assert "prod-east-node-59" in answer
+    assert "truncated" not in answer and "GET_MORE_RESULTS" not in answer
+
+
+def test_fan_out_report_is_shaped_to_its_budget(large_cluster_proxies):
+    fan_out_tool = build_fan_out_tool(list(large_cluster_proxies.values()))
+
+    report = json.loads(fan_out_tool.run())
+
+    assert report["truncated"] is True and report["total_rows"] == 3
+    # Per-cluster results are complete; the only page handle is the report's own
+    assert len(report["clusters"][0]["LIST_NODES"]) == 60
+    assert "GET_MORE_RESULTS" not in json.dumps(report["clusters"])
+    assert report["summary"]["calls"] == 9
+    assert report["next_page"]["tool"] == "GET_MORE_RESULTS"
+    assert estimate_tokens(json.dumps(report)) <= OutputBudget().budget_for("CLUSTER_FAN_OUT")
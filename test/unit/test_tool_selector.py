@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+按查询筛选工具子集的单元测试
+
+使用 tools_cache.json 中的真实工具清单验证排序结果。
+
+使用方法：
+    uv run pytest test/unit/test_tool_selector.py
+"""
+
+import pathlib
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew.tool_cache import load_tools_cache
+from ops_crew.tool_selector import query_terms, rank_tools, select_tools
+
+REPO_CACHE = pathlib.Path(__file__).resolve().parents[2] / "tools_cache.json"
+
+
+class FakeField:
+    def __init__(self, required):
+        self.required = required
+
+    def is_required(self):
+        return self.required
+
+
+def cached_tools():
+    tools = []
+    for entry in load_tools_cache(str(REPO_CACHE)):
+        required = set(entry["parameters"].get("required", []))
+        fields = {name: FakeField(name in required) for name in entry["parameters"].get("properties", {})}
+        tools.append(SimpleNamespace(
+            name=entry["name"],
+            description=entry["description"],
+            args_schema=SimpleNamespace(model_fields=fields),
+        ))
+    return tools
+
+
+def names(tools):
+    return [tool.name for tool in tools]
+
+
+def test_query_terms_handle_synonyms_and_chinese():
+    assert query_terms("show pods") == ["list", "pod"]
+    assert "node" in query_terms("查看节点的CPU使用率")
+    assert "metrics" in query_terms("查看节点的CPU使用率")
+
+
+def test_pod_log_question_ranks_log_tools_first():
+    ranked = names(rank_tools("why is pod api-7f9 crashing? check its logs", cached_tools()))
+
+    assert set(ranked[:2]) == {"ANALYZE_POD_LOGS", "GET_POD_LOGS"}
+
+
+def test_select_tools_keeps_top_k_plus_discovery_tool():
+    selected = names(select_tools("node cpu metrics in prod", cached_tools(), top_k=2))
+
+    # LIST_NODES and GET_POD_METRICS tie; ties go to the tool name
+    assert selected == ["GET_NODE_METRICS", "GET_POD_METRICS", "LIST_CLUSTERS"]
+    reordered = select_tools("node cpu metrics in prod", list(reversed(cached_tools())), top_k=2)
+    assert sorted(names(reordered)) == selected
+
+
+def test_unmatched_query_falls_back_to_full_set():
+    tools = cached_tools()
+
+    assert select_tools("hello there", tools, top_k=3) == tools
+    assert select_tools("list clusters", tools, top_k=0) == tools
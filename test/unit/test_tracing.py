@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+本地 span 追踪单元测试
+
+使用方法：
+    uv run pytest test/unit/test_tracing.py
+"""
+
+import pathlib
+import sys
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2] / "src"))
+
+from ops_crew import metrics, tracing
+from ops_crew.metrics import timed, track_request
+from ops_crew.tracing import load_traces, render_flame, span, trace_root
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracing.configure(enabled=True, path=str(path))
+    yield path
+    tracing.configure(enabled=False)
+
+
+def test_disabled_tracing_is_a_no_op(tmp_path):
+    tracing.configure(enabled=False, path=str(tmp_path / "traces.jsonl"))
+
+    with span("request") as current:
+        assert current is None
+        assert tracing.start_llm_span("model") is None
+
+    assert not (tmp_path / "traces.jsonl").exists()
+
+
+def test_request_tree_with_agent_iterations(trace_file):
+    with track_request("list nodes"):
+        with span("crew.kickoff"):
+            for tool in ("LIST_CLUSTERS", "LIST_NODES"):
+                metrics._llm_call_started(None)
+                metrics._llm_call_finished(None)
+                with timed("tool_call", tool):
+                    pass
+            metrics._llm_call_started(None)
+            metrics._llm_call_finished(None)
+
+    traces = load_traces(str(trace_file))
+    assert len(traces) == 1
+    spans = next(iter(traces.values()))
+    by_id = {span_data["spanId"]: span_data for span_data in spans}
+
+    def path(span_data):
+        names = []
+        while span_data is not None:
+            names.append(span_data["name"])
+            span_data = by_id.get(span_data["parentSpanId"])
+        return "/".join(reversed(names))
+
+    assert trace_root(spans)["name"] == "request"
+    assert sorted(path(span_data) for span_data in spans) == sorted([
+        "request",
+        "request/crew.kickoff",
+        "request/crew.kickoff/agent.iteration",
+        "request/crew.kickoff/agent.iteration/llm_call",
+        "request/crew.kickoff/agent.iteration/tool_call",
+        "request/crew.kickoff/agent.iteration",
+        "request/crew.kickoff/agent.iteration/llm_call",
+        "request/crew.kickoff/agent.iteration/tool_call",
+        "request/crew.kickoff/agent.iteration",
+        "request/crew.kickoff/agent.iteration/llm_call",
+    ])
+    assert all(span_data["endTimeUnixNano"] >= span_data["startTimeUnixNano"] for span_data in spans)
+
+
+def test_errors_are_recorded_and_rendered(trace_file):
+    with pytest.raises(RuntimeError):
+        with track_request("boom"):
+            with timed("tool_call", "GET_POD_LOGS"):
+                raise RuntimeError("MCP down")
+
+    spans = next(iter(load_traces(str(trace_file)).values()))
+    tool_span = next(span_data for span_data in spans if span_data["name"] == "tool_call")
+    assert tool_span["status"] == {"code": "STATUS_CODE_ERROR", "message": "MCP down"}
+    assert tool_span["kind"] == "SPAN_KIND_CLIENT"
+
+    flame = render_flame(spans, width=20).splitlines()
+    assert flame[0].startswith("request")
+    assert "tool_call GET_POD_LOGS ✗" in flame[1]
+    assert flame[1].startswith("  ")